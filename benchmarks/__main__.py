@@ -0,0 +1,87 @@
+import argparse
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import sys
+import typing
+
+from . import baseline, micro
+from .devices import kinds, run_kind
+
+baseline_file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'baseline.json')
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Simulator overhead per message and per device, against the local mock servers, "
+                    "and microbenchmarks of the per-message hot paths")
+    parser.add_argument("--suites", nargs="+", choices=["devices", "micro"], default=["devices", "micro"], help="Suites to run (default: all)")
+    parser.add_argument("--kinds", nargs="+", choices=list(kinds), default=list(kinds), help="Device kinds to benchmark (default: all)")
+    parser.add_argument("--devices", type=int, default=100, help="Devices per kind (default: 100)")
+    parser.add_argument("--seconds", type=float, default=5, help="Seconds of load per kind (default: 5)")
+    parser.add_argument(
+        "--micro", nargs="+", metavar="NAME",
+        help="Microbenchmarks to run, by name prefix (e.g. `ocpp16.` or `ensto.raw_to_json`, default: all)")
+    parser.add_argument("--json", help="Write the results as JSON to this file path")
+    parser.add_argument("--baseline", default=baseline_file_path, help="Baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline (other results in it are kept)")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Compare with the baseline, exit with 1 if any result regressed by more than --threshold")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression as a ratio (default: 0.2)")
+    return parser.parse_args(args)
+
+
+def table(results: typing.Dict[str, typing.Dict[str, typing.Any]]) -> str:
+    micro_results = {k: v for k, v in results.items() if "ns_per_op" in v}
+    results = {k: v for k, v in results.items() if k not in micro_results}
+    lines = []
+    if len(results) > 0:
+        lines += table_devices(results)
+    if len(micro_results) > 0:
+        width = max(len(k) for k in micro_results) + 2
+        if len(lines) > 0:
+            lines.append("")
+        lines.append("Microbenchmark".ljust(width) + "ns/op".rjust(12))
+        lines += [name.ljust(width) + f"{values['ns_per_op']:.0f}".rjust(12) for name, values in micro_results.items()]
+    return "\n".join(lines)
+
+
+def table_devices(results: typing.Dict[str, typing.Dict[str, typing.Any]]) -> typing.List[str]:
+    keys = sorted({k for values in results.values() for k in values})
+    lines = ["Benchmark".ljust(24) + "".join(name.rjust(14) for name in results)]
+    for key in keys:
+        cells = [results[name].get(key) for name in results]
+        lines.append(key.ljust(24) + "".join(("" if v is None else f"{v:.4g}").rjust(14) for v in cells))
+    return lines
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {}
+    # One fresh process per kind, for a clean memory baseline and metrics
+    for kind in (args.kinds if "devices" in args.suites else []):
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results[kind] = executor.submit(run_kind, kind, args.devices, args.seconds).result()
+        print(f"Benchmark {kind} done", file=sys.stderr)
+    if "micro" in args.suites:
+        results.update(micro.run(args.micro))
+    print(table(results))
+    if args.json is not None:
+        baseline.write(args.json, results)
+    if args.save_baseline:
+        saved = baseline.read(args.baseline) if os.path.exists(args.baseline) else {}
+        saved.update(results)
+        baseline.write(args.baseline, saved)
+    if args.check:
+        regressions = baseline.regressions(results, baseline.read(args.baseline), args.threshold)
+        for line in regressions:
+            print(f"Regression: {line}")
+        return 1 if len(regressions) > 0 else 0
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main(parse_args()))
@@ -0,0 +1,42 @@
+import json
+import typing
+
+# Result key: (higher is better, smallest difference that counts, as measurements are noisy)
+compared: typing.Dict[str, typing.Tuple[bool, float]] = {
+    "messages_per_core_second": (True, 0),
+    "loop_lag_ms_p99": (False, 1),
+    "rss_mb_per_1000_devices": (False, 1),
+    "connect_seconds_p50": (False, 0.005),
+    "ns_per_op": (False, 0),
+}
+
+
+def read(file_path: str) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    with open(file_path) as file:
+        return json.load(file)
+
+
+def write(file_path: str, results: typing.Dict[str, typing.Dict[str, typing.Any]]):
+    with open(file_path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def regressions(
+        results: typing.Dict[str, typing.Dict[str, typing.Any]],
+        baseline: typing.Dict[str, typing.Dict[str, typing.Any]],
+        threshold: float,
+) -> typing.List[str]:
+    """Results worse than the baseline by more than `threshold` (a ratio, 0.2 = 20%),
+    as readable lines. Names missing on either side are not compared."""
+    result = []
+    for name, values in sorted(results.items()):
+        base = baseline.get(name, {})
+        for key, (higher_is_better, minimum) in compared.items():
+            if key not in values or key not in base:
+                continue
+            value, expected = values[key], base[key]
+            worse = expected - value if higher_is_better else value - expected
+            if worse > max(abs(expected) * threshold, minimum):
+                result.append(f"{name} {key}: {value:.4g}, baseline: {expected:.4g} ({worse / max(abs(expected), 1e-9):+.0%} worse)")
+    return result
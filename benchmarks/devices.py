@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import typing
+
+from charge_device_simulator.device import DeviceAbstract, DeviceMetrics, Histogram
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+
+
+def _device_ocpp_j(device_class: typing.Type[DeviceAbstract]):
+    def create(device_id: str, port: int) -> DeviceAbstract:
+        device = device_class(device_id)
+        device.server_address = f"ws://127.0.0.1:{port}"
+        return device
+    return create
+
+
+def _device_ensto(device_id: str, port: int) -> DeviceAbstract:
+    device = DeviceEnsto(device_id)
+    device.server_host, device.server_port = "127.0.0.1", port
+    return device
+
+
+def _device_ocpp_s(device_id: str, port: int) -> DeviceAbstract:
+    device = DeviceOcppS(device_id)
+    device.server_address = f"http://127.0.0.1:{port}/"
+    # Required by the schema, validated before sending
+    device.spec_chargePointVendor, device.spec_chargePointModel = "Benchmark", "Benchmark"
+    return device
+
+
+# Device kind: (mock server subcommand, device factory)
+kinds: typing.Dict[str, typing.Tuple[str, typing.Callable[[str, int], DeviceAbstract]]] = {
+    'ocpp16': ('ocpp-j', _device_ocpp_j(DeviceOcppJ16)),
+    'ocpp201': ('ocpp-j', _device_ocpp_j(DeviceOcppJ201)),
+    'ensto': ('ensto', _device_ensto),
+    'ocpps': ('ocpp-s', _device_ocpp_s),
+}
+
+
+def rss_bytes() -> int:
+    """Current resident set size, the peak one where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+class LoopLag:
+    """Samples the event loop lag: how late a sleep of `interval_seconds` wakes up."""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self.interval_seconds = interval_seconds
+        self.lag = Histogram()
+        self.__task: typing.Optional[asyncio.Task] = None
+        self.__time_start = 0.0
+
+    def start(self):
+        self.__task = asyncio.create_task(self.__sample())
+
+    def end(self):
+        if self.__task is not None:
+            # A loop blocked until now never woke the sampler up, the pending sample counts too
+            self.lag.record(max(time.perf_counter() - self.__time_start - self.interval_seconds, 0))
+            self.__task.cancel()
+            self.__task = None
+
+    async def __sample(self):
+        while True:
+            self.__time_start = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            self.lag.record(max(time.perf_counter() - self.__time_start - self.interval_seconds, 0))
+
+
+class MockServerProcess:
+    """A mock server (`python -m charge_device_simulator.mock`) in its own
+    process, so its CPU time is not counted as the simulator's."""
+
+    def __init__(self, server: str):
+        self.server = server
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        self.__process: typing.Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> 'MockServerProcess':
+        self.__process = subprocess.Popen([
+            sys.executable, '-m', 'charge_device_simulator.mock',
+            '--port', str(self.port), '--log-level', 'WARNING', self.server,
+        ])
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1).close()
+                return self
+            except OSError:
+                if self.__process.poll() is not None or time.monotonic() > deadline:
+                    self.__exit__()
+                    raise RuntimeError(f"Mock server {self.server} did not start")
+                time.sleep(0.05)
+
+    def __exit__(self, *args):
+        if self.__process is not None:
+            self.__process.terminate()
+            self.__process.wait(timeout=10)
+            self.__process = None
+
+
+async def _device_load(device: DeviceAbstract, deadline: float):
+    # Closed loop: the next heartbeat goes out as soon as the previous one is answered
+    while time.monotonic() < deadline:
+        if not await device.action_heart_beat():
+            break
+
+
+async def run_devices(kind: str, devices: int, seconds: float, port: int) -> typing.Dict[str, typing.Any]:
+    """Connects `devices` devices of a kind to the mock server on `port`,
+    then lets each send heartbeats back-to-back for `seconds`."""
+    create = kinds[kind][1]
+    metrics = DeviceMetrics.process
+    lag = LoopLag()
+    rss_start = rss_bytes()
+    device_list = [create(f"bench-{kind}-{i}", port) for i in range(devices)]
+    for device in device_list:
+        device.error_exit = False
+    connected = sum(1 for ok in await asyncio.gather(*(d.initialize() for d in device_list)) if ok)
+    rss_connected = rss_bytes()
+
+    responded_start = metrics.totals().responded
+    lag.start()
+    time_start, cpu_start = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(_device_load(d, time.monotonic() + seconds) for d in device_list))
+    duration, cpu = time.perf_counter() - time_start, time.process_time() - cpu_start
+    lag.end()
+    messages = metrics.totals().responded - responded_start
+    await asyncio.gather(*(d.end() for d in device_list), return_exceptions=True)
+    return {
+        "devices": devices,
+        "connected": connected,
+        "connect_seconds_p50": metrics.connect.percentile(50),
+        "connect_seconds_p99": metrics.connect.percentile(99),
+        "messages": messages,
+        "messages_per_second": messages / duration,
+        "messages_per_core_second": messages / max(cpu, 1e-9),
+        "loop_lag_ms_p50": lag.lag.percentile(50) * 1000,
+        "loop_lag_ms_p99": lag.lag.percentile(99) * 1000,
+        "loop_lag_ms_max": lag.lag.max * 1000,
+        "rss_mb_per_1000_devices": (rss_connected - rss_start) / max(devices, 1) * 1000 / 2 ** 20,
+    }
+
+
+def run_kind(kind: str, devices: int, seconds: float) -> typing.Dict[str, typing.Any]:
+    """Benchmarks one device kind against its mock server; meant to run in a
+    fresh process, so memory and metrics of other kinds do not interfere."""
+    logging.basicConfig(level=logging.WARNING)
+    with MockServerProcess(kinds[kind][0]) as server:
+        return asyncio.run(run_devices(kind, devices, seconds, server.port))
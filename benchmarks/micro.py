@@ -0,0 +1,244 @@
+import asyncio
+import json
+import time
+import typing
+
+from lxml import etree
+from zeep import Client
+from zeep.proxy import AsyncServiceProxy
+
+from charge_device_simulator.device import DeviceAbstract, MessageIds
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.device.ensto.pending_req import PendingReq
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.device.ocpp_s.soap_templates import SoapTemplates
+from charge_device_simulator.device.ocpp_s.wsa_extension_plugin import WsAddressingExtensionPlugin
+from charge_device_simulator.device.ocpp_s.wsdl_documents import WsdlDocuments
+
+# Microbenchmarks of the per-message hot paths, each timed in isolation: the
+# transport is replaced by in-memory fakes, so only the device code is measured.
+# They reach private members on purpose and follow the device internals.
+
+meter_values_payload = {
+    "connectorId": 1,
+    "transactionId": 1234,
+    "meterValue": [{"timestamp": "2024-01-01T00:00:00+00:00", "sampledValue": [{"value": "1000", "measurand": "Energy.Active.Import.Register"}]}],
+}
+ensto_payload = {"id": 43, "imei": "bench", "mv": "1000", "pw": "7200", "cur": "32", "ts": "1704067200", "tid": "1234"}
+
+
+class FakeWebsocket:
+    """Serves prepared messages to `recv`, then ends the read loop."""
+
+    def __init__(self, messages: typing.Sequence[str] = ()):
+        self.messages = list(reversed(messages))
+
+    async def recv(self) -> str:
+        if len(self.messages) <= 0:
+            raise asyncio.CancelledError()
+        return self.messages.pop()
+
+    async def send(self, raw: typing.Union[str, bytes], text: typing.Optional[bool] = None):
+        pass
+
+
+class FakeStream:
+    """Stands for both the Ensto socket reader and writer."""
+
+    def __init__(self, lines: typing.Sequence[bytes] = ()):
+        self.lines = list(reversed(lines))
+
+    async def readline(self) -> bytes:
+        if len(self.lines) <= 0:
+            raise asyncio.CancelledError()
+        return self.lines.pop()
+
+    def write(self, data: bytes):
+        pass
+
+    async def drain(self):
+        pass
+
+
+async def _raw_sent(raw, action, req_id=None):
+    return raw
+
+
+def _device_ocpp_j(device_class: typing.Type[DeviceAbstract]) -> DeviceAbstract:
+    device = device_class("bench")
+    device._ws = FakeWebsocket()
+    # Requests are encoded, but not sent nor waited for
+    device.by_device_req_send_raw = _raw_sent
+    return device
+
+
+def ocpp_j_cases(name: str, device_class: typing.Type[DeviceAbstract]) -> typing.Dict[str, typing.Callable[[int], typing.Awaitable[float]]]:
+    async def by_device_req_send(n: int) -> float:
+        device = _device_ocpp_j(device_class)
+        time_start = time.perf_counter()
+        for _ in range(n):
+            await device.by_device_req_send("MeterValues", meter_values_payload)
+        return time.perf_counter() - time_start
+
+    async def loop_internal(n: int) -> float:
+        device = _device_ocpp_j(device_class)
+        pending = device._AbstractDeviceOcppJ__pending_by_device_reqs
+        for i in range(n):
+            pending.add(f"id-{i}")
+        device._ws = FakeWebsocket([json.dumps([3, f"id-{i}", {"status": "Accepted"}]) for i in range(n)])
+        time_start = time.perf_counter()
+        await device._AbstractDeviceOcppJ__loop_internal()
+        return time.perf_counter() - time_start
+
+    async def by_middleware_req(n: int) -> float:
+        device = _device_ocpp_j(device_class)
+        time_start = time.perf_counter()
+        for i in range(n):
+            await device.by_middleware_req(f"id-{i}", "changeavailability", {"connectorId": 1, "type": "Operative"})
+        return time.perf_counter() - time_start
+
+    return {
+        f"{name}.by_device_req_send": by_device_req_send,
+        f"{name}.loop_internal": loop_internal,
+        f"{name}.by_middleware_req": by_middleware_req,
+    }
+
+
+def ocpp_s_cases() -> typing.Dict[str, typing.Callable[[int], typing.Awaitable[float]]]:
+    def device_create() -> DeviceOcppS:
+        device = DeviceOcppS("bench")
+        # Stands for the zeep service, SOAP serialization is not part of the device code
+        device._client_service = {"MeterValues": meter_values}
+        return device
+
+    async def meter_values(**kwargs):
+        return {}
+
+    async def by_device_req_send(n: int) -> float:
+        device = device_create()
+        time_start = time.perf_counter()
+        for _ in range(n):
+            await device.by_device_req_send("MeterValues", meter_values_payload)
+        return time.perf_counter() - time_start
+
+    async def by_middleware_req(n: int) -> float:
+        device = device_create()
+        time_start = time.perf_counter()
+        for i in range(n):
+            await device.by_middleware_req(f"id-{i}", "changeavailability", {"connectorId": 1, "type": "Operative"})
+        return time.perf_counter() - time_start
+
+    # Envelope of a MeterValues request (as the device sends it) by zeep and by the template
+    soap_payload = {"connectorId": 1, "transactionId": 1234, "values": [{
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "value": [{"_value_1": 1000, "context": "Sample.Periodic", "measurand": "Energy.Active.Import.Register", "unit": "kWh"}],
+    }]}
+
+    def soap_client() -> typing.Tuple[Client, AsyncServiceProxy]:
+        client = Client(WsdlDocuments.get(DeviceOcppS.wsdl_file_name), plugins=[WsAddressingExtensionPlugin("http://bench/")])
+        return client, AsyncServiceProxy(client, client.wsdl.bindings[DeviceOcppS.binding_name], address="http://bench/")
+
+    async def soap_envelope_zeep(n: int) -> float:
+        client, service = soap_client()
+        time_start = time.perf_counter()
+        for _ in range(n):
+            etree.tostring(client.create_message(service, "MeterValues", **soap_payload, _soapheaders={'ChargeBoxIdentity': "bench"}))
+        return time.perf_counter() - time_start
+
+    async def soap_envelope_template(n: int) -> float:
+        templates = SoapTemplates(["MeterValues"])
+        message_ids = MessageIds(prefix=MessageIds.prefix_of("bench"))
+        time_start = time.perf_counter()
+        for _ in range(n):
+            templates.render("MeterValues", soap_payload, "bench", "http://bench/", "http://bench/", f"urn:ocpp-message:{message_ids.next()}")
+        return time.perf_counter() - time_start
+
+    return {
+        "ocpps.by_device_req_send": by_device_req_send,
+        "ocpps.by_middleware_req": by_middleware_req,
+        "ocpps.soap_envelope_zeep": soap_envelope_zeep,
+        "ocpps.soap_envelope_template": soap_envelope_template,
+    }
+
+
+def ensto_cases() -> typing.Dict[str, typing.Callable[[int], typing.Awaitable[float]]]:
+    def device_create(lines: typing.Sequence[bytes] = ()) -> DeviceEnsto:
+        device = DeviceEnsto("bench")
+        stream = FakeStream(lines)
+        device._DeviceEnsto__socketReader, device._DeviceEnsto__socketWriter = stream, stream
+        return device
+
+    async def socket_message(n: int) -> float:
+        socket_message_ = device_create()._DeviceEnsto__socket_message
+        time_start = time.perf_counter()
+        for _ in range(n):
+            socket_message_(ensto_payload)
+        return time.perf_counter() - time_start
+
+    async def raw_to_json(n: int) -> float:
+        device = device_create()
+        raw = device._DeviceEnsto__socket_message(ensto_payload)
+        raw_to_json_ = device._DeviceEnsto__raw_to_json
+        time_start = time.perf_counter()
+        for _ in range(n):
+            raw_to_json_(raw)
+        return time.perf_counter() - time_start
+
+    async def loop_internal(n: int) -> float:
+        device = device_create([b"imei=bench&id=43&ack=1&chk=0\n"] * n)
+        pending = device._DeviceEnsto__pending_by_device_reqs
+        for _ in range(n):
+            pending.add("43", PendingReq(None, lambda resp_json: None))
+        time_start = time.perf_counter()
+        await device._DeviceEnsto__loop_internal()
+        return time.perf_counter() - time_start
+
+    async def by_middleware_req(n: int) -> float:
+        device = device_create()
+        time_start = time.perf_counter()
+        for _ in range(n):
+            await device.by_middleware_req("20", {"id": "20", "imei": "bench"})
+        return time.perf_counter() - time_start
+
+    return {
+        "ensto.socket_message": socket_message,
+        "ensto.raw_to_json": raw_to_json,
+        "ensto.loop_internal": loop_internal,
+        "ensto.by_middleware_req": by_middleware_req,
+    }
+
+
+def cases() -> typing.Dict[str, typing.Callable[[int], typing.Awaitable[float]]]:
+    result = {}
+    result.update(ocpp_j_cases("ocpp16", DeviceOcppJ16))
+    result.update(ocpp_j_cases("ocpp201", DeviceOcppJ201))
+    result.update(ocpp_s_cases())
+    result.update(ensto_cases())
+    return result
+
+
+async def measure(case: typing.Callable[[int], typing.Awaitable[float]], repeat: int = 5, min_seconds: float = 0.05) -> float:
+    """Seconds per operation, the best of `repeat` runs; each run has enough
+    operations to last `min_seconds` (as `timeit` picks them)."""
+    n = 1
+    while True:
+        elapsed = await case(n)
+        if elapsed >= min_seconds:
+            break
+        n *= 10 if elapsed <= 0 else max(2, min(10, int(min_seconds / elapsed) + 1))
+    best = elapsed / n
+    for _ in range(repeat - 1):
+        best = min(best, await case(n) / n)
+    return best
+
+
+def run(names: typing.Optional[typing.Sequence[str]] = None, repeat: int = 5) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    async def run_all():
+        result = {}
+        for name, case in cases().items():
+            if names is None or any(name.startswith(n) for n in names):
+                result[name] = {"ns_per_op": await measure(case, repeat) * 1e9}
+        return result
+    return asyncio.run(run_all())
@@ -1,10 +1,13 @@
 import asyncio
 import logging
+import sys
 
 import coloredlogs
 from charge_device_simulator.runtime import ExecutorCli
 
-coloredlogs.install(logging.DEBUG)
-executor = ExecutorCli()
-executor.initialize()
-asyncio.run(executor.execute())
+if __name__ == "__main__":
+    # Guarded, fleet workers (--workers) are spawned processes re-importing this module
+    coloredlogs.install(logging.DEBUG)
+    executor = ExecutorCli()
+    executor.initialize()
+    sys.exit(asyncio.run(executor.execute()))
@@ -2,9 +2,16 @@ from .abstract import DeviceAbstract
 from .ocpp_j.abstract_device_ocpp_j import AbstractDeviceOcppJ
 from .ocpp_j.device_ocpp_j16 import DeviceOcppJ16
 from .ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from .ocpp_j.json_codec import JsonCodec
 from .ocpp_s.device_ocpp_s import DeviceOcppS
 from .ensto.device_ensto import DeviceEnsto
 from .simulator import Simulator
 from .flows import Flows
+from .flow_scheduler import FlowScheduler
+from .rate_limiter import TokenBucket
+from .backoff import Backoff
+from .metrics import DeviceMetrics, Histogram
+from .message_ids import MessageIds
+from .middleware_handlers import MiddlewareResp, middleware_handler, static_handler
 from .frequent_flow_options import FrequentFlowOptions
 from .error_reasons import ErrorReasons
@@ -4,20 +4,42 @@ import datetime
 import logging
 import os
 import sys
+import time
 import typing
 
 from . import utility
+from .device_logger import DeviceLogger
 from .error_reasons import ErrorReasons
+from .message_ids import MessageIds
+from .metrics import DeviceMetrics
+from .middleware_handlers import MiddlewareHandler, MiddlewareResp, handlers_of, resp_of
+from .rate_limiter import TokenBucket
 
 
 class DeviceAbstract(abc.ABC):
     on_error = []
+    # Handlers of the requests middlewares send to devices of a class, by lowercase action.
+    # Built once per class, see `middleware_handlers.handlers_of`
+    middleware_handlers: typing.Dict[str, MiddlewareHandler] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.middleware_handlers = handlers_of(cls)
 
     def __init__(self, device_id: str):
+        # Counters and latency of the requests sent by this device, also added to the process totals
+        self.metrics: DeviceMetrics = DeviceMetrics(parent=DeviceMetrics.process)
+        self.__log_level: typing.Optional[int] = None
+        self.__device_logger: typing.Optional[DeviceLogger] = None
+        # Ids of the requests sent (and OCPP 2.0.1 transaction ids)
+        self.message_ids: MessageIds = MessageIds(prefix=MessageIds.prefix_of(device_id))
+        self.__max_in_flight: typing.Optional[int] = None
+        self.__in_flight_slots: typing.Optional[asyncio.Semaphore] = None
+        self.__charge_started: typing.Optional[float] = None
         self.register_on_initialize: bool = True
         self.deviceId: str = device_id
         self.name: str = ''
-        self.charge_in_progress: bool = False
+        self.charge_in_progress = False
         self.is_preparing: bool = False
         self.charge_id: typing.Any = -1
         # Set True by Simulator.lifecycle_start when running an interactive
@@ -31,6 +53,8 @@ class DeviceAbstract(abc.ABC):
         self.reservation_parent_id_tag: typing.Optional[str] = None
         self.reservation_expiry_date: typing.Optional[str] = None
         self._last_authorize_info: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None
+        # Shared by a fleet to limit how many devices register (boot) per second
+        self.register_rate_limiter: typing.Optional[TokenBucket] = None
         envKey = 'RESPONSE_TIMEOUT_SECONDS'
         self.response_timeout_seconds: int = int(os.environ[envKey]) if envKey in os.environ else 15
 
@@ -39,6 +63,88 @@ class DeviceAbstract(abc.ABC):
     def logger(self) -> logging.Logger:
         pass
 
+    @property
+    def log_level(self) -> typing.Optional[int]:
+        """Log level of this device only, None to follow the logger of its device type."""
+        return self.__log_level
+
+    @log_level.setter
+    def log_level(self, value: typing.Union[int, str, None]):
+        self.__log_level = DeviceLogger.level_parse(value)
+        self.__device_logger = None
+
+    def _device_logger(self, logger: logging.Logger) -> typing.Union[logging.Logger, DeviceLogger]:
+        # Devices without a level of their own log through the shared logger, at no extra cost
+        if self.__log_level is None:
+            return logger
+        if self.__device_logger is None:
+            self.__device_logger = DeviceLogger(logger, self.deviceId, self.__log_level)
+        return self.__device_logger
+
+    @property
+    def charge_in_progress(self) -> bool:
+        return self.__charge_started is not None
+
+    @charge_in_progress.setter
+    def charge_in_progress(self, value: bool):
+        # Session durations are measured on the transitions of this flag
+        if value and self.__charge_started is None:
+            self.__charge_started = time.perf_counter()
+        elif not value and self.__charge_started is not None:
+            self.metrics.session_ended(time.perf_counter() - self.__charge_started)
+            self.__charge_started = None
+
+    @property
+    @abc.abstractmethod
+    def is_connected(self) -> bool:
+        pass
+
+    @property
+    def requests_pending(self) -> int:
+        """Requests waiting for their response on the current connection."""
+        return 0
+
+    @property
+    def max_in_flight(self) -> typing.Optional[int]:
+        """Max requests of this device waiting for their response at once, None for no limit.
+        Requests beyond it wait to be sent (not counted in their latency)."""
+        return self.__max_in_flight
+
+    @max_in_flight.setter
+    def max_in_flight(self, value: typing.Optional[int]):
+        if value is not None and value < 1:
+            raise ValueError(f"Invalid max in flight: {value}")
+        self.__max_in_flight = value
+        self.__in_flight_slots = None
+
+    def middleware_handler_set(self, action: str, handler: typing.Optional[MiddlewareHandler]):
+        """Handles the middleware requests `action` to this device with `handler`
+        instead of the handler of its class, None to not support them."""
+        if 'middleware_handlers' not in vars(self):
+            self.middleware_handlers = dict(type(self).middleware_handlers)
+        if handler is None:
+            self.middleware_handlers.pop(action.lower(), None)
+        else:
+            self.middleware_handlers[action.lower()] = handler
+
+    async def _middleware_handle(self, req_action: str, req_payload: typing.Any) -> typing.Optional[MiddlewareResp]:
+        """Response of the handler of `req_action` (lowercase), None if there is none."""
+        handler = self.middleware_handlers.get(req_action, None)
+        if handler is None:
+            return None
+        return resp_of(await handler(self, req_payload))
+
+    async def _in_flight_acquire(self):
+        if self.__max_in_flight is None:
+            return
+        if self.__in_flight_slots is None:
+            self.__in_flight_slots = asyncio.Semaphore(self.__max_in_flight)
+        await self.__in_flight_slots.acquire()
+
+    def _in_flight_release(self):
+        if self.__in_flight_slots is not None:
+            self.__in_flight_slots.release()
+
     @abc.abstractmethod
     async def initialize(self) -> bool:
         pass
@@ -48,6 +154,7 @@ class DeviceAbstract(abc.ABC):
         pass
 
     async def re_initialize(self) -> bool:
+        self.metrics.reconnected()
         await self.end()
         return await self.initialize()
 
@@ -78,6 +185,11 @@ class DeviceAbstract(abc.ABC):
     async def action_register(self) -> bool:
         pass
 
+    async def action_register_rate_limited(self) -> bool:
+        if self.register_rate_limiter is not None:
+            await self.register_rate_limiter.acquire()
+        return await self.action_register()
+
     @abc.abstractmethod
     async def action_heart_beat(self) -> bool:
         pass
@@ -229,8 +341,8 @@ class DeviceAbstract(abc.ABC):
             options["reservationId"] = self.reservation_id
             return True
         self.logger.info(
-            f"Reservation gate rejected charge: requested idTag/parent did not match reservation "
-            f"{self.reservation_id} on connector {connector_id}")
+            "Reservation gate rejected charge: requested idTag/parent did not match reservation "
+            "%s on connector %s", self.reservation_id, connector_id)
         return False
 
     def _reset_charge_cycle_options(self, options: typing.Dict[str, typing.Any]) -> None:
@@ -248,7 +360,7 @@ class DeviceAbstract(abc.ABC):
     def _consume_reservation_if_used(self, options: typing.Dict[str, typing.Any]) -> None:
         if "reservationId" in options and self.reservation_is_active() \
                 and options["reservationId"] == self.reservation_id:
-            self.logger.info(f"Reservation {self.reservation_id} consumed by charge start")
+            self.logger.info("Reservation %s consumed by charge start", self.reservation_id)
             self.reservation_clear()
 
     def _reserve_now_options_from_payload(
@@ -269,11 +381,11 @@ class DeviceAbstract(abc.ABC):
         """Apply a ReserveNow request: validate, store state, send Reserved
         StatusNotification. Returns True if reservation was accepted."""
         log_title = self.flow_reserve.__name__
-        self.logger.info(f"Flow {log_title} Start: connectorId={options.get('connectorId')}, "
-                         f"reservationId={options.get('reservationId')}")
+        self.logger.info("Flow %s Start: connectorId=%s, reservationId=%s",
+                         log_title, options.get('connectorId'), options.get('reservationId'))
         connector_id: typing.Optional[int] = options.get("connectorId")
         if not self.reserve_can_accept(connector_id):
-            self.logger.info(f"Flow {log_title} Rejected (connector busy or already reserved)")
+            self.logger.info("Flow %s Rejected (connector busy or already reserved)", log_title)
             return False
         self.reservation_set(
             reservation_id=options.get("reservationId"),
@@ -284,17 +396,15 @@ class DeviceAbstract(abc.ABC):
         )
         if not await self.action_status_update("Reserved", options):
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def interactive_reservation_show(self) -> None:
         """Print the device's current reservation state."""
         self.logger.info(
-            f"Reservation state: id={self.reservation_id}, "
-            f"connectorId={self.reservation_connector_id}, "
-            f"idTag={self.reservation_id_tag}, "
-            f"parentIdTag={self.reservation_parent_id_tag}, "
-            f"expiryDate={self.reservation_expiry_date}")
+            "Reservation state: id=%s, connectorId=%s, idTag=%s, parentIdTag=%s, expiryDate=%s",
+            self.reservation_id, self.reservation_connector_id, self.reservation_id_tag,
+            self.reservation_parent_id_tag, self.reservation_expiry_date)
 
     async def interactive_reservation_make(self) -> None:
         """Prompt for ReserveNow fields and run flow_reserve."""
@@ -329,16 +439,16 @@ class DeviceAbstract(abc.ABC):
         options: typing.Optional[typing.Dict[str, typing.Any]] = None,
     ) -> bool:
         log_title = self.flow_reservation_cancel.__name__
-        self.logger.info(f"Flow {log_title} Start: reservationId={reservation_id}")
+        self.logger.info("Flow %s Start: reservationId=%s", log_title, reservation_id)
         if not self.reserve_can_cancel(reservation_id):
-            self.logger.info(f"Flow {log_title} Rejected (no matching reservation)")
+            self.logger.info("Flow %s Rejected (no matching reservation)", log_title)
             return False
         notify_options: typing.Dict[str, typing.Any] = dict(options) if options else {}
         notify_options.setdefault("connectorId", self.reservation_connector_id)
         self.reservation_clear()
         if not await self.action_status_update("Available", notify_options):
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     @abc.abstractmethod
@@ -0,0 +1,52 @@
+import random
+import typing
+
+
+class Backoff:
+    """Delays between connection attempts: growing exponentially from `base_seconds`
+    up to `cap_seconds`, with jitter so devices that lost their server together do
+    not retry in lock-step waves. `jitter` is one of:
+      + `full`: uniform in [0, min(cap, base * 2^attempt)]
+      + `decorrelated`: uniform in [base, previous delay * 3], capped
+      + `none`: min(cap, base * 2^attempt)
+    `max_attempts` retries at most (None: forever)."""
+    jitters = ('full', 'decorrelated', 'none')
+
+    def __init__(self, base_seconds: float = 1, cap_seconds: float = 60, jitter: str = 'full',
+                 max_attempts: typing.Optional[int] = None, rand: typing.Optional[random.Random] = None):
+        if base_seconds <= 0 or cap_seconds < base_seconds:
+            raise ValueError(f"Invalid backoff, base: {base_seconds}, cap: {cap_seconds}")
+        if jitter not in self.jitters:
+            raise ValueError(f"Invalid backoff jitter: {jitter}, expected one of {', '.join(self.jitters)}")
+        if max_attempts is not None and max_attempts < 0:
+            raise ValueError(f"Invalid backoff max attempts: {max_attempts}")
+        self.base_seconds = base_seconds
+        self.cap_seconds = cap_seconds
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.rand = rand if rand is not None else random.Random()
+
+    def delays(self) -> typing.Iterator[float]:
+        """Delay before each retry of one series of attempts, ends when no retry is left."""
+        attempt = 0
+        previous = self.base_seconds
+        while self.max_attempts is None or attempt < self.max_attempts:
+            # Bounded exponent, the cap is reached long before
+            ceiling = min(self.cap_seconds, self.base_seconds * 2 ** min(attempt, 64))
+            if self.jitter == 'full':
+                previous = self.rand.uniform(0, ceiling)
+            elif self.jitter == 'decorrelated':
+                previous = min(self.cap_seconds, self.rand.uniform(self.base_seconds, previous * 3))
+            else:
+                previous = ceiling
+            attempt += 1
+            yield previous
+
+    @staticmethod
+    def parse(config: typing.Dict[str, typing.Any]) -> 'Backoff':
+        return Backoff(
+            float(config.get('base_seconds', 1)),
+            float(config.get('cap_seconds', 60)),
+            config.get('jitter', 'full'),
+            int(config['max_attempts']) if config.get('max_attempts', None) is not None else None,
+        )
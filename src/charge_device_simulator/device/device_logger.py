@@ -0,0 +1,33 @@
+import logging
+import typing
+
+
+class DeviceLogger(logging.LoggerAdapter):
+    """Logger of a single device: wraps the logger of its device type (shared
+    by all devices of that type) with a level of its own, which replaces the
+    level of the wrapped logger. Records carry the device id as `device_id`."""
+
+    def __init__(self, logger: logging.Logger, device_id: str, level: int):
+        super().__init__(logger, {"device_id": device_id})
+        self.level = level
+
+    @staticmethod
+    def level_parse(level: typing.Union[int, str, None]) -> typing.Optional[int]:
+        if level is None or isinstance(level, int):
+            return level
+        result = logging.getLevelName(str(level).upper())
+        if not isinstance(result, int):
+            raise ValueError(f"Unknown log level: {level}")
+        return result
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= self.level
+
+    def getEffectiveLevel(self) -> int:
+        return self.level
+
+    def log(self, level: int, msg: typing.Any, *args, **kwargs):
+        if self.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            # Logger.log would check the level of the wrapped logger again
+            self.logger._log(level, msg, args, **kwargs)
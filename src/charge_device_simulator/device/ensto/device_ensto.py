@@ -3,13 +3,16 @@ import datetime
 import json
 import logging
 import math
+import time
 import typing
 from urllib import parse
 
 from .. import abstract as device_abstract
 from .. import utility
 from .pending_req import PendingReq
+from .pending_table import PendingTable
 from ..error_reasons import ErrorReasons
+from ..middleware_handlers import MiddlewareResp, middleware_handler
 from ...model.error_message import ErrorMessage
 
 
@@ -21,7 +24,6 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
     __loop_internal_task: asyncio.Task = None
     __socketWriter: asyncio.StreamWriter = None
     __socketReader: asyncio.StreamReader = None
-    __pending_by_device_reqs: typing.Dict[str, typing.List[PendingReq]] = {}
 
     def __init__(self, device_id):
         super().__init__(device_id)
@@ -29,22 +31,36 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         self.spec_sw = None
         self.spec_model = None
         self.spec_vendor = None
+        # Replaced on each connection
+        self.__pending_by_device_reqs = PendingTable()
 
     @property
     def logger(self) -> logging.Logger:
-        return self.__logger
+        return self._device_logger(self.__logger)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.__socketWriter is not None and not self.__socketWriter.is_closing()
+
+    @property
+    def requests_pending(self) -> int:
+        return len(self.__pending_by_device_reqs)
 
     # noinspection PyBroadException
     async def initialize(self) -> bool:
         try:
+            time_connect = time.perf_counter()
             self.__socketReader, self.__socketWriter = await asyncio.open_connection(self.server_host, self.server_port)
+            self.metrics.connected(time_connect)
+            # Requests still waiting on a previous connection time out on their own table
+            self.__pending_by_device_reqs = PendingTable()
             self.__loop_internal_task = asyncio.create_task(self.__loop_internal())
 
             await asyncio.sleep(1)
             self.logger.info("Connected")
 
             if self.register_on_initialize:
-                await self.action_register()
+                await self.action_register_rate_limited()
             await self.action_heart_beat()
             return True
         except ValueError as err:
@@ -64,7 +80,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
 
     async def action_register(self) -> bool:
         action = "register"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             'id': 1,
             'settings': None,
@@ -77,12 +93,12 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if resp_json is None or 'chk' not in resp_json or 'uv' not in resp_json:
             await self.handle_error(f"Action {action} Response Failed", ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_heart_beat(self) -> bool:
         action = "heart_beat"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             'id': 24,
             'time': 1,
@@ -92,13 +108,13 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
             await self.handle_error(f"Action {action} Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse)
             return False
         if 'time' not in resp_json:
-            self.logger.warning(f"Action {action}, `time` was not found in response")
-        self.logger.info(f"Action {action} End")
+            self.logger.warning("Action %s, `time` was not found in response", action)
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_status_update(self, status, options: dict) -> bool:
         action = "status_update"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             'id': 2,
             'ping': None,
@@ -108,12 +124,12 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if resp_json is None or 'chk' not in resp_json or 'ack' not in resp_json:
             await self.handle_error(f"Action {action} Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_authorize(self, options: dict) -> bool:
         action = "authorize"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             'id': 10,
         }
@@ -122,7 +138,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if resp_json is None or 'chk' not in resp_json or 'success' not in resp_json:
             await self.handle_error(f"Action {action} Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     def prepare_authorize_params(self, json_payload, options: dict):
@@ -149,7 +165,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
 
     async def action_charge_start(self, options: dict) -> bool:
         action = "charge_start"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         self.fill_missing_options_charge_start(options)
         json_payload = {
             'id': 5,
@@ -162,7 +178,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
             await self.handle_error(f"Action {action} Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse)
             return False
         self.charge_in_progress = True
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     def charge_meter_value_current(self, options: dict):
@@ -175,7 +191,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
 
     async def action_meter_value(self, options: dict, meter_value: int = None, time_stamp: str = None) -> bool:
         action = "meter_value"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         self.fill_missing_options_charge_start(options)
         json_payload = {
             'id': 43,
@@ -188,12 +204,12 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if resp_json is None or 'chk' not in resp_json or 'ack' not in resp_json:
             await self.handle_error(f"Action {action} Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_stop(self, options: dict) -> bool:
         action = "charge_stop"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         self.fill_missing_options_charge_start(options)
         json_payload = {
             'id': 6,
@@ -207,7 +223,7 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if resp_json is None or 'chk' not in resp_json or 'ack' not in resp_json:
             await self.handle_error(f"Action {action} (Response Failed:\n{json.dumps(resp_json)}", ErrorReasons.InvalidResponse) / 1000
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_data_transfer(self, options: dict) -> bool:
@@ -215,29 +231,29 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
 
     async def flow_heartbeat(self) -> bool:
         log_title = self.flow_heartbeat.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_heart_beat():
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_authorize(self, options: dict) -> bool:
         log_title = self.flow_authorize.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_authorize(options):
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_status_preparing(self) -> bool:
         log_title = self.flow_status_preparing.__name__
-        self.logger.info(f"Flow {log_title} Start")
-        self.logger.info(f"Flow {log_title} End (no-op for Ensto)")
+        self.logger.info("Flow %s Start", log_title)
+        self.logger.info("Flow %s End (no-op for Ensto)", log_title)
         return True
 
     async def flow_charge(self, auto_stop: bool, options: dict) -> bool:
         log_title = self.flow_charge.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not options.get("is_remote_started", False):
             if not await self.action_authorize(options):
                 self.charge_in_progress = False
@@ -260,33 +276,43 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         if not await self.action_charge_stop(options):
             self.charge_in_progress = False
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         self.charge_in_progress = False
         return True
 
     async def flow_charge_ongoing_actions(self, options: dict) -> bool:
         if not options.get("autoActionsLoopDisableMeterValues", False):
             if not await self.action_meter_value(options):
-                self.logger.warning(f"Flow charge, meter values not success")
+                self.logger.warning("Flow charge, meter values not success")
         return await self.action_status_update("1", options)
 
     async def by_device_req_send(self, action, json_payload, valid_ids: typing.Sequence = None):
-        result = asyncio.get_running_loop().create_future()
         req_id = str(json_payload['id'])
         req = self.__socket_message(json_payload)
-        pendingList = self.__pending_by_device_reqs.get(req_id, None)
-        if pendingList is None:
-            pendingList = list()
-            self.__pending_by_device_reqs[req_id] = pendingList
-        pendingList.append(PendingReq(
-            valid_ids, lambda resp_json: self.__by_device_req_resp_ready(result, action, resp_json)))
-        self.__socketWriter.write(req.encode())
-        await self.__socketWriter.drain()
-        self.logger.debug(f"By Device Req ({action}):\n{req}")
+        pending = self.__pending_by_device_reqs
+        await self._in_flight_acquire()
         try:
-            return await asyncio.wait_for(result, timeout=self.response_timeout_seconds)
-        except asyncio.TimeoutError:
-            return self.by_device_req_resp_timeout()
+            result = asyncio.get_running_loop().create_future()
+            pending_req = PendingReq(valid_ids, lambda resp_json: self.__by_device_req_resp_ready(result, action, resp_json))
+            pending_key = pending.add(req_id, pending_req)
+            time_sent = self.metrics.request_sent(action)
+            try:
+                self.__socketWriter.write(req.encode())
+                await self.__socketWriter.drain()
+                self.logger.debug("By Device Req (%s):\n%s", action, req)
+                resp_json = await asyncio.wait_for(result, timeout=self.response_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.metrics.request_timed_out(action)
+                return self.by_device_req_resp_timeout()
+            except BaseException:
+                self.metrics.request_failed(action)
+                raise
+            finally:
+                pending.discard(pending_key)
+        finally:
+            self._in_flight_release()
+        self.metrics.request_responded(action, time_sent, resp_json.get('success', None) == '0')
+        return resp_json
 
     def __socket_message(self, payload_dict) -> str:
         req = f"""imei={self.deviceId}"""
@@ -298,9 +324,11 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
         return req
 
     def __by_device_req_resp_ready(self, future: asyncio.Future, action, resp_json):
-        resp = json.dumps(resp_json)
-        self.logger.debug(f"By Device Req ({action}) Resp:\n{resp}")
-        future.set_result(resp_json)
+        # Serialized only to be logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("By Device Req (%s) Resp:\n%s", action, json.dumps(resp_json))
+        if not future.done():
+            future.set_result(resp_json)
         pass
 
     def __raw_to_json(self, raw: str) -> typing.Any:
@@ -317,102 +345,86 @@ class DeviceEnsto(device_abstract.DeviceAbstract):
                 read_as_json = self.__raw_to_json(read_raw)
                 read_id = str(read_as_json['id'])
 
-                # Find possible pending req by its id (dict)
-                pending_req = None
-                pending_list = self.__pending_by_device_reqs.get(read_id, None)
-                if pending_list is not None and len(pending_list) > 0:
-                    pending_req = pending_list.pop()
-                # If not found, try finding in valid_ids
-                if pending_req is None:
-                    for fe_req_id, fe_pending_list in self.__pending_by_device_reqs.items():
-                        for fe_pending in fe_pending_list:
-                            if read_id in fe_pending.valid_ids:
-                                pending_req = fe_pending
-                                break
-                        if pending_req is not None:
-                            fe_pending_list.remove(pending_req)
-                            break
-
+                # Find possible pending req by its id, or else by its valid_ids
+                pending_req = self.__pending_by_device_reqs.pop(read_id)
                 if pending_req is not None:  # Received a response from middleware for a request we sent to it previously
                     pending_req.resp_callable(read_as_json)
                 elif not await self.by_middleware_req(read_id, read_as_json):
-                    self.logger.warning(f"Device Read, Unhandled, Message:\n{read_raw}")
+                    self.logger.warning("Device Read, Unhandled, Message:\n%s", read_raw)
         except asyncio.CancelledError:
             return
         pass
 
     async def by_middleware_req(self, req_action: str, req_payload: typing.Any) -> bool:
-        self.logger.debug(f"Device Read, Request, Message:\n{req_payload}")
-        resp_payload = None
-        if req_action in map(lambda x: str(x).lower(), [
-            "20",  # OutOfOrder
-            "11",  # ChargingRequestByServer
-            "17",  # HatchOpen
-            "42",  # Restart
-        ]):
-            resp_payload = {
-                "ack": "1"
-            }
-
-        # Server request charge start
-        if req_action == "11".lower():
-            req_scmd = str(req_payload["scmd"] if "scmd" in req_payload else -1)
-            if req_scmd == "1":
-                if not self.charge_can_start():
-                    del resp_payload["ack"]
-                    resp_payload["nack"] = "1"
-                else:
-                    options = {
-                        "idTag": req_payload["idtag"] if "idtag" in req_payload else None,
-                        "is_remote_started": True,
-                    }
-                    self.logger.info(f"Device, Read, Request, RemoteStart, Options: {json.dumps(options)}")
-                    asyncio.create_task(utility.run_with_delay(self.flow_charge(False, options), 2))
-            elif req_scmd == "0":
-                if not self.charge_can_stop(-1):
-                    del resp_payload["ack"]
-                    resp_payload["nack"] = "1"
-                else:
-                    asyncio.create_task(utility.run_with_delay(self.flow_charge_stop(), 2))
-            else:
-                del resp_payload["ack"]
-                resp_payload["nack"] = "1"
-
-        # "14", SettingsGprs
-        # "15", SettingsByServer
-        if req_action == "14".lower() or req_action == "15".lower():
-            # Try to change config
-            if ("gprs" in req_payload and str(req_payload["gprs"]) == "2") or ("settings" in req_payload and str(req_payload["settings"]) == "2"):
-                if "upd" in req_payload and str(req_payload["upd"]) == "1":
-                    resp_payload = {
-                        "upd": "1"
-                    }
-                else:
-                    resp_payload = {
-                        "ack": "1"
-                    }
-            else:  # Try to get config
-                resp_payload = {
-                    "type": "device-simulator",
-                    "server_host": self.server_host,
-                    "server_port": self.server_port,
-                    "identifier": self.deviceId,
-                }
-
-        # Restart
-        if req_action == "42".lower():
-            asyncio.create_task(utility.run_with_delay(self.re_initialize(), 2))
-
-        if resp_payload is not None:
-            resp_payload["id"] = req_action
-            resp = self.__socket_message(resp_payload)
-            self.__socketWriter.write(resp.encode())
-            await self.__socketWriter.drain()
-            self.logger.debug(f"Device Read, Request, Responded:\n{resp}")
-            return True
-        else:
-            self.logger.warning(f"Device Read, Request, Unknown or not supported: {req_action}")
+        self.logger.debug("Device Read, Request, Message:\n%s", req_payload)
+        resp = await self._middleware_handle(req_action, req_payload)
+        if resp is None or resp.payload is None:
+            self.logger.warning("Device Read, Request, Unknown or not supported: %s", req_action)
             return False
+        resp_payload = resp.payload
+        resp_payload["id"] = req_action
+        resp_raw = self.__socket_message(resp_payload)
+        self.__socketWriter.write(resp_raw.encode())
+        await self.__socketWriter.drain()
+        self.logger.debug("Device Read, Request, Responded:\n%s", resp_raw)
+        if resp.next_task is not None:
+            asyncio.create_task(resp.next_task)
+        return True
+
+    @middleware_handler(
+        "20",  # OutOfOrder
+        "17",  # HatchOpen
+    )
+    async def by_middleware_req_ack(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "ack": "1"
+        })
+
+    @middleware_handler("11")  # ChargingRequestByServer
+    async def by_middleware_req_charging_request(self, req_payload: typing.Any) -> MiddlewareResp:
+        req_scmd = str(req_payload["scmd"] if "scmd" in req_payload else -1)
+        if req_scmd == "1":  # Server request charge start
+            if not self.charge_can_start():
+                return MiddlewareResp({"nack": "1"})
+            options = {
+                "idTag": req_payload["idtag"] if "idtag" in req_payload else None,
+                "is_remote_started": True,
+            }
+            self.logger.info("Device, Read, Request, RemoteStart, Options: %s", json.dumps(options))
+            return MiddlewareResp({"ack": "1"}, utility.run_with_delay(self.flow_charge(False, options), 2))
+        if req_scmd == "0":
+            if not self.charge_can_stop(-1):
+                return MiddlewareResp({"nack": "1"})
+            return MiddlewareResp({"ack": "1"}, utility.run_with_delay(self.flow_charge_stop(), 2))
+        return MiddlewareResp({"nack": "1"})
+
+    @middleware_handler(
+        "14",  # SettingsGprs
+        "15",  # SettingsByServer
+    )
+    async def by_middleware_req_settings(self, req_payload: typing.Any) -> MiddlewareResp:
+        # Try to change config
+        if ("gprs" in req_payload and str(req_payload["gprs"]) == "2") or ("settings" in req_payload and str(req_payload["settings"]) == "2"):
+            if "upd" in req_payload and str(req_payload["upd"]) == "1":
+                return MiddlewareResp({
+                    "upd": "1"
+                })
+            return MiddlewareResp({
+                "ack": "1"
+            })
+        # Try to get config
+        return MiddlewareResp({
+            "type": "device-simulator",
+            "server_host": self.server_host,
+            "server_port": self.server_port,
+            "identifier": self.deviceId,
+        })
+
+    @middleware_handler("42")  # Restart
+    async def by_middleware_req_restart(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "ack": "1"
+        }, utility.run_with_delay(self.re_initialize(), 2))
 
     async def flow_charge_stop(self):
         self.charge_in_progress = False
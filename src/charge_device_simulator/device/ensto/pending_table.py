@@ -0,0 +1,76 @@
+import collections
+import itertools
+import typing
+
+from .pending_req import PendingReq
+
+
+class PendingTable:
+    """Requests sent on one connection and waiting for their response, indexed
+    both by their own id and by each of their `valid_ids` (other ids their
+    response may come with), so a received line is matched in O(1) however
+    many requests are in flight. Within an id, the oldest request is matched
+    first, as responses come in the order of the requests."""
+
+    def __init__(self):
+        self.__keys = itertools.count()
+        self.__by_id: typing.Dict[str, typing.OrderedDict[int, PendingReq]] = {}
+        self.__by_valid_id: typing.Dict[str, typing.OrderedDict[int, PendingReq]] = {}
+        self.__entries: typing.Dict[int, typing.Tuple[str, PendingReq]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def add(self, req_id: str, pending_req: PendingReq) -> int:
+        """Adds a request, returns the key to `discard` it with."""
+        key = next(self.__keys)
+        self.__entries[key] = (req_id, pending_req)
+        self.__index_add(self.__by_id, req_id, key, pending_req)
+        for valid_id in self.__valid_ids(pending_req):
+            self.__index_add(self.__by_valid_id, valid_id, key, pending_req)
+        return key
+
+    def pop(self, read_id: str) -> typing.Optional[PendingReq]:
+        """Removes and returns the oldest request a response with `read_id`
+        answers: by its own id first, then by its valid ids. None if none."""
+        index = self.__by_id.get(read_id, None)
+        if index is None:
+            index = self.__by_valid_id.get(read_id, None)
+            if index is None:
+                return None
+        key = next(iter(index))
+        pending_req = self.__entries[key][1]
+        self.discard(key)
+        return pending_req
+
+    def discard(self, key: int):
+        entry = self.__entries.pop(key, None)
+        # Already gone if it got its response
+        if entry is None:
+            return
+        req_id, pending_req = entry
+        self.__index_remove(self.__by_id, req_id, key)
+        for valid_id in self.__valid_ids(pending_req):
+            self.__index_remove(self.__by_valid_id, valid_id, key)
+
+    @staticmethod
+    def __valid_ids(pending_req: PendingReq) -> typing.Iterable[str]:
+        # A set, as a request listed twice under the same id is indexed once
+        return set(map(str, pending_req.valid_ids)) if pending_req.valid_ids is not None else ()
+
+    @staticmethod
+    def __index_add(index: typing.Dict[str, typing.OrderedDict[int, PendingReq]], req_id: str, key: int, pending_req: PendingReq):
+        entries = index.get(req_id, None)
+        if entries is None:
+            entries = collections.OrderedDict()
+            index[req_id] = entries
+        entries[key] = pending_req
+
+    @staticmethod
+    def __index_remove(index: typing.Dict[str, typing.OrderedDict[int, PendingReq]], req_id: str, key: int):
+        entries = index.get(req_id, None)
+        if entries is None:
+            return
+        entries.pop(key, None)
+        if len(entries) <= 0:
+            del index[req_id]
@@ -0,0 +1,88 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import typing
+import weakref
+
+
+class ScheduledCall:
+    __slots__ = ('when', 'callback', 'cancelled')
+
+    def __init__(self, when: float, callback: typing.Callable[[], typing.Any]):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FlowScheduler:
+    """Min-heap of timed callbacks, shared by all simulators running on the same
+    event loop. Only one loop timer is armed at any time (for the earliest
+    entry), so an idle fleet does not wake up at all and delays can be any
+    fraction of a second."""
+    __logger = logging.getLogger(__name__)
+    __shared: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FlowScheduler]' = weakref.WeakKeyDictionary()
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    @classmethod
+    def shared(cls) -> 'FlowScheduler':
+        loop = asyncio.get_running_loop()
+        result = cls.__shared.get(loop)
+        if result is None:
+            result = cls(loop)
+            cls.__shared[loop] = result
+        return result
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+        self.__loop = loop if loop is not None else asyncio.get_running_loop()
+        self.__heap: typing.List[typing.Tuple[float, int, ScheduledCall]] = []
+        self.__sequence = itertools.count()
+        self.__timer: typing.Optional[asyncio.TimerHandle] = None
+        self.__timer_when: float = 0
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def time(self) -> float:
+        return self.__loop.time()
+
+    def call_later(self, delay_seconds: float, callback: typing.Callable[[], typing.Any]) -> ScheduledCall:
+        result = ScheduledCall(self.time() + max(delay_seconds, 0), callback)
+        heapq.heappush(self.__heap, (result.when, next(self.__sequence), result))
+        self.__arm()
+        return result
+
+    def __arm(self):
+        while len(self.__heap) > 0 and self.__heap[0][2].cancelled:
+            heapq.heappop(self.__heap)
+        if len(self.__heap) <= 0:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            return
+        when = self.__heap[0][0]
+        if self.__timer is not None:
+            if self.__timer_when <= when:
+                return
+            self.__timer.cancel()
+        self.__timer = self.__loop.call_at(when, self.__fire)
+        self.__timer_when = when
+
+    def __fire(self):
+        self.__timer = None
+        now = self.time()
+        while len(self.__heap) > 0 and self.__heap[0][0] <= now:
+            _, _, call = heapq.heappop(self.__heap)
+            if call.cancelled:
+                continue
+            try:
+                call.callback()
+            except Exception:
+                self.logger.exception("Scheduled call failed")
+        self.__arm()
@@ -1,5 +1,5 @@
 class FrequentFlowOptions:
-    def __init__(self, delay_seconds: int, count: int):
+    def __init__(self, delay_seconds: float, count: int):
         self.delay_seconds = delay_seconds
         self.count = count
 
@@ -0,0 +1,57 @@
+import hashlib
+import itertools
+import random
+import typing
+import uuid
+
+
+class MessageIds:
+    """Source of the ids of the requests a device sends (and of OCPP 2.0.1
+    transaction ids), one per device.
+
+    + `counter` (default): a prefix per device followed by a counter, e.g.
+      `CP_0001-3fa2c91b-17`. The prefix is the device id (hashed when long) and
+      a random token of the process, so ids differ between devices and between
+      runs of the same device. Cheapest.
+    + `random`: 32 hex digits from a fast, non-cryptographic random source
+    + `uuid4`: `uuid.uuid4()`, reads os.urandom for every id
+
+    Ids stay within the 36 characters OCPP allows for both."""
+    kinds = ('counter', 'random', 'uuid4')
+    # Device ids longer than this are hashed into as many hex digits
+    device_id_length = 16
+    # Shared by the devices of this process, tells apart runs of the same devices
+    run_token = f"{random.getrandbits(32):08x}"
+
+    def __init__(self, kind: str = 'counter', prefix: typing.Optional[str] = None):
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown message ids: {kind}, supported: {', '.join(self.kinds)}")
+        self.kind = kind
+        if prefix is None:
+            prefix = f"{random.getrandbits(32):08x}-"
+        # Leaves room for a counter up to 10^10
+        self.prefix = prefix[:26]
+        self.__counter = itertools.count(1)
+        if kind == 'random':
+            self.next = self.__next_random
+        elif kind == 'uuid4':
+            self.next = self.__next_uuid4
+
+    @staticmethod
+    def prefix_of(device_id: str) -> str:
+        """Prefix of the counter ids of the device `device_id`."""
+        device_id = str(device_id)
+        if len(device_id) > MessageIds.device_id_length:
+            device_id = hashlib.blake2b(device_id.encode(), digest_size=MessageIds.device_id_length // 2).hexdigest()
+        return f"{device_id}-{MessageIds.run_token}-"
+
+    def next(self) -> str:
+        return f"{self.prefix}{next(self.__counter)}"
+
+    @staticmethod
+    def __next_random() -> str:
+        return f"{random.getrandbits(128):032x}"
+
+    @staticmethod
+    def __next_uuid4() -> str:
+        return str(uuid.uuid4())
@@ -0,0 +1,311 @@
+import bisect
+import time
+import typing
+
+
+class Histogram:
+    """Latency histogram (seconds) on fixed, log-spaced bucket bounds shared by
+    every instance, so histograms of different devices, fleets or processes
+    merge by adding bucket counts. Bounds grow by ~12% (20 per decade) from
+    100us to ~28h; percentiles are reported as the upper bound of their bucket
+    (clamped to the max value seen), i.e. with at most ~12% overestimation."""
+    bounds: typing.Tuple[float, ...] = tuple(1e-4 * 10 ** (i / 20) for i in range(181))
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        # One extra bucket for values above the last bound
+        self.counts: typing.List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total: float = 0
+        self.min: float = 0
+        self.max: float = 0
+
+    def record(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        if self.count <= 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: 'Histogram') -> 'Histogram':
+        if other.count <= 0:
+            return self
+        for index, count in enumerate(other.counts):
+            if count > 0:
+                self.counts[index] += count
+        self.min = other.min if self.count <= 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def percentile(self, percent: float) -> float:
+        if self.count <= 0:
+            return 0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(max(bound, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        # Sparse buckets keep summaries small enough to pass between processes
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {index: count for index, count in enumerate(self.counts) if count > 0},
+        }
+
+    @staticmethod
+    def from_dict(value: typing.Dict[str, typing.Any]) -> 'Histogram':
+        result = Histogram()
+        for index, count in value.get("buckets", {}).items():
+            result.counts[int(index)] += count
+        result.count = value.get("count", 0)
+        result.total = value.get("total", 0)
+        result.min = value.get("min", 0)
+        result.max = value.get("max", 0)
+        return result
+
+
+class ActionMetrics:
+    __slots__ = ('sent', 'responded', 'timed_out', 'rejected', 'failed', 'in_flight', 'latency')
+
+    def __init__(self):
+        self.sent = 0
+        self.responded = 0
+        self.timed_out = 0
+        self.rejected = 0
+        # Sent (or tried to) but failed before a response, e.g. connection lost
+        self.failed = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+
+    def merge(self, other: 'ActionMetrics') -> 'ActionMetrics':
+        self.sent += other.sent
+        self.responded += other.responded
+        self.timed_out += other.timed_out
+        self.rejected += other.rejected
+        self.failed += other.failed
+        self.in_flight += other.in_flight
+        self.latency.merge(other.latency)
+        return self
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "sent": self.sent,
+            "responded": self.responded,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "latency": self.latency.to_dict(),
+        }
+
+    @staticmethod
+    def from_dict(value: typing.Dict[str, typing.Any]) -> 'ActionMetrics':
+        result = ActionMetrics()
+        result.sent = value.get("sent", 0)
+        result.responded = value.get("responded", 0)
+        result.timed_out = value.get("timed_out", 0)
+        result.rejected = value.get("rejected", 0)
+        result.failed = value.get("failed", 0)
+        result.in_flight = value.get("in_flight", 0)
+        result.latency = Histogram.from_dict(value.get("latency", {}))
+        return result
+
+
+class DeviceMetrics:
+    """Per-action counters (sent, responded, timed out, rejected, failed,
+    in flight) and request-to-response latency of the requests a device sends,
+    plus how many times the device got re-initialized (reconnects), how many
+    failed connection attempts got retried, how long connecting took, how long
+    devices took to recover a lost connection and how long charge sessions lasted.
+
+    Every device records into its own instance, which also records into its
+    `parent` (a fleet, then `DeviceMetrics.process`: the aggregate of all
+    devices of this process). Aggregates of other sets of devices are built
+    with `merged`. Aggregates given a `window_seconds` also count responses per
+    wall-clock window (keyed by window start), to follow throughput over time."""
+    process: 'DeviceMetrics'
+    rejected_statuses = ('Rejected', 'Blocked', 'Expired', 'Invalid', 'ConcurrentTx', 'Unknown', 'NotSupported', 'NoCredit')
+
+    def __init__(self, parent: typing.Optional['DeviceMetrics'] = None, window_seconds: typing.Optional[float] = None):
+        self.actions: typing.Dict[str, ActionMetrics] = {}
+        self.reconnects = 0
+        self.connect_retries = 0
+        self.connect = Histogram()
+        # From losing the connection to being connected (and initialized) again
+        self.recover = Histogram()
+        self.sessions = Histogram()
+        self.window_seconds = window_seconds
+        self.windows: typing.Dict[float, int] = {}
+        self.parent = parent
+
+    def action(self, action: str) -> ActionMetrics:
+        result = self.actions.get(action)
+        if result is None:
+            result = ActionMetrics()
+            self.actions[action] = result
+        return result
+
+    def request_sent(self, action: str) -> float:
+        """Counts a sent request, returns its start time to pass to `request_responded`."""
+        metrics = self
+        while metrics is not None:
+            e = metrics.action(action)
+            e.sent += 1
+            e.in_flight += 1
+            metrics = metrics.parent
+        return time.perf_counter()
+
+    def request_responded(self, action: str, time_sent: float, rejected: bool = False):
+        latency = time.perf_counter() - time_sent
+        metrics = self
+        while metrics is not None:
+            e = metrics.action(action)
+            e.responded += 1
+            e.in_flight -= 1
+            if rejected:
+                e.rejected += 1
+            e.latency.record(latency)
+            if metrics.window_seconds is not None:
+                window = time.time() // metrics.window_seconds * metrics.window_seconds
+                metrics.windows[window] = metrics.windows.get(window, 0) + 1
+            metrics = metrics.parent
+
+    def request_timed_out(self, action: str):
+        metrics = self
+        while metrics is not None:
+            e = metrics.action(action)
+            e.timed_out += 1
+            e.in_flight -= 1
+            metrics = metrics.parent
+
+    def request_failed(self, action: str):
+        metrics = self
+        while metrics is not None:
+            e = metrics.action(action)
+            e.failed += 1
+            e.in_flight -= 1
+            metrics = metrics.parent
+
+    def reconnected(self):
+        metrics = self
+        while metrics is not None:
+            metrics.reconnects += 1
+            metrics = metrics.parent
+
+    def connect_retried(self):
+        metrics = self
+        while metrics is not None:
+            metrics.connect_retries += 1
+            metrics = metrics.parent
+
+    def recovered(self, time_start: float):
+        """Records a connection recovered, lost at `time_start` (`time.perf_counter()`)."""
+        duration = time.perf_counter() - time_start
+        metrics = self
+        while metrics is not None:
+            metrics.recover.record(duration)
+            metrics = metrics.parent
+
+    def connected(self, time_start: float):
+        """Records a connection set up since `time_start` (`time.perf_counter()`)."""
+        duration = time.perf_counter() - time_start
+        metrics = self
+        while metrics is not None:
+            metrics.connect.record(duration)
+            metrics = metrics.parent
+
+    def session_ended(self, duration_seconds: float):
+        metrics = self
+        while metrics is not None:
+            metrics.sessions.record(duration_seconds)
+            metrics = metrics.parent
+
+    @classmethod
+    def is_rejected(cls, payload: typing.Any) -> bool:
+        """True when a response payload carries a refusing status, either on its
+        own (`status`) or in its id tag/token info (OCPP 1.x/2.0.1)."""
+        for key in ('status', 'idTagInfo', 'idTokenInfo'):
+            try:
+                value = payload[key]
+            except (KeyError, IndexError, TypeError, AttributeError):
+                continue
+            if key != 'status':
+                try:
+                    value = value['status']
+                except (KeyError, IndexError, TypeError, AttributeError):
+                    continue
+            if value is not None and str(value) in cls.rejected_statuses:
+                return True
+        return False
+
+    def totals(self) -> ActionMetrics:
+        result = ActionMetrics()
+        for e in self.actions.values():
+            result.merge(e)
+        return result
+
+    def merge(self, other: 'DeviceMetrics') -> 'DeviceMetrics':
+        for action, e in other.actions.items():
+            self.action(action).merge(e)
+        self.reconnects += other.reconnects
+        self.connect_retries += other.connect_retries
+        self.connect.merge(other.connect)
+        self.recover.merge(other.recover)
+        self.sessions.merge(other.sessions)
+        for window, count in other.windows.items():
+            self.windows[window] = self.windows.get(window, 0) + count
+        if self.window_seconds is None:
+            self.window_seconds = other.window_seconds
+        return self
+
+    @staticmethod
+    def merged(items: typing.Iterable['DeviceMetrics']) -> 'DeviceMetrics':
+        result = DeviceMetrics()
+        for e in items:
+            result.merge(e)
+        return result
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "reconnects": self.reconnects,
+            "connect_retries": self.connect_retries,
+            "actions": {action: e.to_dict() for action, e in self.actions.items()},
+            "connect": self.connect.to_dict(),
+            "recover": self.recover.to_dict(),
+            "sessions": self.sessions.to_dict(),
+            "window_seconds": self.window_seconds,
+            "windows": dict(self.windows),
+        }
+
+    @staticmethod
+    def from_dict(value: typing.Dict[str, typing.Any]) -> 'DeviceMetrics':
+        result = DeviceMetrics()
+        result.reconnects = value.get("reconnects", 0)
+        result.connect_retries = value.get("connect_retries", 0)
+        for action, e in value.get("actions", {}).items():
+            result.actions[action] = ActionMetrics.from_dict(e)
+        result.connect = Histogram.from_dict(value.get("connect", {}))
+        result.recover = Histogram.from_dict(value.get("recover", {}))
+        result.sessions = Histogram.from_dict(value.get("sessions", {}))
+        result.window_seconds = value.get("window_seconds")
+        result.windows = {float(k): v for k, v in value.get("windows", {}).items()}
+        return result
+
+
+DeviceMetrics.process = DeviceMetrics(window_seconds=10)
@@ -0,0 +1,48 @@
+import typing
+
+
+class MiddlewareResp(typing.NamedTuple):
+    """What a handler answers to a request of the middleware."""
+    payload: typing.Any
+    # Started once the response got sent, e.g. the message a TriggerMessage asks for
+    next_task: typing.Optional[typing.Coroutine] = None
+
+
+# Called with the device and the payload of the request. Returns a MiddlewareResp, just the
+# response payload, or None if the request is not supported (not responded).
+MiddlewareHandler = typing.Callable[[typing.Any, typing.Any], typing.Awaitable[typing.Any]]
+
+
+def middleware_handler(*actions: str):
+    """Marks a device method as the handler of the middleware requests
+    `actions` (case-insensitive), see `handlers_of`."""
+    def decorate(func):
+        func.middleware_actions = tuple(action.lower() for action in actions)
+        return func
+    return decorate
+
+
+def handlers_of(cls: type) -> typing.Dict[str, MiddlewareHandler]:
+    """Handlers of a device class by lowercase action, from the methods marked
+    with `middleware_handler` in it and its base classes. A subclass extends
+    the table by marking methods of its own, or overrides a handler by
+    overriding its method."""
+    names: typing.Dict[str, str] = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            for action in getattr(value, 'middleware_actions', ()):
+                names[action] = name
+    return {action: getattr(cls, name) for action, name in names.items()}
+
+
+def static_handler(payload: typing.Any) -> MiddlewareHandler:
+    """Handler always responding with (a copy of) `payload`."""
+    async def handler(device, req_payload):
+        return MiddlewareResp(dict(payload) if isinstance(payload, dict) else payload)
+    return handler
+
+
+def resp_of(result: typing.Any) -> typing.Optional[MiddlewareResp]:
+    if result is None or isinstance(result, MiddlewareResp):
+        return result
+    return MiddlewareResp(result)
@@ -4,19 +4,22 @@ import json
 import logging
 import math
 import sys
+import time
 import typing
-import uuid
 import urllib.parse
-import ssl
-import certifi
 
 import aioconsole
 import websockets
+from websockets.protocol import State
 
 from .. import utility
 from ..abstract import DeviceAbstract
 from ..error_reasons import ErrorReasons
+from ..middleware_handlers import MiddlewareResp, middleware_handler
+from .json_codec import JsonCodec
 from .message_types import MessageTypes
+from .pending_requests import PendingRequests
+from .tls_contexts import TlsContexts
 from ...model.error_message import ErrorMessage
 
 if sys.platform != "win32":
@@ -33,7 +36,8 @@ class AbstractDeviceOcppJ(DeviceAbstract):
     _ws: websockets.WebSocketClientProtocol = None
     __loop_internal_task: asyncio.Task = None
     __ws_close_task: asyncio.Task = None
-    __pending_by_device_reqs: typing.Dict[str, typing.Callable[[typing.Any], None]] = {}
+    # Shared by all devices, unless set per device (config `json_codec`)
+    codec: JsonCodec = JsonCodec.create()
 
     def __init__(self, device_id):
         super().__init__(device_id)
@@ -47,10 +51,25 @@ class AbstractDeviceOcppJ(DeviceAbstract):
         self.spec_chargePointModel = None
         self.spec_chargePointVendor = None
         self.spec_chargePointSerialNumber = None
+        # Replaced on each connection
+        self.__pending_by_device_reqs = PendingRequests()
+        # wss:// only: CA bundle to verify the server (certifi's by default), client certificate for mutual TLS
+        self.tls_ca_file: typing.Optional[str] = None
+        self.tls_cert_file: typing.Optional[str] = None
+        self.tls_key_file: typing.Optional[str] = None
+        self.tls_key_password: typing.Optional[str] = None
 
     @property
     def logger(self) -> logging.Logger:
-        return self.__logger
+        return self._device_logger(self.__logger)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._ws is not None and getattr(self._ws, 'state', None) is State.OPEN
+
+    @property
+    def requests_pending(self) -> int:
+        return len(self.__pending_by_device_reqs)
 
     async def initialize(self) -> bool:
         try:
@@ -58,27 +77,33 @@ class AbstractDeviceOcppJ(DeviceAbstract):
             logging.getLogger('websockets.server').setLevel(logging.WARNING)
             logging.getLogger('websockets.protocol').setLevel(logging.WARNING)
             server_url = f"{self.server_address}/{urllib.parse.quote(self.deviceId)}"
-            self.logger.info(f"Trying to connect.\nURL: {server_url}\nClient supported protocols: {json.dumps(self.protocols)}")
+            self.logger.info("Trying to connect.\nURL: %s\nClient supported protocols: %s", server_url, json.dumps(self.protocols))
+            time_connect = time.perf_counter()
             if server_url.startswith("wss://"):
-                ssl_context = ssl.create_default_context(cafile=certifi.where())
+                ssl_context = TlsContexts.get(self.tls_ca_file, self.tls_cert_file, self.tls_key_file, self.tls_key_password)
                 self._ws = await websockets.connect(
                     server_url,
                     subprotocols=[websockets.Subprotocol(p) for p in self.protocols],
                     ssl=ssl_context
                 )
+                if ssl_context.session_store(self._ws.transport.get_extra_info('ssl_object')):
+                    self.logger.debug("TLS session resumed")
             else:
                 self._ws = await websockets.connect(
                     server_url,
                     subprotocols=[websockets.Subprotocol(p) for p in self.protocols]
                 )
-            self.logger.info(f"Connected with protocol: {self._ws.subprotocol}")
+            self.metrics.connected(time_connect)
+            # Requests still waiting on a previous connection time out on their own table
+            self.__pending_by_device_reqs = PendingRequests()
+            self.logger.info("Connected with protocol: %s", self._ws.subprotocol)
             self.__loop_internal_task = asyncio.create_task(self.__loop_internal())
             self.__ws_close_task = asyncio.create_task(self.__ws_close())
 
             await asyncio.sleep(1)
 
             if self.register_on_initialize:
-                await self.action_register()
+                await self.action_register_rate_limited()
             await self.action_heart_beat()
             return True
         except ValueError as err:
@@ -108,20 +133,20 @@ class AbstractDeviceOcppJ(DeviceAbstract):
 
     async def action_heart_beat(self) -> bool:
         action = "HeartBeat"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         if await self.by_device_req_send(action, {}) is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_data_transfer(self, options: dict) -> bool:
         action = "DataTransfer"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = options
         resp_json = await self.by_device_req_send(action, json_payload)
         if resp_json is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     def fill_missing_options_charge_start(self, options):
@@ -146,36 +171,36 @@ class AbstractDeviceOcppJ(DeviceAbstract):
 
     async def flow_heartbeat(self) -> bool:
         log_title = self.flow_heartbeat.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_heart_beat():
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_authorize(self, options: dict) -> bool:
         log_title = self.flow_authorize.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_authorize(options):
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_status_preparing(self) -> bool:
         log_title = self.flow_status_preparing.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if self.charge_in_progress:
-            self.logger.info(f"Flow {log_title} Skipped, charge in progress")
+            self.logger.info("Flow %s Skipped, charge in progress", log_title)
         else:
             self.is_preparing = True
             if not await self.action_status_update("Preparing", {}):
                 self.is_preparing = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_charge(self, auto_stop: bool, options: dict) -> bool:
         log_title = self.flow_charge.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         self._reset_charge_cycle_options(options)
         if not await self.action_authorize(options):
             self.charge_in_progress = False
@@ -210,7 +235,7 @@ class AbstractDeviceOcppJ(DeviceAbstract):
             if not await self.action_status_update("Available", options):
                 self.charge_in_progress = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         self.charge_in_progress = False
         return True
 
@@ -220,59 +245,91 @@ class AbstractDeviceOcppJ(DeviceAbstract):
         return await self.action_meter_value(options)
 
     async def by_device_req_send(self, action, json_payload) -> typing.Any:
-        req_id = str(uuid.uuid4())
-        req = f"""[{MessageTypes.Req.value},"{req_id}","{action}",{json.dumps(json_payload)}]"""
+        req_id = self.message_ids.next()
+        req = self.codec.dumps([MessageTypes.Req.value, req_id, action, json_payload])
         return await self.by_device_req_send_raw(req, action, req_id)
 
     async def by_device_req_send_raw(self, raw, action, req_id=None) -> typing.Any:
-        result = asyncio.get_running_loop().create_future()
         if req_id is None:
-            req_id = str(uuid.uuid4())
-        self.__pending_by_device_reqs[req_id] = lambda resp_json: self.__by_device_req_resp_ready(result, action, resp_json)
-        await self._ws.send(raw)
-        self.logger.debug(f"By Device Req ({action}):\n{raw}")
+            req_id = self.__raw_req_id(raw)
+        pending = self.__pending_by_device_reqs
+        await self._in_flight_acquire()
         try:
-            return await asyncio.wait_for(result, timeout=self.response_timeout_seconds)
-        except asyncio.TimeoutError:
-            return self.by_device_req_resp_timeout()
-
-    def __by_device_req_resp_ready(self, future: asyncio.Future, action, resp_json):
-        resp = json.dumps(resp_json)
-        self.logger.debug(f"By Device Req ({action}) Resp:\n{resp}")
-        future.set_result(resp_json)
-        pass
+            result = pending.add(req_id)
+            time_sent = self.metrics.request_sent(action)
+            try:
+                await self._ws_send(raw)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("By Device Req (%s):\n%s", action, self.frame_str(raw))
+                resp_json = await asyncio.wait_for(result, timeout=self.response_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.metrics.request_timed_out(action)
+                return self.by_device_req_resp_timeout()
+            except BaseException:
+                self.metrics.request_failed(action)
+                raise
+            finally:
+                pending.discard(req_id)
+        finally:
+            self._in_flight_release()
+        # Serialized again only to be logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("By Device Req (%s) Resp:\n%s", action, self.frame_str(self.codec.dumps(resp_json)))
+        if resp_json[0] == MessageTypes.RespError.value:
+            self.metrics.request_responded(action, time_sent, True)
+            self.logger.warning("By Device Req (%s) CallError: %s", action, ' '.join(str(v) for v in resp_json[2:4]))
+            return None
+        self.metrics.request_responded(
+            action, time_sent, len(resp_json) > 2 and self.metrics.is_rejected(resp_json[2]))
+        return resp_json
+
+    def __raw_req_id(self, raw: typing.Union[str, bytes]) -> str:
+        # A raw request carries its own id, its response is matched by it
+        try:
+            return str(self.codec.loads(raw)[1])
+        except (ValueError, TypeError, IndexError, KeyError):
+            return self.message_ids.next()
+
+    async def _ws_send(self, raw: typing.Union[str, bytes]):
+        if isinstance(raw, str):
+            await self._ws.send(raw)
+        else:
+            # Encoded frames are UTF-8 text, OCPP-J does not allow binary frames
+            await self._ws.send(raw, text=True)
+
+    @staticmethod
+    def frame_str(raw: typing.Union[str, bytes]) -> str:
+        return raw if isinstance(raw, str) else raw.decode()
 
     async def __loop_internal(self):
         try:
             while True:
                 read_raw = await self._ws.recv()
-                read_as_json = json.loads(read_raw)
+                read_as_json = self.codec.loads(read_raw)
                 if len(read_as_json) < 1:
-                    self.logger.warning(f"Device Read, Invalid, Message:\n{read_raw}")
+                    self.logger.warning("Device Read, Invalid, Message:\n%s", read_raw)
                     continue
 
                 read_type = int(read_as_json[0])
                 if read_type == MessageTypes.Req.value:  # Received a request initiated from middleware
                     if len(read_as_json) < 3:
-                        self.logger.warning(f"Device Read, Request, Invalid, Message:\n{read_raw}")
+                        self.logger.warning("Device Read, Request, Invalid, Message:\n%s", read_raw)
                         continue
-                    self.logger.debug(f"Device Read, Request, Message:\n{read_raw}")
+                    self.logger.debug("Device Read, Request, Message:\n%s", read_raw)
                     req_id = str(read_as_json[1])
                     req_action = str(read_as_json[2]).lower()
                     req_payload = read_as_json[3]
                     await self.by_middleware_req(req_id, req_action, req_payload)
-                elif read_type == MessageTypes.Resp.value:  # Received a response from middleware for a request we sent to it previously
+                # Received a response (or CallError) from middleware for a request we sent to it previously
+                elif read_type == MessageTypes.Resp.value or read_type == MessageTypes.RespError.value:
                     if len(read_as_json) < 2:
-                        self.logger.warning(f"Device Read, Response, Invalid, Message:\n{read_raw}")
+                        self.logger.warning("Device Read, Response, Invalid, Message:\n%s", read_raw)
                         continue
                     read_resp_id = str(read_as_json[1])
-                    read_resp_callable = self.__pending_by_device_reqs.pop(read_resp_id, None)
-                    if read_resp_callable is None:
-                        self.logger.warning(f"Device Read, Response, Not found the request, Id: {read_resp_id}, Message:\n{read_raw}")
-                        continue
-                    read_resp_callable(read_as_json)
+                    if not self.__pending_by_device_reqs.resolve(read_resp_id, read_as_json):
+                        self.logger.warning("Device Read, Response, Not found the request, Id: %s, Message:\n%s", read_resp_id, read_raw)
                 else:
-                    self.logger.debug(f"Device Read, Type Unknown, Message:\n{read_raw}")
+                    self.logger.debug("Device Read, Type Unknown, Message:\n%s", read_raw)
         except asyncio.CancelledError:
             return
         pass
@@ -280,124 +337,119 @@ class AbstractDeviceOcppJ(DeviceAbstract):
     async def by_middleware_req(self, req_id: str, req_action: str, req_payload: typing.Any):
         # We must not block the event loop here for anything beside sending a response
         # since this is the main event loop for the device checking for websocket messages
-        # If we need to do something that blocks or takes time, we must create a new task for it
-        next_async_task = None
-        resp_payload = None
-        if req_action in map(lambda x: str(x).lower(), [
-            "ClearCache",
-            "ChangeAvailability",
-            "RemoteStartTransaction",
-            "RemoteStopTransaction",
-            "SetChargingProfile",
-            "ChangeConfiguration",
-            "UnlockConnector",
-            "UpdateFirmware",
-            "SendLocalList",
-            "Reset",
-            "DataTransfer",
-            "RequestStartTransaction",
-            "RequestStopTransaction"
-        ]):
-            resp_payload = {
-                "status": "Accepted"
-            }
-        elif req_action == "GetConfiguration".lower():
-            resp_payload = {
-                "configurationKey": [
-                    {"key": "type", "value": "device-simulator", "readonly": "true"},
-                    {"key": "server_address", "value": self.server_address, "readonly": "true"},
-                    {"key": "identifier", "value": self.deviceId, "readonly": "false"},
-                ]
-            }
-        elif req_action == "GetDiagnostics".lower():
-            resp_payload = {
-                "fileName": "fake_file_name.log"
-            }
-
-        if req_action == "TriggerMessage".lower():
-            if req_payload["requestedMessage"] == "MeterValues":
-                options = {
-                    "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
-                }
-                resp_payload = {
-                    "status": "Accepted"
-                }
-                next_async_task = self.action_meter_value(options)
-            if req_payload["requestedMessage"] == "BootNotification":
-                resp_payload = {
-                    "status": "Accepted"
-                }
-                next_async_task = self.action_register()
-            if req_payload["requestedMessage"] == "Heartbeat":
-                resp_payload = {
-                    "status": "Accepted"
-                }
-                next_async_task = await self.action_heart_beat()
-            if req_payload["requestedMessage"] == "StatusNotification":
-                options = {
-                    "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
-                }
-                resp_payload = {
-                    "status": "Accepted"
-                }
-                if self.charge_in_progress:
-                    next_async_task = await self.action_status_update("Charging", options)
-                elif self.is_preparing:
-                    next_async_task = await self.action_status_update("Preparing", options)
-                else:
-                    next_async_task = await self.action_status_update("Available", options)
-        if req_action == "RemoteStartTransaction".lower():
-            if not self.charge_can_start():
-                resp_payload["status"] = "Rejected"
-            else:
-                options = {
-                    "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
-                    "idTag": req_payload["idTag"] if "idTag" in req_payload else "-",
-                }
-                self.logger.info(f"Device, Read, Request, RemoteStart, Options: {json.dumps(options)}")
-                next_async_task = utility.run_with_delay(self.flow_charge(False, options), 2)
-
-        if req_action == "RemoteStopTransaction".lower():
-            if not self.charge_can_stop(req_payload["transactionId"] if "transactionId" in req_payload else 0):
-                resp_payload["status"] = "Rejected"
-            else:
-                next_async_task = utility.run_with_delay(self.flow_charge_stop(), 2)
-
-        if req_action == "ReserveNow".lower():
-            reserve_options: typing.Dict[str, typing.Any] = self._reserve_now_options_from_payload(req_payload)
-            if reserve_options.get("connectorId") is None:
-                resp_payload = {"status": "Rejected"}
-            elif not self.reserve_can_accept(reserve_options.get("connectorId")):
-                resp_payload = {"status": "Occupied"}
-            else:
-                resp_payload = {"status": "Accepted"}
-                next_async_task = utility.run_with_delay(self.flow_reserve(reserve_options), 2)
-
-        if req_action == "CancelReservation".lower():
-            cancel_reservation_id: typing.Optional[int] = req_payload.get("reservationId")
-            if not self.reserve_can_cancel(cancel_reservation_id):
-                resp_payload = {"status": "Rejected"}
-            else:
-                resp_payload = {"status": "Accepted"}
-                next_async_task = utility.run_with_delay(
-                    self.flow_reservation_cancel(cancel_reservation_id), 2)
-
-        if req_action == "Reset".lower():
-            next_async_task = utility.run_with_delay(self.re_initialize(), 2)
-
-        if resp_payload is None:
-            self.logger.warning(f"Device Read, Request, Unknown or not supported: {req_action}")
+        # If we need to do something that blocks or takes time, handlers return it as the next task
+        resp = await self._middleware_handle(req_action, req_payload)
+        if resp is None or resp.payload is None:
+            self.logger.warning("Device Read, Request, Unknown or not supported: %s", req_action)
             return
-        await self.by_middleware_req_response_ready(req_id, resp_payload)
-        if next_async_task is not None:
-            asyncio.create_task(next_async_task)
+        await self.by_middleware_req_response_ready(req_id, resp.payload)
+        if resp.next_task is not None:
+            asyncio.create_task(resp.next_task)
+
+    @middleware_handler(
+        "ClearCache",
+        "ChangeAvailability",
+        "SetChargingProfile",
+        "ChangeConfiguration",
+        "UnlockConnector",
+        "UpdateFirmware",
+        "SendLocalList",
+        "DataTransfer",
+        "RequestStartTransaction",
+        "RequestStopTransaction",
+    )
+    async def by_middleware_req_accept(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "status": "Accepted"
+        })
+
+    @middleware_handler("GetConfiguration")
+    async def by_middleware_req_get_configuration(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "configurationKey": [
+                {"key": "type", "value": "device-simulator", "readonly": "true"},
+                {"key": "server_address", "value": self.server_address, "readonly": "true"},
+                {"key": "identifier", "value": self.deviceId, "readonly": "false"},
+            ]
+        })
+
+    @middleware_handler("GetDiagnostics")
+    async def by_middleware_req_get_diagnostics(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "fileName": "fake_file_name.log"
+        })
+
+    @middleware_handler("TriggerMessage")
+    async def by_middleware_req_trigger_message(self, req_payload: typing.Any) -> typing.Optional[MiddlewareResp]:
+        # The requested message is sent after the response, its own response is read by the loop we run on
+        requested_message = req_payload["requestedMessage"]
+        options = {
+            "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
+        }
+        if requested_message == "MeterValues":
+            next_async_task = self.action_meter_value(options)
+        elif requested_message == "BootNotification":
+            next_async_task = self.action_register()
+        elif requested_message == "Heartbeat":
+            next_async_task = self.action_heart_beat()
+        elif requested_message == "StatusNotification":
+            if self.charge_in_progress:
+                next_async_task = self.action_status_update("Charging", options)
+            elif self.is_preparing:
+                next_async_task = self.action_status_update("Preparing", options)
+            else:
+                next_async_task = self.action_status_update("Available", options)
+        else:
+            return None
+        return MiddlewareResp({
+            "status": "Accepted"
+        }, next_async_task)
+
+    @middleware_handler("RemoteStartTransaction")
+    async def by_middleware_req_remote_start_transaction(self, req_payload: typing.Any) -> MiddlewareResp:
+        if not self.charge_can_start():
+            return MiddlewareResp({"status": "Rejected"})
+        options = {
+            "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
+            "idTag": req_payload["idTag"] if "idTag" in req_payload else "-",
+        }
+        self.logger.info("Device, Read, Request, RemoteStart, Options: %s", json.dumps(options))
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_charge(False, options), 2))
+
+    @middleware_handler("RemoteStopTransaction")
+    async def by_middleware_req_remote_stop_transaction(self, req_payload: typing.Any) -> MiddlewareResp:
+        if not self.charge_can_stop(req_payload["transactionId"] if "transactionId" in req_payload else 0):
+            return MiddlewareResp({"status": "Rejected"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_charge_stop(), 2))
+
+    @middleware_handler("ReserveNow")
+    async def by_middleware_req_reserve_now(self, req_payload: typing.Any) -> MiddlewareResp:
+        reserve_options: typing.Dict[str, typing.Any] = self._reserve_now_options_from_payload(req_payload)
+        if reserve_options.get("connectorId") is None:
+            return MiddlewareResp({"status": "Rejected"})
+        if not self.reserve_can_accept(reserve_options.get("connectorId")):
+            return MiddlewareResp({"status": "Occupied"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_reserve(reserve_options), 2))
+
+    @middleware_handler("CancelReservation")
+    async def by_middleware_req_cancel_reservation(self, req_payload: typing.Any) -> MiddlewareResp:
+        cancel_reservation_id: typing.Optional[int] = req_payload.get("reservationId")
+        if not self.reserve_can_cancel(cancel_reservation_id):
+            return MiddlewareResp({"status": "Rejected"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(
+            self.flow_reservation_cancel(cancel_reservation_id), 2))
+
+    @middleware_handler("Reset")
+    async def by_middleware_req_reset(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.re_initialize(), 2))
 
     async def by_middleware_req_response_ready(self, req_id, resp_payload):
         if resp_payload is None:
             return
-        resp = f"""[{MessageTypes.Resp.value},"{req_id}",{json.dumps(resp_payload)}]"""
-        await self._ws.send(resp)
-        self.logger.debug(f"Device Read, Request, Responded:\n{resp}")
+        resp = self.codec.dumps([MessageTypes.Resp.value, req_id, resp_payload])
+        await self._ws_send(resp)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Device Read, Request, Responded:\n%s", self.frame_str(resp))
 
     async def flow_charge_stop(self):
         self.charge_in_progress = False
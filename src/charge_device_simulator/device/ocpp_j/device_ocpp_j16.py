@@ -21,7 +21,7 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
 
     async def action_register(self) -> bool:
         action = "BootNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {}
         if self.spec_chargePointVendor is not None:
             json_payload['chargePointVendor'] = self.spec_chargePointVendor
@@ -47,7 +47,7 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
                 f"Action {action} Response Failed:\n{json.dumps(resp_json)}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_status_update(self, status, options: dict) -> bool:
@@ -55,7 +55,7 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
 
     async def action_status_update_ocpp(self, status, errorCode, options: dict) -> bool:
         action = "StatusNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             "connectorId": options.get("connectorId", 1),
             "errorCode": errorCode,
@@ -63,12 +63,12 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
         }
         if await self.by_device_req_send(action, json_payload) is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_authorize(self, options: dict) -> bool:
         action = "Authorize"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         id_tag = options.get("idTag", "-")
         key_name = "idTagInfo"
         json_payload = {
@@ -86,13 +86,13 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
             "id_tag": id_tag,
             "parent_id_tag": id_tag_info.get("parentIdTag"),
         }
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_start(self, options: dict) -> bool:
         self.fill_missing_options_charge_start(options)
         action = "StartTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         key_name = "idTagInfo"
         id_tag = options.get("idTag", "-")
         conenctor_id = options.get("connectorId", 1)
@@ -112,12 +112,12 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
             return False
         self.charge_id = resp_json[2]['transactionId']
         self.charge_in_progress = True
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_meter_value(self, options: dict, meter_value: int = None, time_stamp: str = None) -> bool:
         action = "MeterValues"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         conenctor_id = options.get("connectorId", 1)
         json_payload = {
             "connectorId": conenctor_id,
@@ -136,13 +136,13 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
         resp_json = await self.by_device_req_send(action, json_payload)
         if resp_json is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_stop(self, options: dict) -> bool:
         self.fill_missing_options_charge_stop(options)
         action = "StopTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         key_name = "idTagInfo"
         id_tag = options.get("idTag", "-")
         json_payload = {
@@ -158,7 +158,7 @@ class DeviceOcppJ16(AbstractDeviceOcppJ):
                 f"Action {action} Response Failed:\n{json.dumps(resp_json)}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def loop_interactive_custom(self):
@@ -2,7 +2,6 @@ import datetime
 import json
 import sys
 import typing
-import uuid
 
 from .abstract_device_ocpp_j import AbstractDeviceOcppJ
 from .. import utility
@@ -24,7 +23,7 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
     
     async def action_register(self) -> bool:
         action = "BootNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {}
         json_payload['chargingStation'] = {}
         json_payload['reason'] = 'RemoteReset'
@@ -50,7 +49,7 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
                 f"Action {action} Response Failed:\n{json.dumps(resp_json)}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_status_update(self, status, options: dict) -> bool:
@@ -58,7 +57,7 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
 
     async def action_status_update_ocpp(self, status, options: dict) -> bool:
         action = "StatusNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         json_payload = {
             "connectorId": options.get("connectorId", 1),
             "evseId": options.get("evseId", 1),
@@ -67,12 +66,12 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
         }
         if await self.by_device_req_send(action, json_payload) is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_authorize(self, options: dict) -> bool:
         action = "Authorize"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         id_tag = options.get("idTag", "-")
         json_payload = {
             "idToken": {
@@ -94,17 +93,17 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
             "id_tag": id_tag,
             "parent_id_tag": group_id_token.get("idToken"),
         }
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_start(self, options: dict) -> bool:
         self.fill_missing_options_charge_start(options)
         action = "StartTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         id_tag = options.get("idTag", "-")
         evse_id = options.get("evseId", 1)
         conenctor_id = options.get("connectorId", 1)
-        transaction_id = str(uuid.uuid4())
+        transaction_id = self.message_ids.next()
         action = "TransactionEvent"
         json_payload = {
             "eventType": "Started",
@@ -148,12 +147,12 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
             return False
         self.charge_id = transaction_id
         self.charge_in_progress = True
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_meter_value(self, options: dict, meter_value: int = None, time_stamp: datetime = None) -> bool:
         action = "MeterValues"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         evse_id = options.get("evseId", 1)
         conenctor_id = options.get("connectorId", 1)
         self.charge_seq_no += 1
@@ -191,13 +190,13 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
         resp_json = await self.by_device_req_send(action, json_payload)
         if resp_json is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_stop(self, options: dict) -> bool:
         self.fill_missing_options_charge_stop(options)
         action = "StopTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         id_tag = options.get("idTag", "-")
         evse_id = options.get("evseId", 1)
         conenctor_id = options.get("connectorId", 1)
@@ -244,25 +243,25 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
                 f"Action {action} Response Failed:\n{json.dumps(resp_json)}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def flow_status_preparing(self) -> bool:
         log_title = self.flow_status_preparing.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if self.charge_in_progress:
-            self.logger.info(f"Flow {log_title} Skipped, charge in progress")
+            self.logger.info("Flow %s Skipped, charge in progress", log_title)
         else:
             self.is_preparing = True
             if not await self.action_status_update("Occupied", {}):
                 self.is_preparing = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_charge(self, auto_stop: bool, options: dict) -> bool:
         log_title = self.flow_charge.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         self._reset_charge_cycle_options(options)
         if not await self.action_authorize(options):
             self.charge_in_progress = False
@@ -291,7 +290,7 @@ class DeviceOcppJ201(AbstractDeviceOcppJ):
             if not await self.action_status_update("Available", options):
                 self.charge_in_progress = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         self.charge_in_progress = False
         return True
 
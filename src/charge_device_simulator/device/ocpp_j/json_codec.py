@@ -0,0 +1,55 @@
+import importlib
+import json
+import typing
+
+
+class JsonCodec:
+    """Encodes whole OCPP-J frames to UTF-8 bytes in one call and decodes
+    received frames. This one uses the standard library; `create` picks the
+    fastest backend installed (orjson, then ujson), which are optional."""
+    name = 'json'
+    backends = ('orjson', 'ujson', 'json')
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+    def loads(self, raw: typing.Union[str, bytes]) -> typing.Any:
+        return json.loads(raw)
+
+    @staticmethod
+    def create(name: typing.Optional[str] = None) -> 'JsonCodec':
+        """The codec of backend `name`, or of the first installed backend if None.
+        Raises ValueError for an unknown backend, ImportError if it is not installed."""
+        if name is not None and name not in JsonCodec.backends:
+            raise ValueError(f"Unknown JSON codec: {name}, supported: {', '.join(JsonCodec.backends)}")
+        for backend in (JsonCodec.backends if name is None else (name,)):
+            if backend == 'json':
+                return JsonCodec()
+            try:
+                module = importlib.import_module(backend)
+            except ImportError:
+                if name is not None:
+                    raise
+                continue
+            return OrjsonCodec(module) if backend == 'orjson' else UjsonCodec(module)
+        return JsonCodec()
+
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def __init__(self, module):
+        # Bound once, as these are called for every frame
+        self.dumps = module.dumps
+        self.loads = module.loads
+
+
+class UjsonCodec(JsonCodec):
+    name = 'ujson'
+
+    def __init__(self, module):
+        self.__dumps = module.dumps
+        self.loads = module.loads
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return self.__dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode()
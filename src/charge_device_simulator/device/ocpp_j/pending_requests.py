@@ -0,0 +1,35 @@
+import asyncio
+import typing
+
+
+class PendingRequests:
+    """Requests sent on one connection and waiting for their response (or
+    CallError), by request id. The sender removes its entry once done,
+    whether answered, timed out or cancelled, so unanswered requests do not
+    pile up."""
+
+    def __init__(self):
+        self.__futures: typing.Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self.__futures)
+
+    def __contains__(self, req_id: str) -> bool:
+        return req_id in self.__futures
+
+    def add(self, req_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.__futures[req_id] = future
+        return future
+
+    def resolve(self, req_id: str, message: typing.Any) -> bool:
+        """Hands a response to the request waiting for it, False if none is (anymore)."""
+        future = self.__futures.pop(req_id, None)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(message)
+        return True
+
+    def discard(self, req_id: str):
+        self.__futures.pop(req_id, None)
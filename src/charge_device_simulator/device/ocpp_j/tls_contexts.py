@@ -0,0 +1,55 @@
+import ssl
+import typing
+
+import certifi
+
+
+class TlsContext(ssl.SSLContext):
+    """Client context resuming the last TLS session of each server: asyncio
+    takes no session for its connections, so it is given on `wrap_bio`,
+    which makes reconnects an abbreviated handshake when the server allows."""
+
+    def __new__(cls, *args, **kwargs):
+        context = super().__new__(cls, *args, **kwargs)
+        # Last session by server host name
+        context.sessions = {}
+        return context
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side:
+            session = self.sessions.get(server_hostname, None)
+        return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+
+    def session_store(self, ssl_object: typing.Optional[ssl.SSLObject]) -> bool:
+        """Keeps the session of a connection (once its handshake is done) for the next ones, True if it was resumed."""
+        if ssl_object is None or ssl_object.context is not self:
+            return False
+        if ssl_object.session is not None:
+            self.sessions[ssl_object.server_hostname] = ssl_object.session
+        return ssl_object.session_reused
+
+
+class TlsContexts:
+    """TLS client contexts, each built once per process (reading the CA bundle
+    and client certificate) and shared by every device using the same files."""
+    __contexts: typing.Dict[typing.Tuple[typing.Optional[str], ...], TlsContext] = {}
+
+    @staticmethod
+    def get(ca_file: typing.Optional[str] = None, cert_file: typing.Optional[str] = None,
+            key_file: typing.Optional[str] = None, key_password: typing.Optional[str] = None) -> TlsContext:
+        """Context verifying servers with `ca_file` (certifi's bundle by default), and presenting the
+        client certificate `cert_file` (with its key, unless in the same file) for mutual TLS."""
+        key = (ca_file, cert_file, key_file, key_password)
+        context = TlsContexts.__contexts.get(key, None)
+        if context is None:
+            # As ssl.create_default_context for servers: certificate and host name verified
+            context = TlsContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.load_verify_locations(cafile=ca_file if ca_file else certifi.where())
+            if cert_file:
+                context.load_cert_chain(cert_file, key_file, key_password)
+            TlsContexts.__contexts[key] = context
+        return context
+
+    @staticmethod
+    def clear():
+        TlsContexts.__contexts.clear()
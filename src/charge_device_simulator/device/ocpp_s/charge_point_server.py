@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+import logging
+import typing
+
+from .soap_server import SoapServer
+from ..abstract import DeviceAbstract
+
+
+class ChargePointServer:
+    """Listener for the requests central systems send to OCPP-S charge points
+    (`ChargePointService` of `client-201206.wsdl`), shared by the devices of a
+    process: each request goes to the device whose identity is its
+    `chargeBoxIdentity` header, so one port serves any number of devices.
+    A listener ends once the last device using it released it."""
+    __logger = logging.getLogger(__name__)
+    wsdl_file_name = "client-201206.wsdl"
+    binding_name = '{urn://Ocpp/Cp/2012/06/}ChargePointServiceSoap'
+    __shared: typing.Dict[typing.Tuple[str, int], typing.Tuple[asyncio.AbstractEventLoop, 'ChargePointServer', asyncio.Task]] = {}
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        # Devices by charge box identity
+        self.devices: typing.Dict[str, DeviceAbstract] = {}
+        # Devices that acquired (or are acquiring) this listener
+        self.users = 0
+        self.__key = (host, port)
+        self.__req_ids = itertools.count(1)
+        self.__server = SoapServer(self.wsdl_file_name, self.binding_name, self.__handle, host, port)
+
+    @property
+    def host(self) -> str:
+        return self.__server.host
+
+    @property
+    def port(self) -> int:
+        return self.__server.port
+
+    @staticmethod
+    async def acquire(host: str, port: int, device: DeviceAbstract) -> 'ChargePointServer':
+        """Server listening on `host`:`port` for the devices of the current event loop, started by its first user,
+        receiving the requests for `device` until it gets released."""
+        loop = asyncio.get_running_loop()
+        entry = ChargePointServer.__shared.get((host, port), None)
+        if entry is None or entry[0] is not loop:
+            server = ChargePointServer(host, port)
+            entry = (loop, server, loop.create_task(server.start()))
+            ChargePointServer.__shared[(host, port)] = entry
+        server = entry[1]
+        # Counted while waiting, so a release by another device does not end the server starting
+        server.users += 1
+        try:
+            # Devices initializing at once all wait for the same start
+            await asyncio.shield(entry[2])
+        except BaseException:
+            await server.release(None)
+            raise
+        server.add(device)
+        return server
+
+    async def release(self, device: typing.Optional[DeviceAbstract]):
+        """Stops receiving the requests for `device`, ends the server if no other device uses it."""
+        if device is not None:
+            self.remove(device)
+        self.users -= 1
+        if self.users > 0:
+            return
+        entry = ChargePointServer.__shared.get(self.__key, None)
+        if entry is not None and entry[1] is self:
+            del ChargePointServer.__shared[self.__key]
+        await self.end()
+
+    async def start(self):
+        await self.__server.start()
+        self.logger.info("Charge Point Server Start, URL: http://%s:%s/", self.host, self.port)
+
+    async def end(self):
+        await self.__server.end()
+
+    def add(self, device: DeviceAbstract):
+        self.devices[device.deviceId] = device
+
+    def remove(self, device: DeviceAbstract):
+        if self.devices.get(device.deviceId, None) is device:
+            del self.devices[device.deviceId]
+        pass
+
+    async def __handle(self, operation: str, header: typing.Dict[str, typing.Any], body: typing.Dict[str, typing.Any]) -> typing.Optional[dict]:
+        charge_box = header.get('ChargeBoxIdentity') or header.get('chargeBoxIdentity')
+        device = self.devices.get(str(charge_box), None) if charge_box is not None else None
+        if device is None:
+            self.logger.warning("Charge Point Server, %s for an unknown charge box: %s", operation, charge_box)
+            return None
+        return await device.by_middleware_req(str(next(self.__req_ids)), operation.lower(), body)
@@ -3,21 +3,27 @@ import datetime
 import json
 import logging
 import math
-import os
+import time
 import typing
-import uuid
+import urllib.parse
+
+import httpx
 
 from .. import utility
 from ..abstract import DeviceAbstract
 from ..error_reasons import ErrorReasons
+from ..middleware_handlers import MiddlewareResp, middleware_handler
 from ..ocpp_enums import OCPP_16_CONNECTOR_STATUSES, OCPP_16_ERROR_CODES
-from ..ocpp_j.message_types import MessageTypes
+from .charge_point_server import ChargePointServer
+from .soap_templates import SoapTemplates
 from .wsa_extension_plugin import WsAddressingExtensionPlugin
+from .wsdl_documents import WsdlDocuments
 from ...model.error_message import ErrorMessage
 from zeep import xsd
-from zeep.client import AsyncClient, Client
-from zeep.proxy import ServiceProxy
+from zeep.client import AsyncClient
+from zeep.proxy import AsyncServiceProxy
 from zeep.settings import Settings
+from zeep.transports import AsyncTransport
 
 
 class DeviceOcppS(DeviceAbstract):
@@ -25,8 +31,14 @@ class DeviceOcppS(DeviceAbstract):
     from_address = "http://localhost/ChargePointService"
     __logger = logging.getLogger(__name__)
     _client: AsyncClient = None
-    _client_service: ServiceProxy = None
+    _client_service: AsyncServiceProxy = None
     __server_url = ""
+    binding_name = '{urn://Ocpp/Cs/2012/06/}CentralSystemServiceSoap'
+    wsdl_file_name = "server-201206.wsdl"
+    # Max HTTP connections of the transport shared by the OCPP-S devices, requests beyond it wait for one
+    transport_max_connections = 100
+    __transport: typing.Optional[typing.Tuple[asyncio.AbstractEventLoop, AsyncTransport]] = None
+    __transport_users = 0
 
     def __init__(self, device_id):
         super().__init__(device_id)
@@ -41,10 +53,50 @@ class DeviceOcppS(DeviceAbstract):
         self.spec_chargePointModel = None
         self.spec_chargePointVendor = None
         self.spec_chargePointSerialNumber = None
+        # Requests of the central system are received if set, on a listener shared by the devices, see ChargePointServer
+        self.listen_host = '127.0.0.1'
+        self.listen_port: typing.Optional[int] = None
+        self.__charge_point_server: typing.Optional[ChargePointServer] = None
+        # Frequent requests are rendered from templates instead of by zeep, see SoapTemplates
+        self.soap_templates = True
+        self.__templates: typing.Optional[SoapTemplates] = None
+        # Acquired by the device from initialize until end
+        self.__transport_acquired: typing.Optional[AsyncTransport] = None
 
     @property
     def logger(self) -> logging.Logger:
-        return self.__logger
+        return self._device_logger(self.__logger)
+
+    @staticmethod
+    def transport_acquire() -> AsyncTransport:
+        """Transport of the OCPP-S devices running on the current event loop: one
+        pool of kept-alive connections to the central systems for all of them,
+        closed once the last of them released it."""
+        loop = asyncio.get_running_loop()
+        if DeviceOcppS.__transport is None or DeviceOcppS.__transport[0] is not loop:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=DeviceOcppS.transport_max_connections),
+                # Requests time out on response_timeout_seconds of their device instead
+                timeout=httpx.Timeout(None),
+            )
+            DeviceOcppS.__transport = (loop, AsyncTransport(client=client))
+            DeviceOcppS.__transport_users = 0
+        DeviceOcppS.__transport_users += 1
+        return DeviceOcppS.__transport[1]
+
+    @staticmethod
+    async def transport_release(transport: AsyncTransport):
+        if DeviceOcppS.__transport is not None and DeviceOcppS.__transport[1] is transport:
+            DeviceOcppS.__transport_users -= 1
+            if DeviceOcppS.__transport_users > 0:
+                return
+            DeviceOcppS.__transport = None
+        await transport.aclose()
+
+    @property
+    def is_connected(self) -> bool:
+        # SOAP over HTTP has no lasting connection, a created service counts as connected
+        return self._client_service is not None
 
     async def initialize(self) -> bool:
         try:
@@ -54,26 +106,34 @@ class DeviceOcppS(DeviceAbstract):
             logging.getLogger('zeep.transports').setLevel(logging.WARNING)
             self.__server_url = f"{self.server_address}"
             self.logger.info(
-                f"Trying to connect.\nURL: {self.__server_url}\nClient supported protocols: {json.dumps(self.protocols)}"
+                "Trying to connect.\nURL: %s\nClient supported protocols: %s", self.__server_url, json.dumps(self.protocols)
             )
-            wsdl_file_path = f"{os.path.dirname(os.path.realpath(__file__))}/wsdl/server-201206.wsdl"
-            self._client = Client(
-                wsdl=wsdl_file_path,
+            time_connect = time.perf_counter()
+            self._client = AsyncClient(
+                wsdl=WsdlDocuments.get(self.wsdl_file_name),
                 settings=Settings(
                     raw_response=False,
                 ),
+                transport=self.__transport_acquire(),
                 plugins=[WsAddressingExtensionPlugin(self.from_address)]
             )
 
-            self._client_service = self._client.create_service(
-                '{urn://Ocpp/Cs/2012/06/}CentralSystemServiceSoap',
-                self.__server_url
+            # AsyncClient.create_service would return a synchronous proxy
+            self._client_service = AsyncServiceProxy(
+                self._client,
+                self._client.wsdl.bindings[self.binding_name],
+                address=self.__server_url
             )
+            if self.soap_templates:
+                self.__templates = SoapTemplates.checked(
+                    self._client, self._client_service, self._client.wsdl.bindings[self.binding_name], self.__server_url, self.from_address)
+            self.metrics.connected(time_connect)
+            await self.start_soap_server()
 
             await asyncio.sleep(1)
 
             if self.register_on_initialize:
-                await self.action_register()
+                await self.action_register_rate_limited()
             await self.action_heart_beat()
             return True
         except ValueError as err:
@@ -83,22 +143,31 @@ class DeviceOcppS(DeviceAbstract):
             await self.handle_error(ErrorMessage(err).get(), ErrorReasons.InvalidResponse)
             return False
 
+    def __transport_acquire(self) -> AsyncTransport:
+        # Kept over the retries of initialize
+        if self.__transport_acquired is None:
+            self.__transport_acquired = self.transport_acquire()
+        return self.__transport_acquired
+
     async def end(self):
+        if self.__transport_acquired is not None:
+            transport, self.__transport_acquired = self.__transport_acquired, None
+            await self.transport_release(transport)
+        if self.__charge_point_server is not None:
+            server, self.__charge_point_server = self.__charge_point_server, None
+            await server.release(self)
         pass
 
     async def start_soap_server(self):
-        # TODO: need to be implemented
-        # if resp_payload is not None:
-        #     resp = f"""[{MessageTypes.Resp.value},"{req_id}",{json.dumps(resp_payload)}]"""
-        #     await self._ws.send(resp)
-        #     self.logger.debug(f"Device Read, Request, Responded:\n{resp}")
-        # else:
-        #     self.logger.warning(f"Device Read, Request, Unknown or not supported: {req_action}")
-        pass
+        """Receives the requests of the central system (sent to `from_address`) on the
+        listener at `listen_host`:`listen_port`, started by the first device using it and ended with the last one."""
+        if self.listen_port is None or self.__charge_point_server is not None:
+            return
+        self.__charge_point_server = await ChargePointServer.acquire(self.listen_host, self.listen_port, self)
 
     async def action_register(self) -> bool:
         action = "BootNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         req_payload = {}
         if self.spec_chargePointVendor is not None:
             req_payload['chargePointVendor'] = self.spec_chargePointVendor
@@ -124,15 +193,15 @@ class DeviceOcppS(DeviceAbstract):
                 f"Action {action} Response Failed:\n{resp_payload!r}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_heart_beat(self) -> bool:
         action = "Heartbeat"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         if await self.by_device_req_send(action, {}) is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_status_update(self, status, options: dict) -> bool:
@@ -140,7 +209,7 @@ class DeviceOcppS(DeviceAbstract):
 
     async def action_status_update_ocpp(self, status, errorCode, options: dict) -> bool:
         action = "StatusNotification"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         req_payload = {
             "connectorId": options.get("connectorId", 1),
             "errorCode": errorCode,
@@ -150,51 +219,54 @@ class DeviceOcppS(DeviceAbstract):
             await self.by_device_req_send(action, req_payload)
         except:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_authorize(self, options: dict) -> bool:
         action = "Authorize"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         id_tag = options.get("idTag", "-")
         req_payload = {
             "idTag": id_tag
         }
         resp_payload = await self.by_device_req_send(action, req_payload)
-        if resp_payload is None or resp_payload['status'] != 'Accepted':
+        # Per the OCPP 1.5/1.6 SOAP schema, status and parentIdTag live inside idTagInfo.
+        # Fall back to the top level for tolerance with non-standard responses.
+        info: typing.Any = self._response_value(resp_payload, "idTagInfo") or resp_payload
+        status = self._response_value(info, "status") or self._response_value(resp_payload, "status")
+        if resp_payload is None or status != 'Accepted':
             await self.handle_error(
                 f"Action {action} Response Failed:\n{resp_payload!r}",
                 ErrorReasons.InvalidResponse)
             return False
-        # Per the OCPP 1.5/1.6 SOAP schema, parentIdTag lives inside idTagInfo.
-        # Fall back to the top level for tolerance with non-standard responses.
-        def _lookup(obj: typing.Any, key: str) -> typing.Any:
-            if obj is None:
-                return None
-            if hasattr(obj, "get"):
-                try:
-                    return obj.get(key)
-                except Exception:
-                    return None
-            return getattr(obj, key, None)
-
-        info: typing.Any = _lookup(resp_payload, "idTagInfo") or resp_payload
-        parent_id_tag: typing.Optional[str] = _lookup(info, "parentIdTag")
+        parent_id_tag: typing.Optional[str] = self._response_value(info, "parentIdTag")
         self._last_authorize_info = {
             "id_tag": id_tag,
             "parent_id_tag": parent_id_tag,
         }
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
+    @staticmethod
+    def _response_value(obj: typing.Any, key: str) -> typing.Any:
+        """Value of a response field, for both dicts and zeep objects, None if missing."""
+        if obj is None:
+            return None
+        if hasattr(obj, "get"):
+            try:
+                return obj.get(key)
+            except Exception:
+                return None
+        return getattr(obj, key, None)
+
     async def action_data_transfer(self, options: dict) -> bool:
         action = "DataTransfer"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         req_payload = options
         resp_payload = await self.by_device_req_send(action, req_payload)
         if resp_payload is None:
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     def fill_missing_options_charge_start(self, options):
@@ -211,7 +283,7 @@ class DeviceOcppS(DeviceAbstract):
 
     async def action_charge_start(self, options: dict) -> bool:
         action = "StartTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         self.fill_missing_options_charge_start(options)
         req_payload = {
             "timestamp": options["chargeStartTime"],
@@ -229,7 +301,7 @@ class DeviceOcppS(DeviceAbstract):
             return False
         self.charge_id = resp_payload['transactionId']
         self.charge_in_progress = True
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     def charge_meter_value_current(self, options: dict):
@@ -242,13 +314,15 @@ class DeviceOcppS(DeviceAbstract):
 
     async def action_meter_value(self, options: dict, meter_value: int = None, time_stamp: str = None) -> bool:
         action = "MeterValues"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         req_payload = {
             "connectorId": options.get("connectorId", 1),
             "transactionId": self.charge_id,
             "values": [{
                 "timestamp": time_stamp if time_stamp else self.utcnow_iso(),
-                "value": [meter_value if meter_value else self.charge_meter_value_current(options), {
+                # One sampled value, with its attributes
+                "value": [{
+                    "_value_1": meter_value if meter_value else self.charge_meter_value_current(options),
                     "context": "Sample.Periodic",
                     "measurand": "Energy.Active.Import.Register",
                     "location": "Outlet",
@@ -262,12 +336,12 @@ class DeviceOcppS(DeviceAbstract):
         except BaseException as err:
             await self.handle_error(ErrorMessage(err).get(), ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def action_charge_stop(self, options: dict) -> bool:
         action = "StopTransaction"
-        self.logger.info(f"Action {action} Start")
+        self.logger.info("Action %s Start", action)
         req_payload = {
             "timestamp": self.utcnow_iso(),
             "transactionId": self.charge_id,
@@ -275,46 +349,49 @@ class DeviceOcppS(DeviceAbstract):
             "idTag": options.get("idTag", "-"),
         }
         resp_payload = await self.by_device_req_send(action, req_payload)
-        if resp_payload is None or resp_payload['status'] != 'Accepted':
+        # idTagInfo is optional in a StopTransaction response, only a refusing one fails
+        status = self._response_value(self._response_value(resp_payload, "idTagInfo"), "status") \
+            or self._response_value(resp_payload, "status") or 'Accepted'
+        if resp_payload is None or status != 'Accepted':
             await self.handle_error(
                 f"Action {action} Response Failed:\n{resp_payload!r}",
                 ErrorReasons.InvalidResponse)
             return False
-        self.logger.info(f"Action {action} End")
+        self.logger.info("Action %s End", action)
         return True
 
     async def flow_heartbeat(self) -> bool:
         log_title = self.flow_heartbeat.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_heart_beat():
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_authorize(self, options: dict) -> bool:
         log_title = self.flow_authorize.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if not await self.action_authorize(options):
             return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_status_preparing(self) -> bool:
         log_title = self.flow_status_preparing.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         if self.charge_in_progress:
-            self.logger.info(f"Flow {log_title} Skipped, charge in progress")
+            self.logger.info("Flow %s Skipped, charge in progress", log_title)
         else:
             self.is_preparing = True
             if not await self.action_status_update("Preparing", {}):
                 self.is_preparing = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         return True
 
     async def flow_charge(self, auto_stop: bool, options: dict) -> bool:
         log_title = self.flow_charge.__name__
-        self.logger.info(f"Flow {log_title} Start")
+        self.logger.info("Flow %s Start", log_title)
         self._reset_charge_cycle_options(options)
         if not await self.action_authorize(options):
             self.charge_in_progress = False
@@ -349,7 +426,7 @@ class DeviceOcppS(DeviceAbstract):
             if not await self.action_status_update("Available", options):
                 self.charge_in_progress = False
                 return False
-        self.logger.info(f"Flow {log_title} End")
+        self.logger.info("Flow %s End", log_title)
         self.charge_in_progress = False
         return True
 
@@ -359,94 +436,132 @@ class DeviceOcppS(DeviceAbstract):
         return await self.action_meter_value(options)
 
     async def by_device_req_send(self, action, req_payload) -> typing.Any:
-        req_id = str(uuid.uuid4())
+        req_id = self.message_ids.next()
         req = req_payload
         return await self.by_device_req_send_raw(req, action, req_id)
 
     async def by_device_req_send_raw(self, raw, action, req_id=None) -> typing.Any:
         if req_id is None:
-            req_id = str(uuid.uuid4())
-        self.logger.debug(f"By Device Req ({action}):\n{raw}")
+            req_id = self.message_ids.next()
+        self.logger.debug("By Device Req (%s):\n%s", action, raw)
+        await self._in_flight_acquire()
         try:
-            result = self._client_service[action](**raw, _soapheaders={
+            time_sent = self.metrics.request_sent(action)
+            try:
+                result = await asyncio.wait_for(self.__by_device_req_call(action, raw, req_id), timeout=self.response_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.metrics.request_timed_out(action)
+                return self.by_device_req_resp_timeout()
+            except BaseException:
+                self.metrics.request_failed(action)
+                raise
+        finally:
+            self._in_flight_release()
+        self.metrics.request_responded(action, time_sent, self.metrics.is_rejected(result))
+        self.logger.debug("By Device Resp (%s):\n%s", action, result)
+        return result
+
+    async def __by_device_req_call(self, action, raw, req_id) -> typing.Any:
+        envelope = None
+        if self.__templates is not None:
+            envelope = self.__templates.render(
+                action, raw, self.deviceId, self.__server_url, self.from_address, f"urn:ocpp-message:{urllib.parse.quote(req_id, safe='')}")
+        if envelope is None:
+            return await self._client_service[action](**raw, _soapheaders={
                 'ChargeBoxIdentity': self.deviceId,
             })
-            self.logger.debug(f"By Device Resp ({action}):\n{result}")
-            return result
-        except asyncio.TimeoutError:
-            return self.by_device_req_resp_timeout()
+        transport = self._client.transport
+        response = await transport.post(self.__server_url, envelope, SoapTemplates.headers(action))
+        body = self.__templates.body(response.content) if response.status_code == 200 else None
+        if body is None:
+            # Errors and faults are rare, zeep turns them into its exceptions
+            binding = self._client.wsdl.bindings[self.binding_name]
+            return binding.process_reply(self._client, binding.get(action), transport.new_response(response))
+        return self.__templates.result(action, body)
 
     async def by_middleware_req(self, req_id: str, req_action: str, req_payload: typing.Any):
-        resp_payload = None
-        if req_action in map(lambda x: str(x).lower(), [
-            "ClearCache",
-            "ChangeAvailability",
-            "RemoteStartTransaction",
-            "RemoteStopTransaction",
-            "SetChargingProfile",
-            "ChangeConfiguration",
-            "UnlockConnector",
-            "UpdateFirmware",
-            "SendLocalList",
-            "Reset",
-            "DataTransfer",
-        ]):
-            resp_payload = {
-                "status": "Accepted"
-            }
-        elif req_action == "GetConfiguration".lower():
-            resp_payload = {
-                "configurationKey": [
-                    {"key": "type", "value": "device-simulator", "readonly": "true"},
-                    {"key": "server_address", "value": self.server_address, "readonly": "true"},
-                    {"key": "identifier", "value": self.deviceId, "readonly": "false"},
-                ]
-            }
-        elif req_action == "GetDiagnostics".lower():
-            resp_payload = {
-                "fileName": "fake_file_name.log"
-            }
-
-        if req_action == "RemoteStartTransaction".lower():
-            if not self.charge_can_start():
-                resp_payload["status"] = "Rejected"
-            else:
-                options = {
-                    "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
-                    "idTag": req_payload["idTag"] if "idTag" in req_payload else "-",
-                }
-                self.logger.info(f"Device, Read, Request, RemoteStart, Options: {json.dumps(options)}")
-                asyncio.create_task(utility.run_with_delay(self.flow_charge(False, options), 2))
-
-        if req_action == "RemoteStopTransaction".lower():
-            if not self.charge_can_stop(req_payload["transactionId"] if "transactionId" in req_payload else 0):
-                resp_payload["status"] = "Rejected"
-            else:
-                asyncio.create_task(utility.run_with_delay(self.flow_charge_stop(), 2))
-
-        if req_action == "ReserveNow".lower():
-            reserve_options: typing.Dict[str, typing.Any] = self._reserve_now_options_from_payload(req_payload)
-            if reserve_options.get("connectorId") is None:
-                resp_payload = {"status": "Rejected"}
-            elif not self.reserve_can_accept(reserve_options.get("connectorId")):
-                resp_payload = {"status": "Occupied"}
-            else:
-                resp_payload = {"status": "Accepted"}
-                asyncio.create_task(utility.run_with_delay(self.flow_reserve(reserve_options), 2))
-
-        if req_action == "CancelReservation".lower():
-            cancel_reservation_id: typing.Optional[int] = req_payload.get("reservationId")
-            if not self.reserve_can_cancel(cancel_reservation_id):
-                resp_payload = {"status": "Rejected"}
-            else:
-                resp_payload = {"status": "Accepted"}
-                asyncio.create_task(utility.run_with_delay(
-                    self.flow_reservation_cancel(cancel_reservation_id), 2))
-
-        if req_action == "Reset".lower():
-            asyncio.create_task(utility.run_with_delay(self.re_initialize(), 2))
-
-        return resp_payload
+        self.logger.debug("Device Read, Request (%s):\n%s", req_action, req_payload)
+        resp = await self._middleware_handle(req_action, req_payload)
+        if resp is None:
+            self.logger.warning("Device Read, Request, Unknown or not supported: %s", req_action)
+            return None
+        self.logger.debug("Device Read, Request, Responded:\n%s", resp.payload)
+        if resp.next_task is not None:
+            asyncio.create_task(resp.next_task)
+        return resp.payload
+
+    @middleware_handler(
+        "ClearCache",
+        "ChangeAvailability",
+        "SetChargingProfile",
+        "ChangeConfiguration",
+        "UnlockConnector",
+        "SendLocalList",
+        "DataTransfer",
+    )
+    async def by_middleware_req_accept(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "status": "Accepted"
+        })
+
+    @middleware_handler("UpdateFirmware")
+    async def by_middleware_req_update_firmware(self, req_payload: typing.Any) -> MiddlewareResp:
+        # Has no status in OCPP 1.5
+        return MiddlewareResp({})
+
+    @middleware_handler("GetConfiguration")
+    async def by_middleware_req_get_configuration(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "configurationKey": [
+                {"key": "type", "value": "device-simulator", "readonly": "true"},
+                {"key": "server_address", "value": self.server_address, "readonly": "true"},
+                {"key": "identifier", "value": self.deviceId, "readonly": "false"},
+            ]
+        })
+
+    @middleware_handler("GetDiagnostics")
+    async def by_middleware_req_get_diagnostics(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({
+            "fileName": "fake_file_name.log"
+        })
+
+    @middleware_handler("RemoteStartTransaction")
+    async def by_middleware_req_remote_start_transaction(self, req_payload: typing.Any) -> MiddlewareResp:
+        if not self.charge_can_start():
+            return MiddlewareResp({"status": "Rejected"})
+        options = {
+            "connectorId": req_payload["connectorId"] if "connectorId" in req_payload else 0,
+            "idTag": req_payload["idTag"] if "idTag" in req_payload else "-",
+        }
+        self.logger.info("Device, Read, Request, RemoteStart, Options: %s", json.dumps(options))
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_charge(False, options), 2))
+
+    @middleware_handler("RemoteStopTransaction")
+    async def by_middleware_req_remote_stop_transaction(self, req_payload: typing.Any) -> MiddlewareResp:
+        if not self.charge_can_stop(req_payload["transactionId"] if "transactionId" in req_payload else 0):
+            return MiddlewareResp({"status": "Rejected"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_charge_stop(), 2))
+
+    @middleware_handler("ReserveNow")
+    async def by_middleware_req_reserve_now(self, req_payload: typing.Any) -> MiddlewareResp:
+        reserve_options: typing.Dict[str, typing.Any] = self._reserve_now_options_from_payload(req_payload)
+        if reserve_options.get("connectorId") is None:
+            return MiddlewareResp({"status": "Rejected"})
+        if not self.reserve_can_accept(reserve_options.get("connectorId")):
+            return MiddlewareResp({"status": "Occupied"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.flow_reserve(reserve_options), 2))
+
+    @middleware_handler("CancelReservation")
+    async def by_middleware_req_cancel_reservation(self, req_payload: typing.Any) -> MiddlewareResp:
+        cancel_reservation_id: typing.Optional[int] = req_payload.get("reservationId")
+        if not self.reserve_can_cancel(cancel_reservation_id):
+            return MiddlewareResp({"status": "Rejected"})
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(
+            self.flow_reservation_cancel(cancel_reservation_id), 2))
+
+    @middleware_handler("Reset")
+    async def by_middleware_req_reset(self, req_payload: typing.Any) -> MiddlewareResp:
+        return MiddlewareResp({"status": "Accepted"}, utility.run_with_delay(self.re_initialize(), 2))
 
     async def flow_charge_stop(self):
         self.charge_in_progress = False
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import typing
+
+from lxml import etree
+from zeep.helpers import serialize_object
+
+from .wsdl_documents import WsdlDocuments
+from ...model.error_message import ErrorMessage
+
+SoapHandler = typing.Callable[[str, typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]], typing.Awaitable[typing.Optional[dict]]]
+
+
+class SoapServer:
+    """Minimal asyncio HTTP/1.1 server answering SOAP requests for the
+    operations of one binding of a WSDL file.
+
+    Requests are matched to their operation by the body element, then passed
+    as `handler(operation_name, header, body)` with header and body as plain
+    dicts; the handler returns the response body values (None for a SOAP
+    fault). Connections are kept alive, as SOAP clients reuse them."""
+    __logger = logging.getLogger(__name__)
+    content_type = 'application/soap+xml; charset=utf-8'
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, wsdl_file_path: str, binding_name: str, handler: SoapHandler, host: str = '127.0.0.1', port: int = 0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        binding = WsdlDocuments.get(wsdl_file_path).bindings[binding_name]
+        self.operations = {
+            operation.input.body.qname: operation
+            for operation in (binding.get(name) for name in binding.all())
+        }
+        self.__server: typing.Optional[asyncio.AbstractServer] = None
+        self.__writers: typing.Set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        self.__server = await asyncio.start_server(self.__connection, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def end(self):
+        if self.__server is not None:
+            self.__server.close()
+            # Kept alive connections would otherwise hold wait_closed
+            for writer in list(self.__writers):
+                writer.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        pass
+
+    async def __connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.__writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1').strip()
+                    if not line:
+                        break
+                    key, _, value = line.partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, response = await self.respond(body)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: {self.content_type}\r\n"
+                    f"Content-Length: {len(response)}\r\n\r\n".encode() + response)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close' or request_line.startswith(b'HTTP/1.0'):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.__writers.discard(writer)
+            writer.close()
+
+    async def respond(self, request: bytes) -> typing.Tuple[str, bytes]:
+        try:
+            envelope = etree.fromstring(request)
+            body = next(e for e in envelope if etree.QName(e).localname == 'Body')
+            operation = self.operations[etree.QName(body[0]).text]
+        except (etree.XMLSyntaxError, StopIteration, IndexError, KeyError) as e:
+            return '400 Bad Request', self.fault(f"Unknown or invalid request: {ErrorMessage(e).get()}")
+        try:
+            values = operation.input.deserialize(envelope)
+            result = await self.handler(
+                operation.name,
+                serialize_object(getattr(values, 'header', None), dict) or {},
+                serialize_object(getattr(values, 'body', None), dict) or {},
+            )
+        except Exception as e:
+            self.logger.warning("SOAP Server, %s failed: %s", operation.name, ErrorMessage(e).get())
+            return '500 Internal Server Error', self.fault(ErrorMessage(e).get())
+        if result is None:
+            return '500 Internal Server Error', self.fault(f"{operation.name} not answered")
+        try:
+            response = operation.output.serialize(**result).content
+        except (TypeError, ValueError) as e:
+            self.logger.warning("SOAP Server, %s response invalid: %s", operation.name, ErrorMessage(e).get())
+            return '500 Internal Server Error', self.fault(ErrorMessage(e).get())
+        return '200 OK', etree.tostring(response, xml_declaration=True, encoding='utf-8')
+
+    @staticmethod
+    def fault(reason: str) -> bytes:
+        soap = 'http://www.w3.org/2003/05/soap-envelope'
+        envelope = etree.Element(f"{{{soap}}}Envelope", nsmap={'soap': soap})
+        fault = etree.SubElement(etree.SubElement(envelope, f"{{{soap}}}Body"), f"{{{soap}}}Fault")
+        etree.SubElement(etree.SubElement(fault, f"{{{soap}}}Code"), f"{{{soap}}}Value").text = 'soap:Receiver'
+        etree.SubElement(etree.SubElement(fault, f"{{{soap}}}Reason"), f"{{{soap}}}Text").text = reason
+        return etree.tostring(envelope, xml_declaration=True, encoding='utf-8')
@@ -0,0 +1,196 @@
+import logging
+import typing
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
+from zeep.client import Client
+from zeep.proxy import AsyncServiceProxy
+from zeep.xsd.types.builtins import DateTime
+
+from ...model.error_message import ErrorMessage
+
+
+class SoapTemplates:
+    """Renders the envelopes of the frequent OCPP-S requests (Heartbeat,
+    StatusNotification, MeterValues) from string templates and reads their
+    responses with a targeted lxml lookup, instead of zeep's schema-driven
+    serialization, plugins and deserialization on every call.
+
+    Each operation is checked once per process: its template and response
+    reader must give the same envelope and result as zeep for sample values,
+    or zeep keeps handling it. `render` returns None for payloads a template
+    does not cover (e.g. datetime values), which zeep handles too."""
+    __logger = logging.getLogger(__name__)
+    namespace = 'urn://Ocpp/Cs/2012/06/'
+    # Elements and attributes in the order of the schema (server-201206.wsdl)
+    status_notification_elements = ('connectorId', 'status', 'errorCode', 'info', 'timestamp', 'vendorId', 'vendorErrorCode')
+    meter_value_attributes = ('context', 'format', 'measurand', 'location', 'unit')
+    # Bodies holding one of these are faults, zeep turns them into its exception
+    faults = ('{http://www.w3.org/2003/05/soap-envelope}Fault', '{http://schemas.xmlsoap.org/soap/envelope/}Fault')
+    samples: typing.Dict[str, typing.Tuple[typing.Dict[str, typing.Any], bytes]] = {
+        'Heartbeat': ({}, b'<currentTime>2026-01-01T00:00:00+00:00</currentTime>'),
+        'StatusNotification': ({'connectorId': 1, 'errorCode': 'NoError', 'status': 'Available', 'info': 'a<&>"b'}, b''),
+        'MeterValues': ({'connectorId': 1, 'transactionId': 7, 'values': [{
+            'timestamp': '2026-01-01T00:00:00.000001+00:00',
+            'value': [{'_value_1': 1234, 'context': 'Sample.Periodic', 'measurand': 'Energy.Active.Import.Register', 'unit': 'Wh'}, 5],
+        }]}, b''),
+    }
+    __checked: typing.Optional[typing.Set[str]] = None
+    # As zeep parses responses, without resolving entities or loading anything
+    __parser = etree.XMLParser(resolve_entities=False, no_network=True, remove_comments=True)
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, operations: typing.Iterable[str]):
+        self.operations = frozenset(operations)
+        self.__date_time = DateTime()
+
+    @staticmethod
+    def checked(client: Client, service: AsyncServiceProxy, binding: typing.Any, address: str, from_address: str) -> 'SoapTemplates':
+        """Templates of the operations giving the same results as zeep, checked on the first call of the process
+        with a client using the WS-Addressing plugin of `from_address`."""
+        if SoapTemplates.__checked is None:
+            templates = SoapTemplates(SoapTemplates.samples)
+            SoapTemplates.__checked = {
+                operation for operation in SoapTemplates.samples
+                if templates.check(client, service, binding, address, from_address, operation)
+            }
+        return SoapTemplates(SoapTemplates.__checked)
+
+    def check(self, client: Client, service: AsyncServiceProxy, binding: typing.Any, address: str, from_address: str, operation: str) -> bool:
+        payload, response_body = self.samples[operation]
+        identity, message_id = 'sample-<1>', 'urn:uuid:sample'
+        try:
+            expected = client.create_message(service, operation, **payload, _soapheaders={'ChargeBoxIdentity': identity})
+            # Generated for each message, and To is the address of the WSDL outside of a call
+            for e in expected.iter('{http://www.w3.org/2005/08/addressing}MessageID'):
+                e.text = message_id
+            for e in expected.iter('{http://www.w3.org/2005/08/addressing}To'):
+                e.text = address
+            actual = etree.fromstring(self.render(operation, payload, identity, address, from_address, message_id))
+            binding_operation = binding.get(operation)
+            local_name = binding_operation.output.body.qname.localname
+            response = (
+                f'<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope"><s:Body><{local_name} xmlns="{self.namespace}">'
+            ).encode() + response_body + f'</{local_name}></s:Body></s:Envelope>'.encode()
+            same = (
+                etree.tostring(actual, method='c14n') == etree.tostring(expected, method='c14n')
+                and self.result(operation, self.body(response)) == binding_operation.process_reply(etree.fromstring(response))
+            )
+        except Exception as e:
+            self.logger.warning("SOAP Templates, %s check failed: %s", operation, ErrorMessage(e).get())
+            return False
+        if not same:
+            self.logger.warning("SOAP Templates, %s does not match the WSDL, sent with zeep", operation)
+        return same
+
+    def render(self, operation: str, payload: typing.Dict[str, typing.Any], identity: str, to_address: str, from_address: str,
+               message_id: str) -> typing.Optional[bytes]:
+        """Envelope of a request, None if there is no (checked) template for it."""
+        if operation not in self.operations:
+            return None
+        if operation == 'Heartbeat':
+            body = None if payload else ''
+        elif operation == 'StatusNotification':
+            body = self.__elements(payload, self.status_notification_elements)
+        else:
+            body = self.__meter_values(payload)
+        if body is None:
+            return None
+        local_name = operation[0].lower() + operation[1:] + 'Request'
+        return (
+            f'<soap-env:Envelope xmlns:soap-env="http://www.w3.org/2003/05/soap-envelope">'
+            f'<soap-env:Header xmlns:wsa="http://www.w3.org/2005/08/addressing">'
+            f'<ns0:chargeBoxIdentity xmlns:ns0="{self.namespace}">{escape(str(identity))}</ns0:chargeBoxIdentity>'
+            f'<wsa:Action>/{operation}</wsa:Action>'
+            f'<wsa:MessageID>{escape(message_id)}</wsa:MessageID>'
+            f'<wsa:To>{escape(to_address)}</wsa:To>'
+            f'<wsa:From><wsa:Address>{escape(from_address)}</wsa:Address></wsa:From>'
+            f'</soap-env:Header>'
+            f'<soap-env:Body><ns0:{local_name} xmlns:ns0="{self.namespace}">{body}</ns0:{local_name}></soap-env:Body>'
+            f'</soap-env:Envelope>'
+        ).encode()
+
+    @staticmethod
+    def headers(operation: str) -> typing.Dict[str, str]:
+        return {
+            'SOAPAction': f'"/{operation}"',
+            'Content-Type': f'application/soap+xml; charset=utf-8; action="/{operation}"',
+        }
+
+    def body(self, content: bytes) -> typing.Optional[etree._Element]:
+        """Body of a response envelope, None if it is not one (e.g. not XML) or holds a fault."""
+        try:
+            envelope = etree.fromstring(content, parser=self.__parser)
+        except etree.XMLSyntaxError:
+            return None
+        body = envelope[-1] if len(envelope) > 0 else None
+        if body is None or etree.QName(body).localname != 'Body':
+            return None
+        if any(e.tag in self.faults for e in body):
+            return None
+        return body
+
+    def result(self, operation: str, body: etree._Element) -> typing.Any:
+        """Result of a successful response (its `body`), as zeep returns it."""
+        if operation != 'Heartbeat' or len(body) == 0:
+            return None
+        current_time = body[0].find(f"{{{self.namespace}}}currentTime")
+        return None if current_time is None else self.__date_time.pythonvalue(current_time.text)
+
+    @staticmethod
+    def __text(value: typing.Any) -> typing.Optional[str]:
+        # Other types (e.g. datetime) are left to zeep, which formats them as their schema type
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            return None
+        return escape(str(value))
+
+    def __elements(self, payload: typing.Dict[str, typing.Any], names: typing.Sequence[str]) -> typing.Optional[str]:
+        if not set(payload).issubset(names):
+            return None
+        result = ''
+        for name in names:
+            value = payload.get(name, None)
+            if value is None:
+                continue
+            text = self.__text(value)
+            if text is None:
+                return None
+            result += f'<ns0:{name}>{text}</ns0:{name}>'
+        return result
+
+    def __meter_values(self, payload: typing.Dict[str, typing.Any]) -> typing.Optional[str]:
+        values = payload.get('values', None)
+        if not set(payload).issubset(('connectorId', 'transactionId', 'values')) or not isinstance(values, list):
+            return None
+        result = self.__elements({k: v for k, v in payload.items() if k != 'values'}, ('connectorId', 'transactionId'))
+        if result is None:
+            return None
+        for meter_value in values:
+            if not isinstance(meter_value, dict) or not set(meter_value).issubset(('timestamp', 'value')):
+                return None
+            timestamp = self.__text(meter_value.get('timestamp', None))
+            if timestamp is None or not isinstance(meter_value.get('value', None), list):
+                return None
+            result += f'<ns0:values><ns0:timestamp>{timestamp}</ns0:timestamp>'
+            for value in meter_value['value']:
+                if not isinstance(value, dict):
+                    value = {'_value_1': value}
+                if not set(value).issubset(('_value_1',) + self.meter_value_attributes):
+                    return None
+                text = self.__text(value.get('_value_1', None))
+                if text is None:
+                    return None
+                attributes = ''
+                for name in self.meter_value_attributes:
+                    attribute = value.get(name, None)
+                    if attribute is None:
+                        continue
+                    if self.__text(attribute) is None:
+                        return None
+                    attributes += f' {name}={quoteattr(str(attribute))}'
+                result += f'<ns0:value{attributes}>{text}</ns0:value>'
+            result += '</ns0:values>'
+        return result
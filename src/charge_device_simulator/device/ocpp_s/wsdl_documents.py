@@ -0,0 +1,30 @@
+import os
+import typing
+
+from zeep.transports import Transport
+from zeep.wsdl import Document
+
+
+class WsdlDocuments:
+    """Parsed WSDL documents (schemas, bindings and operations), each parsed
+    once per process and shared by every client built on it: a zeep client
+    only adds its transport and plugins, which are per device."""
+    directory = f"{os.path.dirname(os.path.realpath(__file__))}/wsdl"
+    __documents: typing.Dict[str, Document] = {}
+
+    @staticmethod
+    def get(path: str) -> Document:
+        """Document of the WSDL at `path`, either a path or a file name in `directory`."""
+        if os.sep not in path:
+            path = f"{WsdlDocuments.directory}/{path}"
+        path = os.path.realpath(path)
+        document = WsdlDocuments.__documents.get(path, None)
+        if document is None:
+            # The transport only loads the (local) WSDL and its imports, clients send with their own
+            document = Document(path, Transport())
+            WsdlDocuments.__documents[path] = document
+        return document
+
+    @staticmethod
+    def clear():
+        WsdlDocuments.__documents.clear()
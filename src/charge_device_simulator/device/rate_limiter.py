@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `burst`.
+    A caller that finds the bucket empty takes a token on credit and sleeps
+    until it is paid back, so waiters are served in arrival order with one
+    sleep each."""
+
+    def __init__(self, rate: float, burst: float = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.__tokens: float = self.burst
+        self.__updated: float = time.monotonic()
+
+    def __refill(self) -> float:
+        now = time.monotonic()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+        return self.__tokens
+
+    def delay_next(self) -> float:
+        """Seconds the next `acquire` would wait."""
+        tokens = self.__refill()
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    async def acquire(self):
+        self.__refill()
+        self.__tokens -= 1
+        if self.__tokens < 0:
+            try:
+                await asyncio.sleep(-self.__tokens / self.rate)
+            except asyncio.CancelledError:
+                # Not served, the token taken on credit goes back to the next callers
+                self.__tokens += 1
+                raise
@@ -1,13 +1,17 @@
 import asyncio
 import logging
+import time
 import typing
 
 from . import utility
+from .backoff import Backoff
 from .error_reasons import ErrorReasons
 from ..model.error_message import ErrorMessage
 from .abstract import DeviceAbstract
+from .flow_scheduler import FlowScheduler, ScheduledCall
 from .flows import Flows
 from .frequent_flow_options import FrequentFlowOptions
+from .rate_limiter import TokenBucket
 
 
 class Simulator:
@@ -25,86 +29,144 @@ class Simulator:
         self.frequent_flow_enabled = True
         self.is_interactive = False
         self.frequent_flows: typing.Dict[Flows, FrequentFlowOptions] = {}
+        # None uses the scheduler shared by all simulators of the running event loop
+        self.flow_scheduler: typing.Optional[FlowScheduler] = None
+        # Shared by a fleet to limit device.initialize() calls (retries included) per second
+        self.initialize_rate_limiter: typing.Optional[TokenBucket] = None
+        # Delays between the attempts of initialize/re_initialize
+        self.reconnect_backoff = Backoff()
         self.on_error = []
+        self.__frequent_flows_stop: typing.Optional[typing.Callable[[], None]] = None
+        self.__reconnect_task: typing.Optional[asyncio.Task] = None
 
     async def loop_flow_frequent(self):
-        time_loop = 0
-        tasks: typing.Dict[str, asyncio.tasks.Task] = {}
-        while not self.is_ended:
-            await asyncio.sleep(1)
-            time_loop += 1
-
-            f_flow: Flows
-            for f_flow in self.frequent_flows:
-                if f_flow.name in tasks and not tasks[f_flow.name].done():
-                    continue
-                f_options = self.frequent_flows[f_flow]
+        scheduler = self.flow_scheduler if self.flow_scheduler is not None else FlowScheduler.shared()
+        time_start = scheduler.time()
+        finished = asyncio.get_running_loop().create_future()
+        tasks: typing.Dict[Flows, asyncio.Task] = {}
+        calls: typing.Dict[Flows, ScheduledCall] = {}
+
+        def flow_has_runs(f_options: FrequentFlowOptions) -> bool:
+            return f_options.count < 0 or f_options.run_counter < f_options.count
+
+        def finish_check(_=None):
+            if finished.done():
+                return
+            if not self.is_ended:
+                if any(flow_has_runs(e) for e in self.frequent_flows.values()):
+                    return
+                if any(not e.done() for e in tasks.values()):
+                    return
+            finished.set_result(None)
+
+        def flow_run(f_flow: Flows):
+            if finished.done():
+                return
+            if self.is_ended:
+                finish_check()
+                return
+            running = tasks.get(f_flow)
+            if running is not None and not running.done():
+                # Still busy with its previous run, run again as soon as it is done
+                running.add_done_callback(lambda _: flow_run(f_flow))
+                return
+            f_options = self.frequent_flows[f_flow]
+            time_loop = scheduler.time() - time_start
+            task_def = self.flow_task_def(f_flow)
+            if task_def is not None:
+                self.logger.info("Frequent Flow, Started, Flow: %s, Time: %.3f", f_flow, time_loop)
+                tasks[f_flow] = asyncio.create_task(self.task_start(task_def))
+                tasks[f_flow].add_done_callback(finish_check)
+            f_options.run_counter += 1
+            f_options.run_last_time = time_loop
+            if flow_has_runs(f_options):
                 f_options_delay_seconds = f_options.delay_seconds
                 if f_options_delay_seconds <= 0:
                     f_options_delay_seconds = 60
-                if (
-                        f_options.run_last_time < 0 or
-                        time_loop - f_options.run_last_time >= f_options_delay_seconds
-                ) and (
-                        f_options.count < 0 or
-                        f_options.run_counter < f_options.count
-                ):
-                    task_def = None
-                    if f_flow == Flows.Heartbeat:
-                        task_def = self.device.flow_heartbeat()
-                    elif f_flow == Flows.Authorize:
-                        task_def = self.device.flow_authorize(
-                            self.flow_charge_options)
-                    elif f_flow == Flows.Charge:
-                        task_def = self.device.flow_charge(
-                            True,
-                            self.flow_charge_options
-                        )
-                    elif f_flow == Flows.StatusPreparing:
-                        task_def = self.device.flow_status_preparing()
-                    if task_def is not None:
-                        self.logger.info(
-                            f"Frequent Flow, Started, Flow: {f_flow}, Time: {time_loop}")
-                        tasks[f_flow.name] = asyncio.create_task(self.task_start(task_def))
-                    f_options.run_counter += 1
-                    f_options.run_last_time = time_loop
-
-            if len(list(filter(
-                    lambda x:
-                    self.frequent_flows[x].count < 0 or
-                    self.frequent_flows[x].run_counter < self.frequent_flows[x].count,
-                    self.frequent_flows
-            ))) <= 0:
-                self.logger.info(
-                    f"No more frequent flow to run, wait for running tasks")
-                await asyncio.gather(*(tasks.values()))
-                self.logger.info(f"No more frequent flow to run, exiting loop")
-                break
+                calls[f_flow] = scheduler.call_later(f_options_delay_seconds, lambda: flow_run(f_flow))
+            else:
+                finish_check()
+
+        for f_flow, f_options in self.frequent_flows.items():
+            if flow_has_runs(f_options):
+                calls[f_flow] = scheduler.call_later(0, lambda f=f_flow: flow_run(f))
+        self.__frequent_flows_stop = finish_check
+        finish_check()
+        try:
+            await finished
+        finally:
+            self.__frequent_flows_stop = None
+            for call in calls.values():
+                call.cancel()
+        self.logger.info("No more frequent flow to run, exiting loop")
         pass
 
+    def flow_task_def(self, f_flow: Flows) -> typing.Optional[typing.Awaitable]:
+        if f_flow == Flows.Heartbeat:
+            return self.device.flow_heartbeat()
+        elif f_flow == Flows.Authorize:
+            return self.device.flow_authorize(self.flow_charge_options)
+        elif f_flow == Flows.Charge:
+            return self.device.flow_charge(True, self.flow_charge_options)
+        elif f_flow == Flows.StatusPreparing:
+            return self.device.flow_status_preparing()
+        return None
+
     async def task_start(self, task_def):
         try:
             await task_def
         except Exception as e:
             await self.device.handle_error(ErrorMessage(e).get(), ErrorReasons.UnknownException)
 
-    async def initialize(self):
+    async def initialize(self) -> bool:
+        """Initializes the device, retrying as `reconnect_backoff` allows. False if it gave up."""
         self.device.on_error = self.on_error
         self.device.on_error.append(self.device_on_error)
         self.logger.info("Initialize")
-        while not await self.device.initialize():
-            await asyncio.sleep(10)
-        pass
+        return await self.__device_initialize_retried(self.device.initialize)
 
-    async def re_initialize(self):
+    async def re_initialize(self) -> bool:
+        """Re-initializes the device (e.g. after its connection got lost), retrying as `reconnect_backoff` allows.
+        False if it gave up."""
         self.logger.info("Re-Initialize")
-        while not await self.device.re_initialize():
-            await asyncio.sleep(10)
+        time_lost = time.perf_counter()
+        if not await self.__device_initialize_retried(self.device.re_initialize):
+            return False
+        self.device.metrics.recovered(time_lost)
+        return True
+
+    async def __device_initialize_retried(self, initialize: typing.Callable[[], typing.Awaitable[bool]]) -> bool:
+        delays = self.reconnect_backoff.delays()
+        attempts = 1
+        while not await self.__device_initialize(initialize):
+            delay = next(delays, None)
+            if delay is None or self.is_ended:
+                self.logger.error("Initialize, Gave up after %s attempts", attempts)
+                return False
+            self.device.metrics.connect_retried()
+            self.logger.info("Initialize, Attempt %s failed, retrying in %.3fs", attempts, delay)
+            await asyncio.sleep(delay)
+            attempts += 1
+        return True
+
+    async def __device_initialize(self, initialize: typing.Callable[[], typing.Awaitable[bool]]) -> bool:
+        if self.initialize_rate_limiter is not None:
+            await self.initialize_rate_limiter.acquire()
+        return await initialize()
+
+    async def __reconnect(self):
+        if not await self.re_initialize():
+            self.logger.error("Re-Initialize, Gave up, ending the simulation")
+            await self.end()
         pass
 
     async def device_on_error(self, desc, reason: ErrorReasons):
         if reason == ErrorReasons.UnknownException:
-            await self.re_initialize()
+            await self.__reconnect()
+        elif reason == ErrorReasons.ConnectionError and not self.is_ended:
+            # Reported by a task of the connection, which re-initializing ends: reconnects from a task of its own
+            if self.__reconnect_task is None or self.__reconnect_task.done():
+                self.__reconnect_task = asyncio.create_task(self.__reconnect())
         pass
 
     async def lifecycle_start(self):
@@ -126,6 +188,10 @@ class Simulator:
 
     async def end(self):
         self.is_ended = True
+        if self.__frequent_flows_stop is not None:
+            self.__frequent_flows_stop()
+        if self.__reconnect_task is not None and self.__reconnect_task is not asyncio.current_task():
+            self.__reconnect_task.cancel()
         await self.device.end()
         pass
 
@@ -0,0 +1,4 @@
+from .options import MockOptions
+from .csms_ocpp_j import MockCsmsOcppJ
+from .csms_ocpp_s import MockCsmsOcppS
+from .ensto_server import MockEnstoServer
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import logging
+import ssl
+import typing
+
+import coloredlogs
+
+from .csms_ocpp_j import MockCsmsOcppJ
+from .csms_ocpp_s import MockCsmsOcppS
+from .ensto_server import MockEnstoServer
+from .options import MockOptions
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m charge_device_simulator.mock",
+        description="Local mock servers to run the simulator against without a real backend")
+    parser.add_argument("--host", default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds to wait before answering a request")
+    parser.add_argument("--latency-jitter", type=float, default=0, help="Up to this many seconds are added randomly to --latency")
+    parser.add_argument(
+        "--reject", action="append", default=[], metavar="ACTION=RATIO",
+        help="Ratio (0..1) of requests of an action to refuse, `*` for all actions, can be repeated")
+    parser.add_argument("--seed", type=int, help="Random seed, for repeatable latencies and rejections")
+    parser.add_argument("--log-level", default='INFO')
+    servers = parser.add_subparsers(dest="server", required=True)
+    ocpp_j = servers.add_parser("ocpp-j", help="OCPP-J 1.6 / 2.0.1 central system (websocket)")
+    ocpp_j.add_argument("--remote-start", type=float, help="Send RemoteStart to each charge point every N seconds")
+    ocpp_j.add_argument("--trigger-message", type=float, help="Send TriggerMessage to each charge point every N seconds")
+    ocpp_j.add_argument("--trigger-message-type", default='MeterValues', help="Message requested by TriggerMessage")
+    ocpp_j.add_argument("--reset", type=float, help="Send Reset to each charge point every N seconds")
+    ocpp_j.add_argument("--tls-cert", help="Certificate (PEM, with its key unless --tls-key) to serve wss:// instead of ws://")
+    ocpp_j.add_argument("--tls-key", help="Key of --tls-cert (PEM)")
+    ocpp_j.add_argument("--tls-client-ca", help="CA (PEM) the charge points' client certificates must be issued by (mutual TLS)")
+    servers.add_parser("ocpp-s", help="OCPP-S central system (SOAP over HTTP, server-201206.wsdl)")
+    servers.add_parser("ensto", help="Ensto backend (key/value messages over TCP)")
+    return parser.parse_args(args)
+
+
+def ssl_context_create(args: argparse.Namespace) -> typing.Optional[ssl.SSLContext]:
+    if not args.tls_cert:
+        return None
+    result = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    result.load_cert_chain(args.tls_cert, args.tls_key)
+    if args.tls_client_ca:
+        result.load_verify_locations(cafile=args.tls_client_ca)
+        result.verify_mode = ssl.CERT_REQUIRED
+    return result
+
+
+def server_create(args: argparse.Namespace):
+    options = MockOptions(
+        latency_seconds=args.latency,
+        latency_jitter_seconds=args.latency_jitter,
+        reject_ratios=MockOptions.parse_reject_ratios(args.reject),
+        seed=args.seed,
+    )
+    if args.server == 'ocpp-j':
+        return MockCsmsOcppJ(
+            args.host, args.port if args.port is not None else 9000, options,
+            remote_start_seconds=args.remote_start,
+            trigger_message_seconds=args.trigger_message,
+            trigger_message=args.trigger_message_type,
+            reset_seconds=args.reset,
+            ssl_context=ssl_context_create(args),
+        )
+    if args.server == 'ocpp-s':
+        return MockCsmsOcppS(args.host, args.port if args.port is not None else 8080, options)
+    if args.server == 'ensto':
+        return MockEnstoServer(args.host, args.port if args.port is not None else 3000, options)
+    raise ValueError(f"Unknown mock server: {args.server}")
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    coloredlogs.install(getattr(logging, arguments.log_level.upper(), logging.INFO))
+    try:
+        asyncio.run(server_create(arguments).serve_forever())
+    except KeyboardInterrupt:
+        pass
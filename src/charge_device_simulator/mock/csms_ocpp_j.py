@@ -0,0 +1,216 @@
+import asyncio
+import datetime
+import itertools
+import json
+import logging
+import ssl
+import typing
+import urllib.parse
+
+import websockets
+
+from ..device.ocpp_j.message_types import MessageTypes
+from ..model import ErrorMessage
+from .options import MockOptions
+
+
+class MockCsmsOcppJ:
+    """Local stand-in for an OCPP-J central system (1.6 and 2.0.1, picked by
+    the negotiated subprotocol), to run the simulator without a real backend.
+
+    Answers BootNotification, Heartbeat, Authorize, Start/StopTransaction,
+    MeterValues, StatusNotification, TransactionEvent and DataTransfer after
+    the configured latency, refusing `reject_ratios` of them (a refusing
+    status, or a CallError for actions without one). Optionally sends
+    RemoteStart, TriggerMessage and Reset requests to each connected charge
+    point every so many seconds."""
+    __logger = logging.getLogger(__name__)
+    protocols = ('ocpp2.0.1', 'ocpp1.6', 'ocpp1.5')
+    # Notifications answered with an empty payload
+    empty_responses = (
+        'metervalues', 'statusnotification', 'firmwarestatusnotification', 'diagnosticsstatusnotification',
+        'notifyevent', 'notifyreport', 'securityeventnotification',
+    )
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 9000,
+            options: typing.Optional[MockOptions] = None,
+            remote_start_seconds: typing.Optional[float] = None,
+            trigger_message_seconds: typing.Optional[float] = None,
+            trigger_message: str = 'MeterValues',
+            reset_seconds: typing.Optional[float] = None,
+            ssl_context: typing.Optional[ssl.SSLContext] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.options = options if options is not None else MockOptions()
+        self.remote_start_seconds = remote_start_seconds
+        self.trigger_message_seconds = trigger_message_seconds
+        self.trigger_message = trigger_message
+        self.reset_seconds = reset_seconds
+        # wss:// when set
+        self.ssl_context = ssl_context
+        # Received requests and sent (server initiated) requests, by action
+        self.received: typing.Dict[str, int] = {}
+        self.rejected: typing.Dict[str, int] = {}
+        self.sent: typing.Dict[str, int] = {}
+        self.connections: typing.Dict[str, typing.Any] = {}
+        self.__transaction_ids = itertools.count(1)
+        self.__request_ids = itertools.count(1)
+        self.__pending: typing.Dict[str, asyncio.Future] = {}
+        self.__server = None
+
+    async def start(self):
+        self.__server = await websockets.serve(
+            self.__handle, self.host, self.port,
+            subprotocols=[websockets.Subprotocol(p) for p in self.protocols],
+            max_size=None,
+            ssl=self.ssl_context,
+        )
+        self.port = next(iter(self.__server.sockets)).getsockname()[1]
+        self.logger.info(f"Mock CSMS OCPP-J Start, URL: {'wss' if self.ssl_context else 'ws'}://{self.host}:{self.port}/")
+
+    async def end(self):
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        pass
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.end()
+
+    async def __handle(self, connection):
+        charge_point_id = urllib.parse.unquote(connection.request.path.rstrip('/').rsplit('/', 1)[-1])
+        version = '2.0.1' if connection.subprotocol == 'ocpp2.0.1' else '1.6'
+        self.connections[charge_point_id] = connection
+        self.logger.debug(f"Mock CSMS, Connected: {charge_point_id}, Protocol: {connection.subprotocol}")
+        tasks: typing.Set[asyncio.Task] = set()
+        periodic = [
+            asyncio.create_task(self.__periodic(seconds, lambda n=name: self.__server_request(connection, version, n)))
+            for name, seconds in (
+                ('remote_start', self.remote_start_seconds),
+                ('trigger_message', self.trigger_message_seconds),
+                ('reset', self.reset_seconds),
+            ) if seconds is not None
+        ]
+        try:
+            async for raw in connection:
+                try:
+                    message = json.loads(raw)
+                    message_type = int(message[0])
+                except (ValueError, TypeError, IndexError) as e:
+                    self.logger.warning(f"Mock CSMS, Invalid message from {charge_point_id}: {ErrorMessage(e).get()}")
+                    continue
+                if message_type == MessageTypes.Req.value:
+                    # Answered by a task, so latency does not hold back the next messages
+                    task = asyncio.create_task(self.__respond(connection, version, message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif len(message) > 1:
+                    future = self.__pending.pop(str(message[1]), None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in itertools.chain(periodic, tasks):
+                task.cancel()
+            if self.connections.get(charge_point_id) is connection:
+                del self.connections[charge_point_id]
+        pass
+
+    @staticmethod
+    async def __periodic(seconds: float, request: typing.Callable[[], typing.Awaitable]):
+        while True:
+            await asyncio.sleep(seconds)
+            await request()
+
+    async def __respond(self, connection, version: str, message: typing.List[typing.Any]):
+        req_id, action = message[1], str(message[2])
+        payload = message[3] if len(message) > 3 else {}
+        self.received[action] = self.received.get(action, 0) + 1
+        await self.options.delay()
+        rejected = self.options.is_rejected(action)
+        if rejected:
+            self.rejected[action] = self.rejected.get(action, 0) + 1
+        result = self.response(version, action, payload, rejected)
+        if result is None:
+            reply = [MessageTypes.RespError.value, req_id,
+                     "NotImplemented" if not rejected else "InternalError", f"{action} not answered by mock CSMS", {}]
+        else:
+            reply = [MessageTypes.Resp.value, req_id, result]
+        try:
+            await connection.send(json.dumps(reply))
+        except websockets.ConnectionClosed:
+            pass
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def response(self, version: str, action: str, payload: typing.Any, rejected: bool) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """Response payload for a request, None if not answered (becomes a CallError).
+        Actions are matched case-insensitively (e.g. `HeartBeat`), as lenient servers do."""
+        action = action.lower()
+        status = 'Rejected' if rejected else 'Accepted'
+        id_status = 'Invalid' if rejected else 'Accepted'
+        if action == 'bootnotification':
+            return {"status": status, "currentTime": self.now_iso(), "interval": 300}
+        if action == 'authorize':
+            return {"idTokenInfo": {"status": id_status}} if version == '2.0.1' else {"idTagInfo": {"status": id_status}}
+        if action == 'starttransaction':
+            return {"transactionId": next(self.__transaction_ids), "idTagInfo": {"status": id_status}}
+        if action == 'stoptransaction':
+            return {"idTagInfo": {"status": id_status}}
+        if action == 'transactionevent':
+            return {"idTokenInfo": {"status": id_status}} if isinstance(payload, dict) and 'idToken' in payload else {}
+        if action == 'datatransfer':
+            return {"status": status}
+        if rejected:
+            return None
+        if action == 'heartbeat':
+            return {"currentTime": self.now_iso()}
+        if action in self.empty_responses:
+            return {}
+        return None
+
+    async def __server_request(self, connection, version: str, name: str):
+        if name == 'remote_start':
+            if version == '2.0.1':
+                await self.request(connection, 'RequestStartTransaction', {
+                    "idToken": {"idToken": "MOCK_CSMS", "type": "Central"},
+                    "remoteStartId": next(self.__request_ids),
+                    "evseId": 1,
+                })
+            else:
+                await self.request(connection, 'RemoteStartTransaction', {"idTag": "MOCK_CSMS", "connectorId": 1})
+        elif name == 'trigger_message':
+            await self.request(connection, 'TriggerMessage', {"requestedMessage": self.trigger_message})
+        elif name == 'reset':
+            await self.request(connection, 'Reset', {"type": "Immediate" if version == '2.0.1' else "Soft"})
+
+    async def request(self, connection, action: str, payload: typing.Dict[str, typing.Any]) -> typing.Any:
+        """Sends a request to a charge point connection, returns its response
+        message (None if it was not answered within the response timeout)."""
+        req_id = f"mock-{next(self.__request_ids)}"
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[req_id] = future
+        self.sent[action] = self.sent.get(action, 0) + 1
+        try:
+            await connection.send(json.dumps([MessageTypes.Req.value, req_id, action, payload]))
+            return await asyncio.wait_for(future, timeout=self.options.response_timeout_seconds)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            return None
+        finally:
+            self.__pending.pop(req_id, None)
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+import itertools
+import logging
+import os
+import typing
+
+from ..device.ocpp_s.soap_server import SoapServer
+from .options import MockOptions
+
+
+class MockCsmsOcppS:
+    """Local stand-in for an OCPP-S (SOAP) central system, built from the
+    `CentralSystemService` of `server-201206.wsdl`. Answers every operation
+    of the service after the configured latency, refusing `reject_ratios` of
+    them (a refusing status, or a SOAP fault for operations without one)."""
+    __logger = logging.getLogger(__name__)
+    wsdl_file_path = f"{os.path.dirname(os.path.realpath(__file__))}/../device/ocpp_s/wsdl/server-201206.wsdl"
+    binding_name = '{urn://Ocpp/Cs/2012/06/}CentralSystemServiceSoap'
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, options: typing.Optional[MockOptions] = None):
+        self.options = options if options is not None else MockOptions()
+        # Requests received, by operation and by charge box identity
+        self.received: typing.Dict[str, int] = {}
+        self.rejected: typing.Dict[str, int] = {}
+        self.charge_boxes: typing.Set[str] = set()
+        self.__transaction_ids = itertools.count(1)
+        self.__server = SoapServer(self.wsdl_file_path, self.binding_name, self.__handle, host, port)
+
+    @property
+    def host(self) -> str:
+        return self.__server.host
+
+    @property
+    def port(self) -> int:
+        return self.__server.port
+
+    async def start(self):
+        await self.__server.start()
+        self.logger.info(f"Mock CSMS OCPP-S Start, URL: http://{self.host}:{self.port}/")
+
+    async def end(self):
+        await self.__server.end()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.end()
+
+    async def __handle(self, operation: str, header: typing.Dict[str, typing.Any], body: typing.Dict[str, typing.Any]) -> typing.Optional[dict]:
+        self.received[operation] = self.received.get(operation, 0) + 1
+        charge_box = header.get('chargeBoxIdentity') or header.get('ChargeBoxIdentity')
+        if charge_box is not None:
+            self.charge_boxes.add(str(charge_box))
+        await self.options.delay()
+        rejected = self.options.is_rejected(operation)
+        if rejected:
+            self.rejected[operation] = self.rejected.get(operation, 0) + 1
+        return self.response(operation, rejected)
+
+    def response(self, operation: str, rejected: bool) -> typing.Optional[dict]:
+        """Response body values for an operation, None if not answered (becomes a SOAP fault)."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        id_tag_info = {"status": 'Invalid' if rejected else 'Accepted'}
+        if operation == 'BootNotification':
+            return {"status": 'Rejected' if rejected else 'Accepted', "currentTime": now, "heartbeatInterval": 300}
+        if operation == 'Authorize':
+            return {"idTagInfo": id_tag_info}
+        if operation == 'StartTransaction':
+            return {"transactionId": next(self.__transaction_ids), "idTagInfo": id_tag_info}
+        if operation == 'StopTransaction':
+            return {"idTagInfo": id_tag_info}
+        if operation == 'DataTransfer':
+            return {"status": 'Rejected' if rejected else 'Accepted'}
+        if rejected:
+            return None
+        if operation == 'Heartbeat':
+            return {"currentTime": now}
+        return {}
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+import typing
+from urllib import parse
+
+from ..model import ErrorMessage
+from .options import MockOptions
+
+
+class MockEnstoServer:
+    """Local stand-in for an Ensto backend: an asyncio TCP server speaking the
+    `imei=...&id=...` key/value framing of `DeviceEnsto`, answering each
+    message with a newline-terminated `id=...&...&chk=...` reply after the
+    configured latency.
+
+    Devices do not terminate their messages, so a read holding several of
+    them is split at each `imei=`. Rejections (`reject_ratios` by device
+    action name, e.g. `authorize`) answer `nack` instead of `ack`, or
+    `success=0` for authorize."""
+    __logger = logging.getLogger(__name__)
+    # Message id -> device action name and reply fields (besides id and chk)
+    messages: typing.Dict[str, typing.Tuple[str, typing.Dict[str, str]]] = {
+        '1': ('register', {'uv': '1'}),
+        '24': ('heart_beat', {}),
+        '2': ('status_update', {'ack': '1'}),
+        '10': ('authorize', {'success': '1'}),
+        '5': ('charge_start', {'ack': '1'}),
+        '43': ('meter_value', {'ack': '1'}),
+        '6': ('charge_stop', {'ack': '1'}),
+    }
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 3000, options: typing.Optional[MockOptions] = None):
+        self.host = host
+        self.port = port
+        self.options = options if options is not None else MockOptions()
+        # Messages received, by device action name
+        self.received: typing.Dict[str, int] = {}
+        self.rejected: typing.Dict[str, int] = {}
+        self.devices: typing.Set[str] = set()
+        self.__server: typing.Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.__server = await asyncio.start_server(self.__connection, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.logger.info(f"Mock Ensto Server Start, Address: {self.host}:{self.port}")
+
+    async def end(self):
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        pass
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.end()
+
+    @staticmethod
+    def split(raw: str) -> typing.List[typing.Dict[str, typing.Optional[str]]]:
+        result = []
+        for message in raw.replace('\n', '').split('imei=')[1:]:
+            values: typing.Dict[str, typing.Optional[str]] = {}
+            for term in f"imei={message}".split("&"):
+                key, separator, value = term.partition('=')
+                values[parse.unquote_plus(key)] = parse.unquote_plus(value) if separator else None
+            result.append(values)
+        return result
+
+    async def __connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks: typing.Set[asyncio.Task] = set()
+        try:
+            while True:
+                raw = await reader.read(65536)
+                if not raw:
+                    break
+                for message in self.split(raw.decode()):
+                    task = asyncio.create_task(self.__respond(writer, message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except ConnectionError as e:
+            self.logger.debug(f"Mock Ensto Server, Connection lost: {ErrorMessage(e).get()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def __respond(self, writer: asyncio.StreamWriter, message: typing.Dict[str, typing.Optional[str]]):
+        message_id = str(message.get('id'))
+        self.devices.add(str(message.get('imei')))
+        if 'ack' in message or 'nack' in message:
+            # A device answering a request of the server, nothing to reply
+            return
+        action, fields = self.messages.get(message_id, (message_id, {'ack': '1'}))
+        self.received[action] = self.received.get(action, 0) + 1
+        await self.options.delay()
+        reply = {'id': message_id, **fields}
+        if self.options.is_rejected(action):
+            self.rejected[action] = self.rejected.get(action, 0) + 1
+            if 'ack' in reply:
+                del reply['ack']
+                reply['nack'] = '1'
+            if 'success' in reply:
+                reply['success'] = '0'
+        if action == 'heart_beat':
+            reply['time'] = str(int(time.time()))
+        # chk goes last: devices keep the line end in the last value
+        reply['chk'] = '1'
+        try:
+            writer.write(('&'.join(f"{k}={parse.quote_plus(v)}" for k, v in reply.items()) + '\n').encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
@@ -0,0 +1,46 @@
+import asyncio
+import random
+import typing
+
+
+class MockOptions:
+    """Behaviour shared by the mock servers: latency added before each answer
+    (`latency_seconds` plus a uniform random part up to `latency_jitter_seconds`)
+    and the ratio of requests to refuse, by action (`*` for any other action)."""
+
+    def __init__(
+            self,
+            latency_seconds: float = 0,
+            latency_jitter_seconds: float = 0,
+            reject_ratios: typing.Optional[typing.Dict[str, float]] = None,
+            response_timeout_seconds: float = 15,
+            seed: typing.Optional[int] = None,
+    ):
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.reject_ratios: typing.Dict[str, float] = dict(reject_ratios or {})
+        for action, ratio in self.reject_ratios.items():
+            if not 0 <= ratio <= 1:
+                raise ValueError(f"Reject ratio of {action} must be between 0 and 1")
+        self.response_timeout_seconds = response_timeout_seconds
+        self.random = random.Random(seed)
+
+    async def delay(self):
+        delay = self.latency_seconds
+        if self.latency_jitter_seconds > 0:
+            delay += self.random.uniform(0, self.latency_jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def is_rejected(self, action: str) -> bool:
+        ratio = self.reject_ratios.get(action, self.reject_ratios.get('*', 0))
+        return ratio > 0 and self.random.random() < ratio
+
+    @staticmethod
+    def parse_reject_ratios(values: typing.Iterable[str]) -> typing.Dict[str, float]:
+        """Parses `Action=ratio` strings (e.g. from the command line)."""
+        result = {}
+        for value in values:
+            action, _, ratio = value.partition('=')
+            result[action.strip()] = float(ratio)
+        return result
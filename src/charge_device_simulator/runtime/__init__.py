@@ -1,3 +1,9 @@
 from .executor_cli import ExecutorCli
 from .config_parser import ConfigParser
 from .config_file_reader import ConfigFileReader
+from .fleet import Fleet
+from .fleet_supervisor import FleetSupervisor
+from .load_generator import LoadGenerator
+from .log_profile import LogProfile
+from .metrics_server import MetricsServer
+from .report import Report
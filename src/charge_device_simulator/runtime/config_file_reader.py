@@ -1,6 +1,10 @@
+import fnmatch
+import itertools
+
 import yaml
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from .config_parser import ConfigParser
+from .device_template import DeviceTemplate
 from .. import device
 
 
@@ -14,6 +18,9 @@ class ConfigFileReader:
         self.file_path = file_path
         self.devices: List[device.DeviceAbstract] = []
         self.simulators: List[device.Simulator] = []
+        self.device_templates: Dict[str, DeviceTemplate] = {}
+        self.fleet_options: Dict[str, Any] = {}
+        self.__simulation_templates: List[Tuple[DeviceTemplate, Dict[str, Any]]] = []
         self.__read_file()
 
     @staticmethod
@@ -34,26 +41,78 @@ class ConfigFileReader:
 
     def __read_file(self):
         file_content: Dict[str, Any] = self.__file_load(self.file_path)
+        section = 'fleet'
+        if section in file_content and file_content[section] is not None:
+            self.fleet_options = file_content[section]
+
         section = 'devices'
         if section in file_content and file_content[section] is not None:
+            for e in file_content[section]:
+                if 'count' in e:
+                    template = DeviceTemplate(e)
+                    self.device_templates[template.name] = template
             self.devices = [
                 n for n in [
-                    ConfigParser.parse_device(e) for e in file_content[section]
+                    ConfigParser.parse_device(e) for e in file_content[section] if 'count' not in e
                 ]
                 if n is not None
             ]
 
         section = 'simulations'
         if section in file_content and file_content[section] is not None:
+            self.__simulation_templates = [
+                (self.device_templates[e['device_name']], e) for e in file_content[section]
+                if e['device_name'] in self.device_templates
+            ]
             self.simulators = [
                 n for n in [
                     ConfigParser.parse_simulator(self.device_find(e['device_name']), e) for e in file_content[section]
+                    if e['device_name'] not in self.device_templates
                 ] if n is not None
             ]
         pass
 
+    def __simulators_expand(self, name_filter: Callable[[str], bool]) -> Iterator[device.Simulator]:
+        # Devices of a template are only created for the simulations that are asked for
+        for template, config in self.__simulation_templates:
+            for index in template.indexes():
+                if not name_filter(DeviceTemplate.simulation_name(config, index)):
+                    continue
+                result = ConfigParser.parse_simulator(
+                    ConfigParser.parse_device(template.device_config(index)),
+                    template.simulation_config(config, index)
+                )
+                if result is not None:
+                    yield result
+
     def device_find(self, name: str) -> Optional[device.DeviceAbstract]:
         return next((e for e in self.devices if e.name == name), None)
 
     def simulator_find(self, name: str) -> Optional[device.Simulator]:
-        return next((e for e in self.simulators if e.name == name), None)
+        result = next((e for e in self.simulators if e.name == name), None)
+        if result is None:
+            result = next(self.__simulators_expand(lambda x: x == name), None)
+        return result
+
+    def simulators_iter(
+            self,
+            pattern: str = '*',
+            position_filter: Optional[Callable[[int, str], bool]] = None
+    ) -> Iterator[device.Simulator]:
+        """Simulators matching `pattern`, and `position_filter` if given, called with the position
+        (from 0, in config order) and the name of each simulation matching `pattern`."""
+        matched = itertools.count()
+
+        def accept(name: str) -> bool:
+            if not fnmatch.fnmatchcase(name, pattern):
+                return False
+            position = next(matched)
+            return position_filter is None or position_filter(position, name)
+
+        for e in self.simulators:
+            if accept(e.name):
+                yield e
+        yield from self.__simulators_expand(accept)
+
+    def simulators_match(self, pattern: str) -> List[device.Simulator]:
+        return list(self.simulators_iter(pattern))
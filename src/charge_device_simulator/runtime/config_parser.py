@@ -1,6 +1,11 @@
+import typing
 from typing import Optional
 
 from .. import device
+from .fleet import Fleet
+from .load_generator import LoadGenerator
+from .log_profile import LogProfile
+from .ramp import RampProfile
 
 
 class ConfigParser:
@@ -22,10 +27,44 @@ class ConfigParser:
                     ff['count']
                 )
         result.is_interactive = config['is_interactive']
+        if 'reconnect' in config and config['reconnect'] is not None:
+            result.reconnect_backoff = device.Backoff.parse(config['reconnect'])
         if 'name' in config:
             result.name = config['name']
         return result
 
+    @staticmethod
+    def parse_fleet(fleet: Fleet, config: typing.Dict[str, typing.Any], share: float = 1) -> Fleet:
+        """Applies the `fleet` config section. Rates are scaled to `share`,
+        the part of the whole fleet run by `fleet` (one of several workers)."""
+        if 'ramp' in config and config['ramp'] is not None:
+            fleet.ramp = RampProfile.parse(config['ramp'], share)
+        if 'initialize_rate' in config:
+            fleet.initialize_rate_limiter = device.TokenBucket(
+                float(config['initialize_rate']) * share,
+                float(config.get('initialize_burst', 1)) * share
+            )
+        if 'boot_notification_rate' in config:
+            fleet.register_rate_limiter = device.TokenBucket(
+                float(config['boot_notification_rate']) * share,
+                float(config.get('boot_notification_burst', 1)) * share
+            )
+        if 'load' in config and config['load'] is not None:
+            load = config['load']
+            fleet.load_generator = LoadGenerator(
+                {k: float(v) * share for k, v in load.get('rates', {}).items()},
+                arrival=load.get('arrival', 'poisson'),
+                duration_seconds=load.get('duration_seconds', None),
+                max_backlog=max(1, int(int(load.get('max_backlog', 10000)) * share)),
+                report_seconds=float(load.get('report_seconds', 10)),
+                start_after_seconds=float(load.get('start_after_seconds', 30)),
+            )
+        if 'logging' in config and config['logging'] is not None:
+            fleet.log_profile = LogProfile.parse(config['logging'], share)
+        if 'soap_max_connections' in config:
+            device.DeviceOcppS.transport_max_connections = max(1, int(int(config['soap_max_connections']) * share))
+        return fleet
+
     @staticmethod
     def parse_device(config) -> device.DeviceAbstract:
         result: Optional[device.DeviceAbstract] = None
@@ -53,13 +92,35 @@ class ConfigParser:
                 dev1.spec_meterType = config['spec_meterType']
             if 'spec_meterSerialNumber' in config:
                 dev1.spec_meterSerialNumber = config['spec_meterSerialNumber']
+            if 'json_codec' in config:
+                dev1.codec = device.JsonCodec.create(config['json_codec'])
+            if 'tls_ca_file' in config:
+                dev1.tls_ca_file = config['tls_ca_file']
+            if 'tls_cert_file' in config:
+                dev1.tls_cert_file = config['tls_cert_file']
+            if 'tls_key_file' in config:
+                dev1.tls_key_file = config['tls_key_file']
+            if 'tls_key_password' in config:
+                dev1.tls_key_password = config['tls_key_password']
             result = dev1
         if config['type'] == 'ocpp-s':
             dev1 = device.DeviceOcppS(config['spec_identifier'])
             if 'server_address' in config:
                 dev1.server_address = config['server_address']
+            if 'listen_host' in config:
+                dev1.listen_host = config['listen_host']
+            if 'listen_port' in config:
+                dev1.listen_port = config['listen_port']
             if 'from_address' in config:
                 dev1.from_address = config['from_address']
+            elif dev1.listen_port is not None:
+                # An ephemeral port or a wildcard host is no address the central system can call back
+                if not dev1.listen_port or dev1.listen_host in ('', '0.0.0.0', '::'):
+                    raise ValueError(
+                        f"OCPP-S device {dev1.deviceId} listening on {dev1.listen_host}:{dev1.listen_port} needs an explicit from_address")
+                dev1.from_address = f"http://{dev1.listen_host}:{dev1.listen_port}/"
+            if 'soap_templates' in config:
+                dev1.soap_templates = config['soap_templates']
             if 'protocols' in config:
                 dev1.protocols = config['protocols']
             if 'spec_chargeBoxSerialNumber' in config:
@@ -103,6 +164,15 @@ class ConfigParser:
             result.error_exit = config['error_exit']
         if 'response_timeout_seconds' in config:
             result.response_timeout_seconds = config['response_timeout_seconds']
+        if 'log_level' in config:
+            result.log_level = config['log_level']
+        if 'message_ids' in config:
+            result.message_ids = device.MessageIds(config['message_ids'], device.MessageIds.prefix_of(result.deviceId))
+        if 'max_in_flight' in config:
+            result.max_in_flight = config['max_in_flight']
+        if 'middleware_responses' in config:
+            for action, payload in config['middleware_responses'].items():
+                result.middleware_handler_set(str(action), device.static_handler(payload))
 
         return result
 
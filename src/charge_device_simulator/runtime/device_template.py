@@ -0,0 +1,75 @@
+import re
+import typing
+
+
+class DeviceTemplate:
+    """A `devices` entry with a `count`, standing for `count` devices.
+
+    Every string value (also inside nested options) may use an `{index}`
+    placeholder with any format spec, e.g. `SIM_{index:05d}`; other braces are
+    kept as they are. Indexes run from `index_start` (default 0). Server keys
+    given as a list are sharded round-robin over the indexes. A `name` or
+    `spec_identifier` without any placeholder gets `_{index}` appended so
+    expanded devices stay unique.
+
+    Expansion is done one index at a time, so the expanded config never
+    exists as a whole in memory."""
+
+    shard_keys = ('server_address', 'server_host', 'server_port')
+    unique_keys = ('name', 'spec_identifier')
+    # Only `{index}` and `{index:<spec>}`, other braces (e.g. JSON in options) are kept as they are
+    placeholder = re.compile(r'\{index(?::([^{}]*))?\}')
+
+    def __init__(self, config: typing.Dict[str, typing.Any]):
+        self.config = config
+        self.name: str = config['name']
+        self.count: int = int(config['count'])
+        self.index_start: int = int(config.get('index_start', 0))
+
+    def indexes(self) -> range:
+        return range(self.index_start, self.index_start + self.count)
+
+    def device_config(self, index: int) -> typing.Dict[str, typing.Any]:
+        result = {}
+        for key, value in self.config.items():
+            if key in ('count', 'index_start'):
+                continue
+            if key in self.shard_keys and isinstance(value, list):
+                value = value[(index - self.index_start) % len(value)]
+            result[key] = self.format(value, index)
+        self.__make_unique(result, index)
+        return result
+
+    def simulation_config(self, config: typing.Dict[str, typing.Any], index: int) -> typing.Dict[str, typing.Any]:
+        result = self.format(config, index)
+        result['name'] = self.simulation_name(config, index)
+        result['device_name'] = self.device_config_name(index)
+        return result
+
+    def device_config_name(self, index: int) -> str:
+        name = self.format(self.name, index)
+        return name if name != self.name else f"{name}_{index}"
+
+    @staticmethod
+    def simulation_name(config: typing.Dict[str, typing.Any], index: int) -> str:
+        name = DeviceTemplate.format(config.get('name', ''), index)
+        return name if name != config.get('name', '') else f"{name}_{index}"
+
+    @staticmethod
+    def format(value: typing.Any, index: int) -> typing.Any:
+        # Containers are always rebuilt, so expanded entries never share
+        # mutable options (devices write into their flow options)
+        if isinstance(value, str):
+            if '{index' not in value:
+                return value
+            return DeviceTemplate.placeholder.sub(lambda m: format(index, m.group(1) or ''), value)
+        if isinstance(value, dict):
+            return {k: DeviceTemplate.format(v, index) for k, v in value.items()}
+        if isinstance(value, list):
+            return [DeviceTemplate.format(v, index) for v in value]
+        return value
+
+    def __make_unique(self, config: typing.Dict[str, typing.Any], index: int):
+        for key in self.unique_keys:
+            if key in self.config and key in config and config[key] == self.config[key]:
+                config[key] = f"{config[key]}_{index}"
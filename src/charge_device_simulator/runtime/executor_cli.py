@@ -1,14 +1,25 @@
 import argparse
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional
 
-from ..device import ErrorReasons, Simulator
+from ..device import DeviceMetrics, ErrorReasons, Simulator
 from ..model import ErrorMessage
 
 from .config_file_reader import ConfigFileReader
+from .config_parser import ConfigParser
+from .fleet import Fleet
+from .fleet_supervisor import FleetSupervisor
+from .metrics_server import MetricsServer
+from .report import Report
 
 
 class ExecutorCli:
     simulator: Simulator = None
+    fleet: Fleet = None
+    fleet_supervisor: FleetSupervisor = None
+    metrics_server: MetricsServer = None
+    report_json: Optional[str] = None
+    report_table = True
     on_error = []
 
     def initialize(self, args=None):
@@ -17,23 +28,107 @@ class ExecutorCli:
             "--config", help="The file path to the config file")
         parser.add_argument(
             "--simulation",
-            help="Simulation name (defined in config file) to run"
+            help="Simulation name (defined in config file) to run, "
+                 "with --fleet a glob pattern of simulation names (default: all)"
+        )
+        parser.add_argument(
+            "--fleet", action="store_true",
+            help="Run all matching simulations in one process"
+        )
+        parser.add_argument(
+            "--workers", type=int,
+            help="With --fleet, shard the simulations over this many processes (0: one per CPU core)"
+        )
+        parser.add_argument(
+            "--metrics-port", type=int,
+            help="Serve metrics (Prometheus text format) on this port at /metrics, "
+                 "with --workers each worker uses the next port"
+        )
+        parser.add_argument(
+            "--metrics-host", default='127.0.0.1',
+            help="Address to serve metrics on (default: 127.0.0.1)"
+        )
+        parser.add_argument(
+            "--report-json",
+            help="Write the end-of-run report as JSON to this file path"
+        )
+        parser.add_argument(
+            "--no-report", action="store_true",
+            help="Do not print the end-of-run report table"
         )
         if args is None:
             args = vars(parser.parse_args())
+        self.report_json = args.get('report_json')
+        self.report_table = not args.get('no_report', False)
+        metrics_port = args.get('metrics_port')
+        metrics_host = args.get('metrics_host') or '127.0.0.1'
+        if args.get('fleet', False) and args.get('workers') is not None:
+            self.fleet_supervisor = FleetSupervisor(
+                args['config'], args.get('simulation') or '*', args['workers'], metrics_port, metrics_host)
+            return
         config_reader = ConfigFileReader(file_path=args['config'])
+        if args.get('fleet', False):
+            simulators = config_reader.simulators_match(args.get('simulation') or '*')
+            if len(simulators) <= 0:
+                raise NameError('Simulation not found')
+            self.fleet = ConfigParser.parse_fleet(Fleet(simulators), config_reader.fleet_options)
+            self.fleet.on_error = self.on_error
+            if metrics_port is not None:
+                self.metrics_server = MetricsServer(self.fleet.devices, metrics_port, metrics_host)
+            return
         self.simulator = config_reader.simulator_find(args['simulation'])
         if self.simulator is None:
             raise NameError('Simulation not found')
         self.simulator.on_error = self.on_error
+        if metrics_port is not None:
+            self.metrics_server = MetricsServer(lambda: [self.simulator.device], metrics_port, metrics_host)
         pass
 
-    async def execute(self):
+    async def execute(self) -> int:
+        if self.fleet_supervisor is not None:
+            result = await self.fleet_supervisor.execute()
+            self.report_write(Report.from_summary(self.fleet_supervisor.summary()))
+            return result
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+        time_start = time.monotonic()
+        result = 1
+        try:
+            result = await self.__execute()
+            return result
+        finally:
+            if self.metrics_server is not None:
+                await self.metrics_server.end()
+            if self.fleet is not None:
+                self.report_write(Report.from_summary(self.fleet.summary()))
+            elif self.simulator is not None and self.simulator.device is not None:
+                # The process aggregate, unlike the device metrics, also counts throughput per window
+                self.report_write(Report(DeviceMetrics.process, {
+                    "simulations": 1,
+                    "succeeded": 1 if result == 0 else 0,
+                    "failed": [] if result == 0 else [self.simulator.name],
+                    "duration_seconds": time.monotonic() - time_start,
+                }))
+
+    def report_write(self, report: Report):
+        if self.report_json is not None:
+            report.write_json(self.report_json)
+        if self.report_table:
+            print(report.table())
+        pass
+
+    async def __execute(self) -> int:
+        if self.fleet is not None:
+            return await self.fleet.execute()
         if self.simulator is None or self.simulator.device is None:
-            return
+            return 1
         try:
-            await self.simulator.initialize()
+            if not await self.simulator.initialize():
+                await self.simulator.end()
+                return 1
             await self.simulator.lifecycle_start()
             await self.simulator.end()
         except Exception as e:
             await self.simulator.device.handle_error(ErrorMessage(e).get(), ErrorReasons.UnknownException)
+            return 1
+        return 0
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+import typing
+
+from ..device import DeviceAbstract, DeviceMetrics, ErrorReasons, Simulator, TokenBucket
+from ..model import ErrorMessage
+from .load_generator import LoadGenerator
+from .log_profile import LogProfile
+from .ramp import RampProfile
+
+
+class Fleet:
+    """Runs many simulators inside one event loop, each one as its own task.
+    All of them share the lifecycle of the fleet: `execute` returns once every
+    simulator has finished (or the fleet got cancelled), with an aggregate exit
+    status of 0 when all of them succeeded and 1 otherwise.
+
+    Starting can be spread by a `ramp` profile, and limited by token buckets on
+    `Simulator.initialize` attempts and on registrations (BootNotification).
+    How long the ramp and the initialize phases took is kept in `phases`.
+    With a `load_generator`, open-loop load is offered over the initialized
+    simulators once every simulator got past its initialize phase, or its
+    `start_after_seconds` after the ramp: simulators initialized later join
+    the load, and the ones still initializing when it is over fail. A quiet
+    `log_profile` replaces most device logs by a periodic fleet summary."""
+    __logger = logging.getLogger(__name__)
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(self, simulators: typing.Iterable[Simulator]):
+        self.simulators: typing.List[Simulator] = list(simulators)
+        self.on_error = []
+        self.results: typing.Dict[str, bool] = {}
+        self.duration_seconds: float = 0
+        self.ramp: typing.Optional[RampProfile] = None
+        self.initialize_rate_limiter: typing.Optional[TokenBucket] = None
+        self.register_rate_limiter: typing.Optional[TokenBucket] = None
+        self.load_generator: typing.Optional[LoadGenerator] = None
+        self.log_profile: typing.Optional[LogProfile] = None
+        self.phases: typing.Dict[str, float] = {}
+        self.initialize_durations: typing.List[float] = []
+        # Aggregate of the device metrics of this fleet, devices record into it as their parent
+        self.metrics = DeviceMetrics(parent=DeviceMetrics.process, window_seconds=10)
+        for sim in self.simulators:
+            sim.device.metrics.parent = self.metrics
+        self.__tasks: typing.List[asyncio.Task] = []
+        self.__time_start: float = 0
+        self.__started = 0
+        self.__initialize_settled: typing.Set[int] = set()
+        self.__initialized: typing.List[Simulator] = []
+        self.__initialize_all: typing.Optional[asyncio.Event] = None
+        self.__load_finished: typing.Optional[asyncio.Event] = None
+
+    @property
+    def failed(self) -> typing.List[str]:
+        return [name for name, success in self.results.items() if not success]
+
+    async def execute(self) -> int:
+        self.logger.info(f"Fleet Start, Simulations: {len(self.simulators)}")
+        self.__time_start = time.monotonic()
+        self.__initialize_all = asyncio.Event()
+        self.__load_finished = asyncio.Event()
+        self.__tasks = [
+            asyncio.create_task(self.run_simulator(sim, index), name=f"simulation:{sim.name}")
+            for index, sim in enumerate(self.simulators)
+        ]
+        if self.load_generator is not None:
+            self.__tasks.append(asyncio.create_task(self.__load_run(), name="load"))
+        log_summary_task = None
+        if self.log_profile is not None and self.log_profile.is_quiet:
+            self.log_profile.apply(self.devices())
+            log_summary_task = asyncio.create_task(self.__log_summary_run(), name="log_summary")
+        try:
+            await asyncio.gather(*self.__tasks)
+        except asyncio.CancelledError:
+            await self.end()
+            raise
+        finally:
+            self.duration_seconds = time.monotonic() - self.__time_start
+            if log_summary_task is not None:
+                log_summary_task.cancel()
+        self.logger.info(
+            f"Fleet, Phases, Ramp: {self.phases.get('ramp', 0):.3f}s, Initialize: {self.phases.get('initialize', 0):.3f}s, "
+            f"Initialize max: {max(self.initialize_durations, default=0):.3f}s")
+        failed = self.failed
+        if len(failed) > 0:
+            self.logger.warning(f"Fleet End, Failed: {len(failed)}/{len(self.simulators)}, Simulations: {', '.join(failed)}")
+            return 1
+        self.logger.info(f"Fleet End, Succeeded: {len(self.simulators)}")
+        return 0
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        failed = self.failed
+        return {
+            "simulations": len(self.simulators),
+            "succeeded": len(self.results) - len(failed),
+            "failed": failed,
+            "duration_seconds": self.duration_seconds,
+            "phases": dict(self.phases),
+            "initialize_durations": {
+                "count": len(self.initialize_durations),
+                "total": sum(self.initialize_durations),
+                "max": max(self.initialize_durations, default=0),
+            },
+            "load": self.load_generator.summary() if self.load_generator is not None else {},
+            "metrics": self.metrics.to_dict(),
+        }
+
+    def devices(self) -> typing.List[DeviceAbstract]:
+        return [sim.device for sim in self.simulators]
+
+    async def __log_summary_run(self):
+        while True:
+            await asyncio.sleep(self.log_profile.summary_seconds)
+            self.logger.info(self.log_profile.summary(self.devices(), self.metrics, self.log_profile.summary_seconds))
+
+    def __phase_end(self, phase: str):
+        self.phases[phase] = max(self.phases.get(phase, 0), time.monotonic() - self.__time_start)
+
+    async def run_simulator(self, simulator: Simulator, index: int = 0) -> bool:
+        if simulator.is_interactive:
+            # All simulations share one stdin, a menu per simulation is not usable
+            self.logger.warning(f"Fleet, Simulation {simulator.name} is interactive, running it non-interactive")
+            simulator.is_interactive = False
+        # Each simulator appends its own error handler to this list,
+        # so it must not be shared between simulators
+        simulator.on_error = list(self.on_error)
+        simulator.initialize_rate_limiter = self.initialize_rate_limiter
+        simulator.device.register_rate_limiter = self.register_rate_limiter
+        success = False
+        try:
+            await self.__ramp_wait(index)
+            time_initialize = time.monotonic()
+            if not await self.__initialize(simulator):
+                return False
+            self.initialize_durations.append(time.monotonic() - time_initialize)
+            self.__phase_end('initialize')
+            self.__initialized.append(simulator)
+            self.__initialize_settle(simulator)
+            await simulator.lifecycle_start()
+            if self.load_generator is not None:
+                await self.__load_finished.wait()
+            success = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await simulator.device.handle_error(ErrorMessage(e).get(), ErrorReasons.UnknownException)
+        finally:
+            self.__initialize_settle(simulator)
+            self.results[simulator.name] = success
+            await self.__simulator_end(simulator)
+        return success
+
+    async def __initialize(self, simulator: Simulator) -> bool:
+        if self.load_generator is None:
+            return await simulator.initialize()
+        # No use initializing once the load it would join is over
+        initialize = asyncio.create_task(simulator.initialize())
+        load_finished = asyncio.create_task(self.__load_finished.wait())
+        try:
+            await asyncio.wait((initialize, load_finished), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            load_finished.cancel()
+            if not initialize.done():
+                initialize.cancel()
+                await asyncio.gather(initialize, return_exceptions=True)
+        if initialize.cancelled():
+            self.logger.warning(f"Fleet, Simulation {simulator.name} not initialized by the end of the load")
+            return False
+        return initialize.result()
+
+    def __initialize_settle(self, simulator: Simulator):
+        if id(simulator) in self.__initialize_settled:
+            return
+        self.__initialize_settled.add(id(simulator))
+        if len(self.__initialize_settled) >= len(self.simulators):
+            self.__initialize_all.set()
+
+    async def __load_run(self):
+        try:
+            ramp_seconds = self.ramp.offset(len(self.simulators) - 1) if self.ramp is not None and len(self.simulators) > 0 else 0
+            timeout = ramp_seconds + self.load_generator.start_after_seconds - (time.monotonic() - self.__time_start)
+            try:
+                await asyncio.wait_for(self.__initialize_all.wait(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                self.logger.warning(
+                    f"Fleet, Load starting with {len(self.__initialized)}/{len(self.simulators)} simulations initialized, "
+                    f"the others join it once initialized")
+            # Simulators initialized later are appended to this same list, and so join the load
+            await self.load_generator.run(self.__initialized)
+        finally:
+            self.__load_finished.set()
+
+    async def __ramp_wait(self, index: int):
+        if self.ramp is not None:
+            delay = self.ramp.offset(index) - (time.monotonic() - self.__time_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self.__phase_end('ramp')
+        self.__started += 1
+        if self.__started == len(self.simulators):
+            self.logger.info(f"Fleet, Ramp done, Started: {self.__started}, Time: {self.phases['ramp']:.3f}s")
+
+    async def __simulator_end(self, simulator: Simulator):
+        if simulator.is_ended:
+            return
+        try:
+            await simulator.end()
+        except Exception as e:
+            self.logger.warning(f"Fleet, Simulation {simulator.name} end failed: {ErrorMessage(e).get()}")
+
+    async def end(self):
+        if self.load_generator is not None:
+            self.load_generator.end()
+        for task in self.__tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        pass
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import typing
+from multiprocessing.connection import Connection
+
+from ..device import DeviceMetrics
+from .config_file_reader import ConfigFileReader
+from .config_parser import ConfigParser
+from .fleet import Fleet
+from .metrics_server import MetricsServer
+
+
+class FleetSupervisor:
+    """Shards the simulations of a fleet over worker processes, each one running
+    its own event loop with a `Fleet` of its share of simulations.
+
+    Simulations are assigned round-robin by their position in the config
+    (after glob filtering), so the same config always gives the same
+    simulation-to-worker assignment. Each worker sends back its fleet summary,
+    which the supervisor merges. With a `metrics_port`, worker N serves its
+    metrics on `metrics_port + N`. Cancelling `execute` (e.g. Ctrl-C) terminates
+    the workers, which end their simulations before exiting."""
+    __logger = logging.getLogger(__name__)
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(
+            self,
+            config_path: str,
+            pattern: str = '*',
+            workers: int = 0,
+            metrics_port: typing.Optional[int] = None,
+            metrics_host: str = '127.0.0.1',
+    ):
+        self.config_path = config_path
+        self.pattern = pattern
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.workers: int = workers if workers > 0 else (os.cpu_count() or 1)
+        self.summaries: typing.List[typing.Dict[str, typing.Any]] = []
+        self.__processes: typing.List[multiprocessing.Process] = []
+
+    @staticmethod
+    def shard_filter(worker: int, workers: int) -> typing.Callable[[int, str], bool]:
+        """Round-robin share of `worker`, a position filter of `ConfigFileReader.simulators_iter`."""
+        return lambda position, name: position % workers == worker
+
+    async def execute(self) -> int:
+        # `spawn` keeps workers independent of the (running) event loop of this process
+        context = multiprocessing.get_context('spawn')
+        connections: typing.List[Connection] = []
+        for worker in range(self.workers):
+            conn_read, conn_write = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_worker_main,
+                name=f"fleet-worker-{worker}",
+                args=(
+                    self.config_path, self.pattern, worker, self.workers, conn_write, logging.getLogger().level,
+                    None if self.metrics_port is None else self.metrics_port + worker, self.metrics_host,
+                ),
+                daemon=True,
+            )
+            process.start()
+            conn_write.close()
+            self.__processes.append(process)
+            connections.append(conn_read)
+        self.logger.info(f"Fleet Supervisor Start, Workers: {self.workers}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.gather(*(loop.run_in_executor(None, self.__receive, conn) for conn in connections))
+        except asyncio.CancelledError:
+            self.end()
+            raise
+        finally:
+            for process in self.__processes:
+                await loop.run_in_executor(None, process.join)
+
+        self.summaries = [e for e in results if e is not None]
+        summary = self.summary()
+        if len(self.summaries) < self.workers:
+            self.logger.warning(f"Fleet Supervisor, {self.workers - len(self.summaries)} worker(s) exited without a result")
+            return 1
+        if summary['simulations'] <= 0:
+            self.logger.warning(f"Fleet Supervisor, Simulation not found: {self.pattern}")
+            return 1
+        if len(summary['failed']) > 0:
+            self.logger.warning(f"Fleet Supervisor End, Failed: {len(summary['failed'])}/{summary['simulations']}")
+            return 1
+        self.logger.info(f"Fleet Supervisor End, Succeeded: {summary['simulations']}")
+        return 0
+
+    @staticmethod
+    def __receive(conn: Connection) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        try:
+            return conn.recv()
+        except EOFError:
+            return None
+        finally:
+            conn.close()
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "workers": self.workers,
+            "simulations": sum(e['simulations'] for e in self.summaries),
+            "succeeded": sum(e['succeeded'] for e in self.summaries),
+            "failed": [name for e in self.summaries for name in e['failed']],
+            "duration_seconds": max((e['duration_seconds'] for e in self.summaries), default=0),
+            "phases": {
+                phase: max(e['phases'].get(phase, 0) for e in self.summaries)
+                for phase in {k for e in self.summaries for k in e['phases']}
+            },
+            "initialize_durations": {
+                "count": sum(e['initialize_durations']['count'] for e in self.summaries),
+                "total": sum(e['initialize_durations']['total'] for e in self.summaries),
+                "max": max((e['initialize_durations']['max'] for e in self.summaries), default=0),
+            },
+            # Every worker offers its share of the load, so counts and rates add up
+            "load": {
+                message: {
+                    key: sum(e['load'][message][key] for e in self.summaries if message in e['load'])
+                    for key in next(e['load'][message] for e in self.summaries if message in e['load'])
+                }
+                for message in {k for e in self.summaries for k in e['load']}
+            },
+            "metrics": DeviceMetrics.merged(DeviceMetrics.from_dict(e['metrics']) for e in self.summaries).to_dict(),
+        }
+
+    def end(self):
+        for process in self.__processes:
+            if process.is_alive():
+                process.terminate()
+        pass
+
+
+def _worker_main(
+        config_path: str,
+        pattern: str,
+        worker: int,
+        workers: int,
+        conn: Connection,
+        log_level: int,
+        metrics_port: typing.Optional[int] = None,
+        metrics_host: str = '127.0.0.1',
+):
+    logging.basicConfig(level=log_level, format='%(asctime)s %(processName)s %(name)s %(levelname)s %(message)s')
+    config_reader = ConfigFileReader(file_path=config_path)
+    fleet = ConfigParser.parse_fleet(
+        Fleet(config_reader.simulators_iter(pattern, FleetSupervisor.shard_filter(worker, workers))),
+        config_reader.fleet_options,
+        1 / workers
+    )
+    metrics_server = None if metrics_port is None else MetricsServer(fleet.devices, metrics_port, metrics_host)
+    try:
+        asyncio.run(_worker_execute(fleet, metrics_server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.send(fleet.summary())
+        conn.close()
+
+
+async def _worker_execute(fleet: Fleet, metrics_server: typing.Optional[MetricsServer] = None):
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except NotImplementedError:  # Windows
+        pass
+    if metrics_server is not None:
+        await metrics_server.start()
+    try:
+        await fleet.execute()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if metrics_server is not None:
+            await metrics_server.end()
@@ -0,0 +1,177 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+import typing
+
+from ..device import Simulator
+from ..model import ErrorMessage
+
+
+class LoadStats:
+    def __init__(self, message: str, rate: float):
+        self.message = message
+        self.rate = rate
+        self.offered = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.in_flight_max = 0
+
+    def summary(self, duration_seconds: float) -> typing.Dict[str, typing.Any]:
+        duration_seconds = max(duration_seconds, 1e-9)
+        return {
+            "target_rate": self.rate,
+            "offered": self.offered,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "backlog": self.in_flight,
+            "backlog_max": self.in_flight_max,
+            "offered_rate": self.offered / duration_seconds,
+            "achieved_rate": self.completed / duration_seconds,
+        }
+
+
+class LoadGenerator:
+    """Open-loop load: each message type arrives at its target aggregate rate
+    (constant or Poisson inter-arrival times), spread round-robin over the
+    simulators, whether or not earlier requests got answered. A slow CSMS
+    therefore grows the backlog (requests in flight) instead of silently
+    lowering the offered load. Arrivals beyond `max_backlog` are dropped and
+    counted. A fleet starts the load once its simulators are initialized, or
+    `start_after_seconds` after its ramp with the ones initialized by then."""
+    __logger = logging.getLogger(__name__)
+    arrivals = ('poisson', 'constant')
+    messages: typing.Dict[str, typing.Callable[[Simulator], typing.Awaitable[bool]]] = {
+        'heartbeat': lambda sim: sim.device.action_heart_beat(),
+        'authorize': lambda sim: sim.device.action_authorize(sim.flow_charge_options),
+        'status_notification': lambda sim: sim.device.action_status_update("Available", sim.flow_charge_options),
+        'meter_values': lambda sim: sim.device.action_meter_value(sim.flow_charge_options),
+        'start_transaction': lambda sim: sim.device.action_charge_start(dict(sim.flow_charge_options)),
+        'stop_transaction': lambda sim: sim.device.action_charge_stop(dict(sim.flow_charge_options)),
+        'data_transfer': lambda sim: sim.device.action_data_transfer(
+            sim.flow_charge_options.get('dataTransfer', {'vendorId': 'device-simulator'})),
+    }
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(
+            self,
+            rates: typing.Dict[str, float],
+            arrival: str = 'poisson',
+            duration_seconds: typing.Optional[float] = None,
+            max_backlog: int = 10000,
+            report_seconds: float = 10,
+            start_after_seconds: float = 30,
+    ):
+        for message in rates:
+            if message not in self.messages:
+                raise ValueError(f"Unknown load message: {message}, supported: {', '.join(self.messages)}")
+        if arrival not in self.arrivals:
+            raise ValueError(f"Unknown load arrival: {arrival}, supported: {', '.join(self.arrivals)}")
+        self.stats: typing.Dict[str, LoadStats] = {k: LoadStats(k, v) for k, v in rates.items() if v > 0}
+        self.arrival = arrival
+        self.duration_seconds = duration_seconds
+        self.max_backlog = max_backlog
+        self.report_seconds = report_seconds
+        self.start_after_seconds = start_after_seconds
+        self.is_ended = False
+        self.time_elapsed: float = 0
+        self.__random = random.Random()
+        self.__tasks: typing.Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__tasks)
+
+    async def run(self, simulators: typing.Sequence[Simulator]):
+        """Offers the load over `simulators`, including the ones added to it while running."""
+        if len(simulators) <= 0 or len(self.stats) <= 0:
+            return
+        self.logger.info(
+            f"Load Start, Devices: {len(simulators)}, Arrival: {self.arrival}, "
+            f"Rates: {', '.join(f'{k}={v.rate}/s' for k, v in self.stats.items())}")
+        time_start = time.monotonic()
+        # One independent cycle per message, so every message type is spread over all devices
+        streams = [
+            asyncio.create_task(self.__arrivals(stats, simulators))
+            for stats in self.stats.values()
+        ]
+        reporter = asyncio.create_task(self.__report(time_start))
+        try:
+            await asyncio.gather(*streams)
+        finally:
+            for task in streams:
+                task.cancel()
+            self.time_elapsed = time.monotonic() - time_start
+            if len(self.__tasks) > 0:
+                await asyncio.wait(self.__tasks)
+            reporter.cancel()
+        self.__log(self.time_elapsed)
+
+    def end(self):
+        self.is_ended = True
+
+    def __interval(self, rate: float) -> float:
+        if self.arrival == 'poisson':
+            return self.__random.expovariate(rate)
+        return 1 / rate
+
+    async def __arrivals(self, stats: LoadStats, simulators: typing.Sequence[Simulator]):
+        # Round-robin by position rather than itertools.cycle, which would not see simulators added later
+        positions = itertools.count()
+        loop = asyncio.get_running_loop()
+        time_end = None if self.duration_seconds is None else loop.time() + self.duration_seconds
+        time_next = loop.time()
+        while not self.is_ended:
+            now = loop.time()
+            if time_end is not None and now >= time_end:
+                break
+            # All arrivals due by now are issued in one wake-up
+            while time_next <= now:
+                self.__arrive(stats, simulators[next(positions) % len(simulators)])
+                time_next += self.__interval(stats.rate)
+            await asyncio.sleep(time_next - now)
+
+    def __arrive(self, stats: LoadStats, simulator: Simulator):
+        stats.offered += 1
+        if len(self.__tasks) >= self.max_backlog:
+            stats.dropped += 1
+            return
+        stats.in_flight += 1
+        stats.in_flight_max = max(stats.in_flight_max, stats.in_flight)
+        task = asyncio.create_task(self.__send(stats, simulator))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __send(self, stats: LoadStats, simulator: Simulator):
+        try:
+            if await self.messages[stats.message](simulator):
+                stats.completed += 1
+            else:
+                stats.failed += 1
+        except Exception as e:
+            stats.failed += 1
+            self.logger.debug(f"Load, {stats.message} failed on {simulator.name}: {ErrorMessage(e).get()}")
+        finally:
+            stats.in_flight -= 1
+
+    async def __report(self, time_start: float):
+        while True:
+            await asyncio.sleep(self.report_seconds)
+            self.__log(time.monotonic() - time_start)
+
+    def __log(self, duration_seconds: float):
+        for stats in self.stats.values():
+            e = stats.summary(duration_seconds)
+            self.logger.info(
+                f"Load, {stats.message}, Target: {e['target_rate']:.1f}/s, Offered: {e['offered_rate']:.1f}/s, "
+                f"Achieved: {e['achieved_rate']:.1f}/s, Failed: {e['failed']}, Dropped: {e['dropped']}, Backlog: {e['backlog']}")
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        return {k: v.summary(self.time_elapsed) for k, v in self.stats.items()}
@@ -0,0 +1,78 @@
+import logging
+import math
+import typing
+
+from ..device import DeviceAbstract, DeviceMetrics
+from ..device.device_logger import DeviceLogger
+from ..device.metrics import ActionMetrics
+
+
+class LogProfile:
+    """How much the devices of a fleet log.
+
+    + `normal`: each device logs at the level of its device type's logger, or
+      at its own `log_level`
+    + `quiet`: devices log at `device_level` (default WARNING), except the
+      first `sample_devices` of them and those with a `log_level` of their
+      own. Instead, the fleet logs a summary every `summary_seconds`:
+      devices connected and charging, requests since the previous summary
+      and latency percentiles since start.
+    """
+    profiles = ('normal', 'quiet')
+
+    def __init__(
+            self,
+            profile: str = 'normal',
+            device_level: typing.Union[int, str] = logging.WARNING,
+            sample_devices: int = 0,
+            summary_seconds: float = 30,
+    ):
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown log profile: {profile}, supported: {', '.join(self.profiles)}")
+        if sample_devices < 0 or summary_seconds <= 0:
+            raise ValueError(f"Invalid log options for profile: {profile}")
+        self.profile = profile
+        self.device_level = DeviceLogger.level_parse(device_level)
+        self.sample_devices = sample_devices
+        self.summary_seconds = summary_seconds
+        self.__previous = ActionMetrics()
+
+    @property
+    def is_quiet(self) -> bool:
+        return self.profile == 'quiet'
+
+    @staticmethod
+    def parse(config: typing.Dict[str, typing.Any], share: float = 1) -> 'LogProfile':
+        """Builds a profile from a config section; a worker running `share` of
+        the fleet keeps its part of the sampled devices (at least one if any)."""
+        return LogProfile(
+            profile=config.get('profile', 'normal'),
+            device_level=config.get('device_level', logging.WARNING),
+            sample_devices=math.ceil(int(config.get('sample_devices', 0)) * share),
+            summary_seconds=float(config.get('summary_seconds', 30)),
+        )
+
+    def apply(self, devices: typing.Sequence[DeviceAbstract]):
+        if not self.is_quiet:
+            return
+        for device in devices[self.sample_devices:]:
+            if device.log_level is None:
+                device.log_level = self.device_level
+        pass
+
+    def summary(self, devices: typing.Iterable[DeviceAbstract], metrics: DeviceMetrics, seconds: float) -> str:
+        """Summary line, with request counts since the previous summary (over `seconds`)."""
+        total = connected = charging = 0
+        for device in devices:
+            total += 1
+            connected += 1 if device.is_connected else 0
+            charging += 1 if device.charge_in_progress else 0
+        totals = metrics.totals()
+        previous, self.__previous = self.__previous, totals
+        responded = totals.responded - previous.responded
+        return (
+            f"Fleet, Summary, Devices: {total}, Connected: {connected}, Charging: {charging}, "
+            f"Sent: {totals.sent - previous.sent}, Responded: {responded} ({responded / max(seconds, 1e-9):.1f}/s), "
+            f"Timed out: {totals.timed_out - previous.timed_out}, Rejected: {totals.rejected - previous.rejected}, "
+            f"Failed: {totals.failed - previous.failed}, In flight: {totals.in_flight}, "
+            f"Latency p50: {totals.latency.percentile(50) * 1000:.1f}ms, p99: {totals.latency.percentile(99) * 1000:.1f}ms")
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import typing
+
+from ..device import DeviceAbstract, DeviceMetrics, Histogram
+from ..model import ErrorMessage
+
+
+class MetricsServer:
+    """Serves the metrics of this process over HTTP (`GET /metrics`) in the
+    Prometheus text exposition format, from the event loop running the
+    simulations.
+
+    Request counters and latency come from `DeviceMetrics.process`, which the
+    devices update as they go; device states (connected, charging) are read
+    from `devices` only when scraped, so serving adds no per-message cost."""
+    __logger = logging.getLogger(__name__)
+    prefix = 'charge_simulator'
+    quantiles = (0.5, 0.9, 0.99)
+    # Every 5th histogram bound (~1.8x apart) is exposed as a bucket
+    bucket_bounds: typing.Tuple[typing.Tuple[int, float], ...] = tuple(
+        (index, bound) for index, bound in enumerate(Histogram.bounds) if index % 5 == 0)
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.__logger
+
+    def __init__(
+            self,
+            devices: typing.Callable[[], typing.Iterable[DeviceAbstract]],
+            port: int,
+            host: str = '127.0.0.1',
+            metrics: typing.Optional[DeviceMetrics] = None,
+    ):
+        self.devices = devices
+        self.port = port
+        self.host = host
+        self.metrics = metrics if metrics is not None else DeviceMetrics.process
+        self.__server: typing.Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.logger.info(f"Metrics Server Start, URL: http://{self.host}:{self.port}/metrics")
+
+    async def end(self):
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        pass
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            # Headers are not used, only read up to the end of the request
+            while (await reader.readline()).strip():
+                pass
+            if len(request_line) >= 2 and request_line[0] == 'GET' and request_line[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', self.render()
+            else:
+                status, body = '404 Not Found', 'Not Found\n'
+            body_bytes = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body_bytes)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body_bytes)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.logger.debug(f"Metrics Server, Request failed: {ErrorMessage(e).get()}")
+        finally:
+            writer.close()
+
+    def render(self) -> str:
+        lines: typing.List[str] = []
+        p = self.prefix
+        connected = 0
+        charging = 0
+        devices = 0
+        pending = 0
+        for device in self.devices():
+            devices += 1
+            connected += 1 if device.is_connected else 0
+            charging += 1 if device.charge_in_progress else 0
+            pending += device.requests_pending
+        actions = sorted(self.metrics.actions.items())
+
+        def metric(name: str, kind: str, description: str, values: typing.Iterable[typing.Tuple[str, typing.Any]]):
+            lines.append(f"# HELP {p}_{name} {description}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in values:
+                lines.append(f"{p}_{name}{labels} {value}")
+
+        metric('devices', 'gauge', 'Simulated devices', [('', devices)])
+        metric('devices_connected', 'gauge', 'Devices connected to their server', [('', connected)])
+        metric('charge_sessions_in_progress', 'gauge', 'Devices with a charge session in progress', [('', charging)])
+        metric('reconnects_total', 'counter', 'Device re-initializations (reconnects)', [('', self.metrics.reconnects)])
+        metric('connect_retries_total', 'counter', 'Failed connection attempts retried after a backoff delay',
+               [('', self.metrics.connect_retries)])
+        metric('recoveries_total', 'counter', 'Lost connections recovered', [('', self.metrics.recover.count)])
+        metric('time_to_recover_quantile_seconds', 'gauge', 'Time from losing a connection to being connected again, quantiles since start',
+               [(f'{{quantile="{q}"}}', self.metrics.recover.percentile(q * 100)) for q in self.quantiles])
+        metric('requests_in_flight', 'gauge', 'Requests sent and waiting for a response',
+               [(f'{{action="{a}"}}', e.in_flight) for a, e in actions])
+        metric('requests_pending', 'gauge', 'Entries in the pending request tables of the devices (in flight on current connections)',
+               [('', pending)])
+        for name, description in (
+                ('sent', 'Requests sent'),
+                ('responded', 'Requests responded'),
+                ('timed_out', 'Requests without a response in time'),
+                ('rejected', 'Requests responded with a refusing status'),
+                ('failed', 'Requests failed before a response'),
+        ):
+            metric(f'requests_{name}_total', 'counter', description,
+                   [(f'{{action="{a}"}}', getattr(e, name)) for a, e in actions])
+        metric('request_latency_quantile_seconds', 'gauge', 'Request-to-response latency quantiles since start',
+               [(f'{{action="{a}",quantile="{q}"}}', e.latency.percentile(q * 100)) for a, e in actions for q in self.quantiles])
+
+        lines.append(f"# HELP {p}_request_latency_seconds Request-to-response latency")
+        lines.append(f"# TYPE {p}_request_latency_seconds histogram")
+        for a, e in actions:
+            cumulative = 0
+            index_counted = 0
+            for index, bound in self.bucket_bounds:
+                cumulative += sum(e.latency.counts[index_counted:index + 1])
+                index_counted = index + 1
+                lines.append(f'{p}_request_latency_seconds_bucket{{action="{a}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{p}_request_latency_seconds_bucket{{action="{a}",le="+Inf"}} {e.latency.count}')
+            lines.append(f'{p}_request_latency_seconds_sum{{action="{a}"}} {e.latency.total}')
+            lines.append(f'{p}_request_latency_seconds_count{{action="{a}"}} {e.latency.count}')
+        return '\n'.join(lines) + '\n'
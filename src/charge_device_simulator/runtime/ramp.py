@@ -0,0 +1,52 @@
+import math
+import typing
+
+
+class RampProfile:
+    """Start offsets (seconds from fleet start) for the n-th simulator.
+
+    + `linear`: `rate` simulators per second
+    + `step`: `step_size` simulators at once, every `step_seconds`
+    + `exponential`: starting at `rate` simulators per second, the rate grows by
+      `factor` every `step_seconds`
+    """
+    profiles = ('linear', 'step', 'exponential')
+
+    def __init__(
+            self,
+            profile: str = 'linear',
+            rate: float = 10,
+            step_size: int = 10,
+            step_seconds: float = 10,
+            factor: float = 2,
+    ):
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown ramp profile: {profile}, supported: {', '.join(self.profiles)}")
+        if rate <= 0 or step_size <= 0 or step_seconds < 0 or (profile == 'exponential' and factor <= 1):
+            raise ValueError(f"Invalid ramp options for profile: {profile}")
+        self.profile = profile
+        self.rate = rate
+        self.step_size = step_size
+        self.step_seconds = step_seconds
+        self.factor = factor
+
+    @staticmethod
+    def parse(config: typing.Dict[str, typing.Any], share: float = 1) -> 'RampProfile':
+        """Builds a profile from a config section, scaling it to `share` of the
+        fleet (a worker running a part of the fleet ramps its part only)."""
+        return RampProfile(
+            profile=config.get('profile', 'linear'),
+            rate=float(config.get('rate', 10)) * share,
+            step_size=max(1, math.ceil(int(config.get('step_size', 10)) * share)),
+            step_seconds=float(config.get('step_seconds', 10)),
+            factor=float(config.get('factor', 2)),
+        )
+
+    def offset(self, index: int) -> float:
+        if self.profile == 'step':
+            return (index // self.step_size) * self.step_seconds
+        if self.profile == 'exponential' and self.step_seconds > 0:
+            # Started simulators until t: rate * T / ln(g) * (g^(t/T) - 1), solved for t
+            growth = math.log(self.factor)
+            return self.step_seconds * math.log1p(index * growth / (self.rate * self.step_seconds)) / growth
+        return index / self.rate
@@ -0,0 +1,131 @@
+import json
+import typing
+
+from ..device import DeviceMetrics, Histogram
+
+
+class Report:
+    """End-of-run performance report built from the metrics of a run (and the
+    summary of a fleet, if any): per-action counts, error and timeout rates,
+    latency percentiles, throughput per time window, connection setup times
+    and charge session durations. Written as JSON (stable keys, for comparing
+    runs in CI) and as a terminal table."""
+    percentiles = (50, 90, 99)
+
+    def __init__(self, metrics: DeviceMetrics, summary: typing.Optional[typing.Dict[str, typing.Any]] = None):
+        self.metrics = metrics
+        self.summary = summary if summary is not None else {}
+
+    @staticmethod
+    def from_summary(summary: typing.Dict[str, typing.Any]) -> 'Report':
+        return Report(DeviceMetrics.from_dict(summary.get("metrics", {})), summary)
+
+    @classmethod
+    def histogram(cls, histogram: Histogram) -> typing.Dict[str, float]:
+        result = {"count": histogram.count, "mean": float(histogram.mean), "min": float(histogram.min), "max": float(histogram.max)}
+        for p in cls.percentiles:
+            result[f"p{p}"] = float(histogram.percentile(p))
+        return result
+
+    def actions(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        result = {}
+        for action, e in sorted(self.metrics.actions.items()):
+            sent = max(e.sent, 1)
+            result[action] = {
+                "sent": e.sent,
+                "responded": e.responded,
+                "timed_out": e.timed_out,
+                "rejected": e.rejected,
+                "failed": e.failed,
+                "error_rate": (e.rejected + e.failed) / sent,
+                "timeout_rate": e.timed_out / sent,
+                "latency_seconds": self.histogram(e.latency),
+            }
+        return result
+
+    def throughput(self) -> typing.List[typing.Dict[str, float]]:
+        window_seconds = self.metrics.window_seconds
+        if window_seconds is None or len(self.metrics.windows) <= 0:
+            return []
+        first, last = min(self.metrics.windows), max(self.metrics.windows)
+        result = []
+        # Windows without any response are listed too, as zero throughput
+        for i in range(round((last - first) / window_seconds) + 1):
+            start = first + i * window_seconds
+            count = self.metrics.windows.get(start, 0)
+            result.append({"start": start, "responses": count, "rate": count / window_seconds})
+        return result
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        run = {k: v for k, v in self.summary.items() if k not in ("metrics", "load")}
+        totals = self.metrics.totals()
+        duration_seconds = self.summary.get("duration_seconds", 0)
+        return {
+            "run": run,
+            "totals": {
+                "sent": totals.sent,
+                "responded": totals.responded,
+                "timed_out": totals.timed_out,
+                "rejected": totals.rejected,
+                "failed": totals.failed,
+                "throughput": totals.responded / duration_seconds if duration_seconds > 0 else 0,
+            },
+            "actions": self.actions(),
+            "throughput_window_seconds": self.metrics.window_seconds,
+            "throughput": self.throughput(),
+            "connect_seconds": self.histogram(self.metrics.connect),
+            "session_seconds": self.histogram(self.metrics.sessions),
+            "recover_seconds": self.histogram(self.metrics.recover),
+            "reconnects": self.metrics.reconnects,
+            "connect_retries": self.metrics.connect_retries,
+            "load": self.summary.get("load", {}),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def write_json(self, file_path: str):
+        with open(file_path, 'w') as file:
+            file.write(self.to_json())
+            file.write('\n')
+
+    @staticmethod
+    def __table(header: typing.Sequence[str], rows: typing.Sequence[typing.Sequence[typing.Any]]) -> typing.List[str]:
+        cells = [list(header)] + [[f"{v:.3f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+        widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+        lines = ["  ".join(v.ljust(widths[i]) if i == 0 else v.rjust(widths[i]) for i, v in enumerate(row)) for row in cells]
+        lines.insert(1, "  ".join("-" * w for w in widths))
+        return lines
+
+    def table(self) -> str:
+        e = self.to_dict()
+        percentile_header = [f"p{p} ms" for p in self.percentiles]
+        lines = ["Run Report"]
+        if "simulations" in e["run"]:
+            lines.append(
+                f"Simulations: {e['run']['simulations']}, Succeeded: {e['run'].get('succeeded', 0)}, "
+                f"Duration: {e['run'].get('duration_seconds', 0):.1f}s, Throughput: {e['totals']['throughput']:.1f}/s")
+        lines.append("")
+        lines += self.__table(
+            ["Action", "Sent", "Responded", "Error %", "Timeout %"] + percentile_header + ["max ms"],
+            [
+                [action, a["sent"], a["responded"], a["error_rate"] * 100, a["timeout_rate"] * 100]
+                + [a["latency_seconds"][f"p{p}"] * 1000 for p in self.percentiles]
+                + [a["latency_seconds"]["max"] * 1000]
+                for action, a in e["actions"].items()
+            ])
+        lines.append("")
+        lines += self.__table(
+            ["Duration", "Count"] + [f"p{p} s" for p in self.percentiles] + ["max s"],
+            [
+                [name, h["count"]] + [h[f"p{p}"] for p in self.percentiles] + [h["max"]]
+                for name, h in (("Connect", e["connect_seconds"]), ("Recover", e["recover_seconds"]), ("Session", e["session_seconds"]))
+            ])
+        if len(e["throughput"]) > 0:
+            rates = [w["rate"] for w in e["throughput"]]
+            lines.append("")
+            lines.append(
+                f"Throughput per {e['throughput_window_seconds']:g}s window (responses/s), "
+                f"min: {min(rates):.1f}, mean: {sum(rates) / len(rates):.1f}, max: {max(rates):.1f}")
+        lines.append(f"Reconnects: {e['reconnects']}, Connect retries: {e['connect_retries']}")
+        return "\n".join(lines)
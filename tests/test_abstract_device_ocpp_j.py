@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import math
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -208,8 +209,11 @@ class TestFlowStatusPreparing:
             "req-1", "triggermessage",
             {"requestedMessage": "StatusNotification"}
         )
+        # Sent after the response, not from the read loop
+        await asyncio.sleep(0)
 
         assert status_calls == ["Preparing"]
+        ocpp_j_device._ws.send.assert_awaited_once()
 
 
 class TestOptionsPersistence:
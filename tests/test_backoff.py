@@ -0,0 +1,50 @@
+import itertools
+import random
+
+import pytest
+
+from charge_device_simulator.device.backoff import Backoff
+
+
+def _delays(backoff: Backoff, count: int = 10):
+    return list(itertools.islice(backoff.delays(), count))
+
+
+class TestBackoff:
+    def test_exponential_up_to_cap(self):
+        assert _delays(Backoff(1, 10, 'none'), 6) == [1, 2, 4, 8, 10, 10]
+
+    def test_full_jitter_within_exponential_bounds(self):
+        delays = _delays(Backoff(1, 10, 'full', rand=random.Random(1)), 200)
+
+        for attempt, delay in enumerate(delays):
+            assert 0 <= delay <= min(10, 2 ** attempt)
+        # Devices retrying together spread over the window instead of retrying at once
+        assert len(set(delays)) == len(delays)
+
+    def test_decorrelated_jitter_within_base_and_cap(self):
+        delays = _delays(Backoff(0.5, 20, 'decorrelated', rand=random.Random(2)), 200)
+
+        previous = 0.5
+        for delay in delays:
+            assert 0.5 <= delay <= min(20, previous * 3)
+            previous = delay
+
+    def test_max_attempts(self):
+        assert len(_delays(Backoff(max_attempts=3), 10)) == 3
+        assert _delays(Backoff(max_attempts=0)) == []
+        assert len(_delays(Backoff(), 1000)) == 1000
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Backoff(0)
+        with pytest.raises(ValueError):
+            Backoff(10, 5)
+        with pytest.raises(ValueError):
+            Backoff(jitter='equal')
+
+    def test_parse(self):
+        backoff = Backoff.parse({"base_seconds": 2, "cap_seconds": 30, "jitter": "decorrelated", "max_attempts": 5})
+
+        assert (backoff.base_seconds, backoff.cap_seconds, backoff.jitter, backoff.max_attempts) == (2, 30, 'decorrelated', 5)
+        assert Backoff.parse({}).max_attempts is None
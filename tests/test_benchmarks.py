@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from benchmarks import baseline, micro
+from benchmarks.__main__ import parse_args, table
+from benchmarks.devices import LoopLag, kinds, rss_bytes
+
+
+class TestBaseline:
+    def test_regressions_beyond_threshold(self):
+        base = {"ocpp16": {"messages_per_core_second": 1000, "rss_mb_per_1000_devices": 50, "loop_lag_ms_p99": 5}}
+        results = {"ocpp16": {"messages_per_core_second": 700, "rss_mb_per_1000_devices": 55, "loop_lag_ms_p99": 9}}
+
+        lines = baseline.regressions(results, base, 0.2)
+
+        assert len(lines) == 2
+        assert lines[0].startswith("ocpp16 messages_per_core_second: 700")
+        assert lines[1].startswith("ocpp16 loop_lag_ms_p99: 9")
+
+    def test_improvements_and_unknown_names_pass(self):
+        base = {"ocpp16": {"messages_per_core_second": 1000, "connect_seconds_p50": 0.1}}
+        results = {
+            "ocpp16": {"messages_per_core_second": 5000, "connect_seconds_p50": 0.01},
+            "ensto": {"messages_per_core_second": 1},
+        }
+
+        assert baseline.regressions(results, base, 0.2) == []
+
+    def test_write_read(self, tmp_path):
+        file_path = str(tmp_path / "baseline.json")
+        baseline.write(file_path, {"ensto": {"messages": 1}})
+
+        assert baseline.read(file_path) == {"ensto": {"messages": 1}}
+
+
+class TestBenchmarks:
+    @pytest.mark.asyncio
+    async def test_loop_lag_counts_a_blocked_loop(self):
+        lag = LoopLag(0.001)
+        lag.start()
+        await asyncio.sleep(0.01)
+        lag.end()
+
+        assert lag.lag.count > 0
+
+    def test_cli_and_table(self):
+        args = parse_args(["--kinds", "ensto", "--devices", "10", "--check"])
+
+        assert args.kinds == ["ensto"] and args.devices == 10 and args.check
+        assert set(kinds) == {"ocpp16", "ocpp201", "ensto", "ocpps"}
+        assert "messages" in table({"ensto": {"messages": 3}})
+        assert rss_bytes() > 0
+
+    @pytest.mark.asyncio
+    async def test_micro_cases_run(self):
+        # Guards the cases against changes of the device internals they reach
+        for name, case in micro.cases().items():
+            assert await case(3) >= 0, name
+
+    def test_micro_table(self):
+        assert "ns/op" in table({"ensto.raw_to_json": {"ns_per_op": 1000.0}, "ensto": {"messages": 3}})
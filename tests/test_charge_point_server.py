@@ -0,0 +1,106 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from zeep.client import AsyncClient
+from zeep.exceptions import Fault
+from zeep.proxy import AsyncServiceProxy
+from zeep.transports import AsyncTransport
+
+from charge_device_simulator.device.ocpp_s.charge_point_server import ChargePointServer
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.device.ocpp_s.wsdl_documents import WsdlDocuments
+from charge_device_simulator.runtime.config_parser import ConfigParser
+
+
+async def _initialized(device_id: str) -> DeviceOcppS:
+    device = DeviceOcppS(device_id)
+    device.server_address = "http://127.0.0.1:1/"
+    device.listen_port = 0
+    device.register_on_initialize = False
+    device.action_heart_beat = AsyncMock(return_value=True)
+    with patch("charge_device_simulator.device.ocpp_s.device_ocpp_s.asyncio.sleep", AsyncMock()):
+        assert await device.initialize()
+    return device
+
+
+def _server(device: DeviceOcppS) -> ChargePointServer:
+    return device._DeviceOcppS__charge_point_server
+
+
+def _central_system(server: ChargePointServer) -> AsyncServiceProxy:
+    client = AsyncClient(WsdlDocuments.get(ChargePointServer.wsdl_file_name), transport=AsyncTransport())
+    return AsyncServiceProxy(client, client.wsdl.bindings[ChargePointServer.binding_name], address=f"http://127.0.0.1:{server.port}/")
+
+
+class TestChargePointServer:
+    @pytest.mark.asyncio
+    async def test_routes_requests_by_charge_box_identity(self):
+        devices = [await _initialized("cp-1"), await _initialized("cp-2")]
+        server = _server(devices[0])
+        service = _central_system(server)
+        try:
+            assert _server(devices[1]) is server
+            assert set(server.devices) == {"cp-1", "cp-2"}
+            for device in devices:
+                resp = await service.GetConfiguration(_soapheaders={'ChargeBoxIdentity': device.deviceId})
+                keys = {e.key: e.value for e in resp.configurationKey}
+                assert keys["identifier"] == device.deviceId
+
+            resp = await service.ChangeAvailability(connectorId=1, type='Operative', _soapheaders={'ChargeBoxIdentity': "cp-2"})
+            assert resp == "Accepted"
+            assert await service.UpdateFirmware(
+                retrieveDate="2026-01-01T00:00:00Z", location="http://x/fw", _soapheaders={'ChargeBoxIdentity': "cp-1"}) is None
+        finally:
+            await service._client.transport.aclose()
+            for device in devices:
+                await device.end()
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_ended_device_gets_fault(self):
+        device, other = await _initialized("cp-3"), await _initialized("cp-4")
+        server = _server(device)
+        service = _central_system(server)
+        try:
+            await device.end()
+            assert "cp-3" not in server.devices
+            with pytest.raises(Fault):
+                await service.ClearCache(_soapheaders={'ChargeBoxIdentity': "cp-3"})
+        finally:
+            await service._client.transport.aclose()
+            await other.end()
+
+    @pytest.mark.asyncio
+    async def test_ended_with_its_last_device(self):
+        devices = [await _initialized("cp-5"), await _initialized("cp-6")]
+        server = _server(devices[0])
+        port = server.port
+
+        await devices[0].end()
+        assert server.users == 1
+        await devices[1].end()
+
+        assert server.users == 0
+        with pytest.raises(OSError):
+            await asyncio.open_connection('127.0.0.1', port)
+        # A later run in the same process starts a listener of its own
+        device = await _initialized("cp-7")
+        try:
+            assert _server(device) is not server
+        finally:
+            await device.end()
+
+    def test_config_listen_port_sets_from_address(self):
+        device = ConfigParser.parse_device({"type": "ocpp-s", "spec_identifier": "S1", "listen_host": "10.0.0.5", "listen_port": 8090})
+
+        assert device.listen_port == 8090
+        assert device.from_address == "http://10.0.0.5:8090/"
+
+    def test_config_from_address_required_when_not_reachable(self):
+        for listen in ({"listen_port": 0}, {"listen_host": "0.0.0.0", "listen_port": 8090}, {"listen_host": "::", "listen_port": 8090}):
+            with pytest.raises(ValueError):
+                ConfigParser.parse_device({"type": "ocpp-s", "spec_identifier": "S1", **listen})
+
+        device = ConfigParser.parse_device({
+            "type": "ocpp-s", "spec_identifier": "S1", "listen_host": "0.0.0.0", "listen_port": 8090, "from_address": "http://10.0.0.5:8090/"})
+        assert device.from_address == "http://10.0.0.5:8090/"
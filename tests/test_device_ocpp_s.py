@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import math
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -5,6 +6,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.device.ocpp_s.wsdl_documents import WsdlDocuments
+from charge_device_simulator.runtime.config_parser import ConfigParser
+from charge_device_simulator.runtime.fleet import Fleet
 
 
 class TestDeviceOcppSChargeMeterValue:
@@ -260,3 +264,83 @@ class TestOcppSFlowReserveStatusPayload:
         assert ok is True
         assert captured["StatusNotification"]["status"] == "Reserved"
         assert captured["StatusNotification"]["connectorId"] == 1
+
+
+class TestOcppSTransport:
+    @pytest.mark.asyncio
+    async def test_shared_by_devices_on_a_loop(self):
+        transport = DeviceOcppS.transport_acquire()
+
+        assert DeviceOcppS.transport_acquire() is transport
+        await DeviceOcppS.transport_release(transport)
+        assert not transport.client.is_closed
+        await DeviceOcppS.transport_release(transport)
+        assert transport.client.is_closed
+        assert DeviceOcppS.transport_acquire() is not transport
+        await DeviceOcppS.transport_release(DeviceOcppS.transport_acquire())
+
+    @pytest.mark.asyncio
+    async def test_closed_with_the_last_device(self):
+        devices = [DeviceOcppS("a"), DeviceOcppS("b")]
+        for device in devices:
+            device.server_address = "http://127.0.0.1:1/"
+            device.register_on_initialize = False
+            device.action_heart_beat = AsyncMock(return_value=True)
+        with patch("charge_device_simulator.device.ocpp_s.device_ocpp_s.asyncio.sleep", AsyncMock()):
+            for device in devices + devices:
+                assert await device.initialize()
+        transport = devices[0]._client.transport
+
+        assert devices[1]._client.transport is transport
+        await devices[0].end()
+        assert not transport.client.is_closed
+        await devices[1].end()
+        assert transport.client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_requests_limited_by_max_in_flight(self, device_ocpp_s):
+        running, max_running = 0, 0
+
+        async def heartbeat(**kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+        device_ocpp_s._client_service = {"Heartbeat": heartbeat}
+        device_ocpp_s.max_in_flight = 2
+
+        await asyncio.gather(*(device_ocpp_s.by_device_req_send("Heartbeat", {}) for _ in range(6)))
+
+        assert max_running == 2
+        assert device_ocpp_s.metrics.actions["Heartbeat"].responded == 6
+
+    def test_max_connections_config(self):
+        with patch.object(DeviceOcppS, 'transport_max_connections', 100):
+            ConfigParser.parse_fleet(Fleet([]), {"soap_max_connections": 40}, share=0.5)
+
+            assert DeviceOcppS.transport_max_connections == 20
+
+
+class TestOcppSWsdlDocuments:
+    def test_parsed_once_per_process(self):
+        document = WsdlDocuments.get("server-201206.wsdl")
+
+        assert WsdlDocuments.get(f"{WsdlDocuments.directory}/server-201206.wsdl") is document
+        assert '{urn://Ocpp/Cs/2012/06/}CentralSystemServiceSoap' in document.bindings
+
+    @pytest.mark.asyncio
+    async def test_shared_by_devices(self):
+        devices = [DeviceOcppS("a"), DeviceOcppS("b")]
+        for device in devices:
+            device.server_address = "http://127.0.0.1:1/"
+            device.register_on_initialize = False
+            device.action_heart_beat = AsyncMock(return_value=True)
+
+        with patch("charge_device_simulator.device.ocpp_s.device_ocpp_s.asyncio.sleep", AsyncMock()):
+            for device in devices:
+                assert await device.initialize()
+
+        assert devices[0]._client is not devices[1]._client
+        assert devices[0]._client.wsdl is devices[1]._client.wsdl is WsdlDocuments.get(DeviceOcppS.wsdl_file_name)
@@ -0,0 +1,105 @@
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.runtime.config_file_reader import ConfigFileReader
+from charge_device_simulator.runtime.device_template import DeviceTemplate
+
+CONFIG = """
+simulations:
+  - name: "load-{index:03d}"
+    device_name: "fleet-{index:03d}"
+    flow_charge_options:
+      idTag: "RFID_{index}"
+    is_interactive: false
+    frequent_flow_enabled: true
+    frequent_flows:
+      - flow: heartbeat
+        delay_seconds: 30
+        count: -1
+  - name: ensto-load
+    device_name: ensto-fleet
+    flow_charge_options: {}
+    is_interactive: false
+    frequent_flow_enabled: false
+devices:
+  - type: ocpp-j
+    name: "fleet-{index:03d}"
+    count: 4
+    index_start: 1
+    protocols: ['ocpp1.6']
+    server_address: ["ws://csms-a", "ws://csms-b"]
+    spec_identifier: "SIM_{index:05d}"
+    spec_chargeBoxSerialNumber: "SN-{index}"
+  - type: ensto
+    name: ensto-fleet
+    count: 2
+    server_host: localhost
+    spec_identifier: ENSTO
+"""
+
+
+def _reader(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(CONFIG)
+    return ConfigFileReader(str(config))
+
+
+class TestDeviceTemplate:
+    def test_device_config_formats_index_and_shards_servers(self):
+        template = DeviceTemplate({
+            "type": "ocpp-j", "name": "d-{index}", "count": 3,
+            "server_address": ["ws://a", "ws://b"], "spec_identifier": "ID_{index:03d}",
+            "protocols": ["ocpp1.6"],
+        })
+
+        configs = [template.device_config(i) for i in template.indexes()]
+
+        assert [c["spec_identifier"] for c in configs] == ["ID_000", "ID_001", "ID_002"]
+        assert [c["server_address"] for c in configs] == ["ws://a", "ws://b", "ws://a"]
+        assert configs[0]["protocols"] == ["ocpp1.6"]
+        assert "count" not in configs[0]
+
+    def test_names_without_placeholder_get_index_suffix(self):
+        template = DeviceTemplate({"type": "ensto", "name": "e", "count": 2, "spec_identifier": "E"})
+
+        assert template.device_config(1)["name"] == "e_1"
+        assert template.device_config(1)["spec_identifier"] == "E_1"
+        assert template.simulation_config({"name": "s", "device_name": "e"}, 1) == {
+            "name": "s_1", "device_name": "e_1"}
+
+    def test_literal_braces_kept_next_to_placeholders(self):
+        assert DeviceTemplate.format('{"a": 1} SIM_{index:05d}', 3) == '{"a": 1} SIM_00003'
+        assert DeviceTemplate.format('{index}{} {indexes}', 7) == '7{} {indexes}'
+        assert DeviceTemplate.format({"data": '{"id": "{index}"}'}, 2) == {"data": '{"id": "2"}'}
+
+
+class TestConfigFileReaderTemplates:
+    def test_template_expands_into_devices_and_simulators(self, tmp_path):
+        reader = _reader(tmp_path)
+
+        sims = reader.simulators_match("load-*")
+
+        assert [s.name for s in sims] == ["load-001", "load-002", "load-003", "load-004"]
+        assert all(isinstance(s.device, DeviceOcppJ16) for s in sims)
+        assert [s.device.deviceId for s in sims] == ["SIM_00001", "SIM_00002", "SIM_00003", "SIM_00004"]
+        assert [s.device.server_address for s in sims] == ["ws://csms-a", "ws://csms-b"] * 2
+        assert sims[2].device.spec_chargeBoxSerialNumber == "SN-3"
+        assert sims[0].flow_charge_options == {"idTag": "RFID_1"}
+
+    def test_expanded_simulators_do_not_share_options(self, tmp_path):
+        sims = _reader(tmp_path).simulators_match("load-*")
+
+        assert sims[0].flow_charge_options is not sims[1].flow_charge_options
+        assert len({id(s.frequent_flows[next(iter(s.frequent_flows))]) for s in sims}) == len(sims)
+
+    def test_only_matching_simulations_are_expanded(self, tmp_path):
+        sims = _reader(tmp_path).simulators_match("ensto-load_1")
+
+        assert len(sims) == 1
+        assert isinstance(sims[0].device, DeviceEnsto)
+        assert sims[0].device.deviceId == "ENSTO_1"
+
+    def test_simulator_find_resolves_expanded_name(self, tmp_path):
+        sim = _reader(tmp_path).simulator_find("load-002")
+
+        assert sim is not None
+        assert sim.device.deviceId == "SIM_00002"
@@ -0,0 +1,208 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from charge_device_simulator.device.backoff import Backoff
+from charge_device_simulator.device.metrics import DeviceMetrics
+from charge_device_simulator.device.rate_limiter import TokenBucket
+from charge_device_simulator.device.simulator import Simulator
+from charge_device_simulator.runtime.config_file_reader import ConfigFileReader
+from charge_device_simulator.runtime.fleet import Fleet
+from charge_device_simulator.runtime.fleet_supervisor import FleetSupervisor
+from charge_device_simulator.runtime.ramp import RampProfile
+
+
+def _simulator(name, initialize_result=True):
+    device = MagicMock()
+    device.on_error = []
+    device.initialize = AsyncMock(return_value=initialize_result)
+    device.end = AsyncMock()
+    device.handle_error = AsyncMock(return_value=False)
+    sim = Simulator(device)
+    sim.name = name
+    sim.frequent_flow_enabled = False
+    return sim
+
+
+class TestFleetExecute:
+    @pytest.mark.asyncio
+    async def test_all_succeeded_returns_zero(self):
+        sims = [_simulator("sim1"), _simulator("sim2")]
+        fleet = Fleet(sims)
+
+        assert await fleet.execute() == 0
+
+        assert fleet.results == {"sim1": True, "sim2": True}
+        for sim in sims:
+            sim.device.initialize.assert_awaited_once()
+            sim.device.end.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_one_failed_returns_one_and_others_still_run(self):
+        broken = _simulator("broken")
+        broken.device.initialize = AsyncMock(side_effect=RuntimeError("boom"))
+        fine = _simulator("fine")
+        fleet = Fleet([broken, fine])
+
+        assert await fleet.execute() == 1
+
+        assert fleet.failed == ["broken"]
+        fine.device.end.assert_awaited_once()
+        broken.device.handle_error.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_simulator_giving_up_initialize_failed(self):
+        unreachable = _simulator("unreachable", initialize_result=False)
+        unreachable.reconnect_backoff = Backoff(0.001, max_attempts=2)
+        fleet = Fleet([unreachable, _simulator("fine")])
+
+        assert await fleet.execute() == 1
+
+        assert fleet.failed == ["unreachable"]
+        assert unreachable.device.initialize.await_count == 3
+        unreachable.device.end.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_error_handlers_are_not_shared_between_simulators(self):
+        sims = [_simulator("sim1"), _simulator("sim2")]
+        fleet = Fleet(sims)
+
+        await fleet.execute()
+
+        assert sims[0].on_error is not sims[1].on_error
+        assert sims[0].on_error == [sims[0].device_on_error]
+        assert sims[1].on_error == [sims[1].device_on_error]
+
+    @pytest.mark.asyncio
+    async def test_summary_includes_device_metrics(self):
+        sims = [_simulator("sim1"), _simulator("sim2")]
+        for sim in sims:
+            sim.device.metrics = DeviceMetrics()
+        fleet = Fleet(sims)
+        for sim in sims:
+            sim.device.metrics.request_responded("Heartbeat", sim.device.metrics.request_sent("Heartbeat"))
+
+        await fleet.execute()
+
+        metrics = fleet.summary()["metrics"]
+        assert metrics["actions"]["Heartbeat"]["sent"] == 2
+        assert metrics["actions"]["Heartbeat"]["latency"]["count"] == 2
+        assert fleet.on_error == []
+
+    @pytest.mark.asyncio
+    async def test_interactive_simulations_run_non_interactive(self):
+        sim = _simulator("sim1")
+        sim.is_interactive = True
+
+        await Fleet([sim]).execute()
+
+        assert sim.is_interactive is False
+
+
+class TestConfigFileReaderSimulatorsMatch:
+    def test_glob_selects_simulations(self, tmp_path):
+        config = tmp_path / "config.yaml"
+        config.write_text(
+            "simulations:\n"
+            + "".join(
+                f"  - name: {name}\n"
+                f"    device_name: dev\n"
+                f"    flow_charge_options: {{}}\n"
+                f"    is_interactive: false\n"
+                f"    frequent_flow_enabled: false\n"
+                for name in ("load-1", "load-2", "smoke")
+            )
+            + "devices:\n"
+              "  - type: ocpp-j\n"
+              "    name: dev\n"
+              "    spec_identifier: DEV_1\n"
+        )
+        reader = ConfigFileReader(str(config))
+
+        assert [e.name for e in reader.simulators_match("load-*")] == ["load-1", "load-2"]
+        assert len(reader.simulators_match("*")) == 3
+
+
+class TestFleetSupervisor:
+    def test_shard_filter_is_deterministic_and_covers_every_simulation(self):
+        workers = 3
+
+        def shard(worker):
+            accept = FleetSupervisor.shard_filter(worker, workers)
+            return [i for i in range(10) if accept(i, f"sim-{i}")]
+
+        shards = [shard(worker) for worker in range(workers)]
+
+        assert sorted(i for shard in shards for i in shard) == list(range(10))
+        assert [len(shard) for shard in shards] == [4, 3, 3]
+        # Calls in any order or count do not change the shards
+        accept = FleetSupervisor.shard_filter(1, workers)
+        assert accept(4, "sim-4") and accept(4, "sim-4") and not accept(3, "sim-3")
+
+    def test_shards_of_simulations_and_templates(self, tmp_path):
+        config = tmp_path / "config.yaml"
+        config.write_text(
+            "simulations:\n"
+            "  - {name: smoke, device_name: dev, flow_charge_options: {}, is_interactive: false, frequent_flow_enabled: false}\n"
+            "  - {name: 'load-{index}', device_name: 'tpl-{index}', flow_charge_options: {},"
+            " is_interactive: false, frequent_flow_enabled: false}\n"
+            "devices:\n"
+            "  - {type: ocpp-j, name: dev, spec_identifier: DEV_1}\n"
+            "  - {type: ocpp-j, name: 'tpl-{index}', spec_identifier: 'TPL_{index}', count: 5}\n"
+        )
+        reader = ConfigFileReader(str(config))
+        workers = 2
+
+        def shard(worker):
+            return [e.name for e in reader.simulators_iter("*", FleetSupervisor.shard_filter(worker, workers))]
+
+        shards = [shard(worker) for worker in range(workers)]
+
+        assert shards == [["smoke", "load-1", "load-3"], ["load-0", "load-2", "load-4"]]
+        # Other iterations in between leave the shards as they are
+        assert len(reader.simulators_match("*")) == 6
+        assert shards == [shard(worker) for worker in range(workers)]
+        # Positions among the simulations matching the pattern
+        assert [e.name for e in reader.simulators_iter("load-*", FleetSupervisor.shard_filter(0, workers))] == ["load-0", "load-2", "load-4"]
+
+    def test_workers_default_to_cpu_count(self):
+        with patch("os.cpu_count", return_value=6):
+            assert FleetSupervisor("config.yaml").workers == 6
+        assert FleetSupervisor("config.yaml", workers=2).workers == 2
+
+    @pytest.mark.asyncio
+    async def test_no_matching_simulation_merges_empty_worker_summaries(self, tmp_path):
+        config = tmp_path / "config.yaml"
+        config.write_text("simulations:\ndevices:\n")
+        supervisor = FleetSupervisor(str(config), "nothing-*", workers=2)
+
+        assert await supervisor.execute() == 1
+
+        assert len(supervisor.summaries) == 2
+        assert supervisor.summary()["simulations"] == 0
+
+
+class TestFleetRamp:
+    @pytest.mark.asyncio
+    async def test_ramp_delays_starts_and_reports_phases(self):
+        sims = [_simulator(f"sim{i}") for i in range(3)]
+        fleet = Fleet(sims)
+        fleet.ramp = RampProfile('linear', rate=50)
+
+        assert await fleet.execute() == 0
+
+        assert fleet.phases["ramp"] >= 0.04
+        assert fleet.phases["initialize"] >= fleet.phases["ramp"]
+        assert fleet.summary()["initialize_durations"]["count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_limiters_are_handed_to_simulators_and_devices(self):
+        sim = _simulator("sim1")
+        fleet = Fleet([sim])
+        fleet.initialize_rate_limiter = TokenBucket(10)
+        fleet.register_rate_limiter = TokenBucket(5)
+
+        await fleet.execute()
+
+        assert sim.initialize_rate_limiter is fleet.initialize_rate_limiter
+        assert sim.device.register_rate_limiter is fleet.register_rate_limiter
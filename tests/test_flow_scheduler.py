@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from charge_device_simulator.device.flow_scheduler import FlowScheduler
+
+
+class TestFlowScheduler:
+    @pytest.mark.asyncio
+    async def test_calls_run_in_due_order(self):
+        scheduler = FlowScheduler()
+        calls = []
+
+        scheduler.call_later(0.03, lambda: calls.append("c"))
+        scheduler.call_later(0.01, lambda: calls.append("a"))
+        scheduler.call_later(0.02, lambda: calls.append("b"))
+        await asyncio.sleep(0.06)
+
+        assert calls == ["a", "b", "c"]
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_earlier_call_rearms_the_timer(self):
+        scheduler = FlowScheduler()
+        calls = []
+
+        scheduler.call_later(10, lambda: calls.append("late"))
+        scheduler.call_later(0.01, lambda: calls.append("early"))
+        await asyncio.sleep(0.03)
+
+        assert calls == ["early"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_does_not_run(self):
+        scheduler = FlowScheduler()
+        calls = []
+
+        scheduler.call_later(0.01, lambda: calls.append("cancelled")).cancel()
+        scheduler.call_later(0.02, lambda: calls.append("kept"))
+        await asyncio.sleep(0.04)
+
+        assert calls == ["kept"]
+
+    @pytest.mark.asyncio
+    async def test_failing_call_does_not_stop_others(self):
+        scheduler = FlowScheduler()
+        calls = []
+
+        scheduler.call_later(0.01, lambda: 1 / 0)
+        scheduler.call_later(0.01, lambda: calls.append("after"))
+        await asyncio.sleep(0.03)
+
+        assert calls == ["after"]
+
+    @pytest.mark.asyncio
+    async def test_shared_is_one_per_event_loop(self):
+        assert FlowScheduler.shared() is FlowScheduler.shared()
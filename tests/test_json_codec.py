@@ -0,0 +1,66 @@
+import importlib.util
+import json
+
+import pytest
+
+from charge_device_simulator.device.ocpp_j.json_codec import JsonCodec, OrjsonCodec
+
+
+class TestJsonCodec:
+    frame = [2, "id-1", "MeterValues", {"connectorId": 1, "meterValue": [{"sampledValue": [{"value": "1000"}]}], "text": "ä/x"}]
+
+    @pytest.mark.parametrize("name", [n for n in JsonCodec.backends if n == 'json' or importlib.util.find_spec(n) is not None])
+    def test_backends_encode_the_same_frame(self, name):
+        codec = JsonCodec.create(name)
+
+        encoded = codec.dumps(self.frame)
+
+        assert isinstance(encoded, bytes)
+        assert encoded == json.dumps(self.frame, separators=(',', ':'), ensure_ascii=False).encode()
+        assert codec.loads(encoded) == self.frame
+        assert codec.loads(encoded.decode()) == self.frame
+
+    def test_create_picks_the_fastest_installed(self):
+        codec = JsonCodec.create()
+
+        if importlib.util.find_spec('orjson') is not None:
+            assert isinstance(codec, OrjsonCodec)
+        assert codec.name in JsonCodec.backends
+
+    def test_create_unknown_backend(self):
+        with pytest.raises(ValueError):
+            JsonCodec.create('simplejson')
+
+    @pytest.mark.skipif(importlib.util.find_spec('ujson') is not None, reason="ujson is installed")
+    def test_create_missing_backend(self):
+        with pytest.raises(ImportError):
+            JsonCodec.create('ujson')
+
+
+class TestDeviceFrames:
+    @pytest.mark.asyncio
+    async def test_request_is_sent_as_one_text_frame(self, device_ocpp_j16):
+        device_ocpp_j16.response_timeout_seconds = 0.01
+
+        await device_ocpp_j16.by_device_req_send("Heartbeat", {})
+
+        raw = device_ocpp_j16._ws.send.await_args.args[0]
+        assert device_ocpp_j16._ws.send.await_args.kwargs == {"text": True}
+        assert json.loads(raw)[2:] == ["Heartbeat", {}]
+
+    @pytest.mark.asyncio
+    async def test_response_is_encoded_by_codec(self, device_ocpp_j16):
+        device_ocpp_j16.codec = JsonCodec.create('json')
+
+        await device_ocpp_j16.by_middleware_req("req-1", "clearcache", {})
+
+        raw = device_ocpp_j16._ws.send.await_args.args[0]
+        assert raw == b'[3,"req-1",{"status":"Accepted"}]'
+
+    @pytest.mark.asyncio
+    async def test_raw_string_is_sent_unchanged(self, device_ocpp_j16):
+        device_ocpp_j16.response_timeout_seconds = 0.01
+
+        await device_ocpp_j16.by_device_req_send_raw('[2,"x","Custom",{}]', "Custom", "x")
+
+        device_ocpp_j16._ws.send.assert_awaited_once_with('[2,"x","Custom",{}]')
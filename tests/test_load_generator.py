@@ -0,0 +1,131 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.simulator import Simulator
+from charge_device_simulator.runtime.config_parser import ConfigParser
+from charge_device_simulator.runtime.fleet import Fleet
+from charge_device_simulator.runtime.load_generator import LoadGenerator
+
+
+def _simulator(name, heart_beat=None):
+    device = MagicMock()
+    device.on_error = []
+    device.initialize = AsyncMock(return_value=True)
+    device.end = AsyncMock()
+    device.action_heart_beat = heart_beat or AsyncMock(return_value=True)
+    device.action_meter_value = AsyncMock(return_value=True)
+    sim = Simulator(device)
+    sim.name = name
+    sim.frequent_flow_enabled = False
+    return sim
+
+
+class TestLoadGenerator:
+    @pytest.mark.asyncio
+    async def test_constant_arrivals_are_spread_over_devices(self):
+        sims = [_simulator("a"), _simulator("b")]
+        load = LoadGenerator({"heartbeat": 200}, arrival="constant", duration_seconds=0.1)
+
+        await load.run(sims)
+
+        summary = load.summary()["heartbeat"]
+        assert 15 <= summary["offered"] <= 25
+        assert summary["completed"] == summary["offered"]
+        calls = [s.device.action_heart_beat.await_count for s in sims]
+        assert abs(calls[0] - calls[1]) <= 1
+
+    @pytest.mark.asyncio
+    async def test_open_loop_keeps_offering_while_csms_is_slow(self):
+        async def slow():
+            await asyncio.sleep(0.2)
+            return True
+        sim = _simulator("a", heart_beat=AsyncMock(side_effect=slow))
+        load = LoadGenerator({"heartbeat": 100}, arrival="constant", duration_seconds=0.1)
+
+        await load.run([sim])
+
+        summary = load.summary()["heartbeat"]
+        # All arrivals were sent even though none got answered during the run
+        assert summary["offered"] >= 8
+        assert summary["backlog_max"] == summary["offered"]
+        assert summary["completed"] == summary["offered"]
+
+    @pytest.mark.asyncio
+    async def test_arrivals_over_max_backlog_are_dropped(self):
+        async def slow():
+            await asyncio.sleep(0.2)
+            return True
+        sim = _simulator("a", heart_beat=AsyncMock(side_effect=slow))
+        load = LoadGenerator({"heartbeat": 100}, arrival="constant", duration_seconds=0.1, max_backlog=3)
+
+        await load.run([sim])
+
+        summary = load.summary()["heartbeat"]
+        assert summary["completed"] == 3
+        assert summary["dropped"] == summary["offered"] - 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        sim = _simulator("a", heart_beat=AsyncMock(side_effect=[False, RuntimeError("boom")] + [True] * 100))
+        load = LoadGenerator({"heartbeat": 100}, arrival="poisson", duration_seconds=0.1)
+
+        await load.run([sim])
+
+        assert load.summary()["heartbeat"]["failed"] == 2
+
+    def test_unknown_message_is_rejected(self):
+        with pytest.raises(ValueError):
+            LoadGenerator({"firmware_update": 1})
+
+
+class TestFleetLoad:
+    @pytest.mark.asyncio
+    async def test_fleet_runs_load_after_initialize_and_keeps_simulators_until_done(self):
+        sims = [_simulator("a"), _simulator("b")]
+        fleet = ConfigParser.parse_fleet(Fleet(sims), {
+            "load": {"arrival": "constant", "duration_seconds": 0.05, "rates": {"meter_values": 100}}
+        })
+
+        assert await fleet.execute() == 0
+
+        assert fleet.summary()["load"]["meter_values"]["completed"] >= 4
+        for sim in sims:
+            sim.device.end.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_simulator_does_not_hold_the_load_back(self):
+        unreachable = _simulator("unreachable")
+        unreachable.device.initialize = AsyncMock(return_value=False)
+        unreachable.device.handle_error = AsyncMock(return_value=False)
+        fine = _simulator("fine")
+        fleet = ConfigParser.parse_fleet(Fleet([unreachable, fine]), {
+            "load": {"arrival": "constant", "duration_seconds": 0.2, "start_after_seconds": 0.1, "rates": {"heartbeat": 100}}
+        })
+
+        # Initialize retries forever by default, given up once the load is over
+        assert await asyncio.wait_for(fleet.execute(), 3) == 1
+
+        assert fleet.failed == ["unreachable"]
+        assert fleet.summary()["load"]["heartbeat"]["completed"] >= 10
+        assert fine.device.action_heart_beat.await_count >= 10
+        unreachable.device.action_heart_beat.assert_not_awaited()
+        unreachable.device.end.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_simulator_initialized_late_joins_the_load(self):
+        async def initialize_late():
+            await asyncio.sleep(0.15)
+            return True
+        late = _simulator("late")
+        late.device.initialize = AsyncMock(side_effect=initialize_late)
+        fine = _simulator("fine")
+        fleet = ConfigParser.parse_fleet(Fleet([late, fine]), {
+            "load": {"arrival": "constant", "duration_seconds": 0.3, "start_after_seconds": 0.05, "rates": {"heartbeat": 100}}
+        })
+
+        assert await asyncio.wait_for(fleet.execute(), 3) == 0
+
+        assert late.device.action_heart_beat.await_count >= 3
+        assert fine.device.action_heart_beat.await_count > late.device.action_heart_beat.await_count
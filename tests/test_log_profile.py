@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.device_logger import DeviceLogger
+from charge_device_simulator.device.metrics import DeviceMetrics
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.simulator import Simulator
+from charge_device_simulator.runtime.config_parser import ConfigParser
+from charge_device_simulator.runtime.fleet import Fleet
+from charge_device_simulator.runtime.log_profile import LogProfile
+
+
+class TestDeviceLogger:
+    def test_device_level_replaces_the_shared_level(self, caplog):
+        logger = logging.getLogger("test.device_logger")
+        device_logger = DeviceLogger(logger, "dev-1", logging.DEBUG)
+
+        with caplog.at_level(logging.DEBUG, logger="test.device_logger"):
+            # The shared logger is quieter than the device
+            logger.setLevel(logging.WARNING)
+            device_logger.debug("Frame %s", "x")
+            logger.debug("Not logged")
+
+        assert [r.getMessage() for r in caplog.records] == ["Frame x"]
+        assert caplog.records[0].device_id == "dev-1"
+
+    def test_arguments_are_not_formatted_when_disabled(self):
+        device_logger = DeviceLogger(logging.getLogger("test.device_logger"), "dev-1", logging.WARNING)
+        argument = MagicMock()
+
+        device_logger.info("Action %s Start", argument)
+
+        argument.__str__.assert_not_called()
+        assert not device_logger.isEnabledFor(logging.INFO)
+
+    def test_level_parse(self):
+        assert DeviceLogger.level_parse("debug") == logging.DEBUG
+        assert DeviceLogger.level_parse(logging.ERROR) == logging.ERROR
+        assert DeviceLogger.level_parse(None) is None
+        with pytest.raises(ValueError):
+            DeviceLogger.level_parse("LOUD")
+
+    def test_device_without_level_uses_shared_logger(self):
+        device = DeviceOcppJ16("dev-1")
+
+        assert isinstance(device.logger, logging.Logger)
+        device.log_level = "ERROR"
+        assert isinstance(device.logger, DeviceLogger)
+        assert device.logger.getEffectiveLevel() == logging.ERROR
+        device.log_level = None
+        assert isinstance(device.logger, logging.Logger)
+
+
+def _device(connected=True, charging=False):
+    device = MagicMock()
+    device.log_level = None
+    device.is_connected = connected
+    device.charge_in_progress = charging
+    return device
+
+
+class TestLogProfile:
+    def test_quiet_keeps_sampled_and_own_levels(self):
+        devices = [_device() for _ in range(4)]
+        devices[3].log_level = logging.DEBUG
+
+        LogProfile('quiet', device_level='ERROR', sample_devices=1).apply(devices)
+
+        assert [d.log_level for d in devices] == [None, logging.ERROR, logging.ERROR, logging.DEBUG]
+
+    def test_normal_changes_nothing(self):
+        devices = [_device()]
+
+        LogProfile().apply(devices)
+
+        assert devices[0].log_level is None
+
+    def test_summary_counts_since_previous(self):
+        metrics = DeviceMetrics()
+        profile = LogProfile('quiet')
+        for _ in range(3):
+            metrics.request_responded("Heartbeat", metrics.request_sent("Heartbeat"))
+        profile.summary([], metrics, 1)
+        metrics.request_responded("Heartbeat", metrics.request_sent("Heartbeat"))
+        metrics.request_timed_out("Heartbeat")
+
+        line = profile.summary([_device(), _device(False, True)], metrics, 2)
+
+        assert "Devices: 2, Connected: 1, Charging: 1" in line
+        assert "Sent: 1, Responded: 1 (0.5/s), Timed out: 1" in line
+
+    def test_parse_and_invalid(self):
+        profile = LogProfile.parse({"profile": "quiet", "sample_devices": 3, "summary_seconds": 5}, share=0.5)
+
+        assert (profile.is_quiet, profile.sample_devices, profile.summary_seconds) == (True, 2, 5)
+        assert profile.device_level == logging.WARNING
+        with pytest.raises(ValueError):
+            LogProfile('silent')
+
+    def test_config_sections(self):
+        fleet = ConfigParser.parse_fleet(Fleet([]), {"logging": {"profile": "quiet"}})
+        device = ConfigParser.parse_device({"type": "ensto", "spec_identifier": "E1", "log_level": "DEBUG"})
+
+        assert fleet.log_profile.is_quiet
+        assert device.log_level == logging.DEBUG
+
+
+class TestFleetQuiet:
+    @pytest.mark.asyncio
+    async def test_quiet_fleet_logs_summaries(self, caplog):
+        device = _device()
+        device.on_error = []
+        device.initialize = AsyncMock(return_value=True)
+        device.end = AsyncMock()
+        sim = Simulator(device)
+        sim.name = "sim1"
+        sim.frequent_flow_enabled = False
+
+        async def lifecycle_start():
+            await asyncio.sleep(0.05)
+        sim.lifecycle_start = lifecycle_start
+        fleet = Fleet([sim])
+        fleet.log_profile = LogProfile('quiet', summary_seconds=0.01)
+
+        with caplog.at_level(logging.INFO):
+            assert await fleet.execute() == 0
+
+        assert device.log_level == logging.WARNING
+        assert any(r.getMessage().startswith("Fleet, Summary, Devices: 1") for r in caplog.records)
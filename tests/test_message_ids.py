@@ -0,0 +1,82 @@
+import re
+
+import pytest
+
+from charge_device_simulator.device.message_ids import MessageIds
+from charge_device_simulator.device.ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from charge_device_simulator.runtime.config_parser import ConfigParser
+
+
+class TestMessageIds:
+    def test_counter_is_monotonic_with_device_prefix(self):
+        ids = MessageIds()
+
+        first, second = ids.next(), ids.next()
+
+        assert re.fullmatch(r"[0-9a-f]{8}-1", first)
+        assert second == f"{ids.prefix}2"
+
+    def test_counters_of_devices_do_not_collide(self):
+        a, b = MessageIds(), MessageIds()
+
+        assert a.prefix != b.prefix
+        assert len({a.next() for _ in range(1000)} | {b.next() for _ in range(1000)}) == 2000
+
+    def test_prefix_of_device(self):
+        short, long_a, long_b = (MessageIds.prefix_of(i) for i in ("CP_0001", "a" * 30 + "1", "a" * 30 + "2"))
+
+        assert short == f"CP_0001-{MessageIds.run_token}-"
+        assert long_a != long_b
+        # Prefixes drawn at random would collide for some of 10k devices
+        assert len({MessageIds.prefix_of(f"CP_{i:05d}") for i in range(10000)}) == 10000
+        assert len(MessageIds(prefix=long_a).prefix + str(10 ** 10 - 1)) <= 36
+
+    def test_device_ids_prefixed_by_device(self):
+        device = DeviceOcppJ201("CP-42")
+
+        assert device.message_ids.next() == f"CP-42-{MessageIds.run_token}-1"
+        assert ConfigParser.parse_device({
+            "type": "ensto", "spec_identifier": "E1", "message_ids": "counter",
+        }).message_ids.prefix == MessageIds.prefix_of("E1")
+
+    def test_prefix_is_bounded_to_ocpp_id_length(self):
+        ids = MessageIds(prefix="x" * 50)
+
+        assert len(ids.next()) <= 36
+
+    @pytest.mark.parametrize("kind,length", [("random", 32), ("uuid4", 36)])
+    def test_random_kinds(self, kind, length):
+        ids = MessageIds(kind)
+
+        values = {ids.next() for _ in range(100)}
+
+        assert len(values) == 100
+        assert all(len(v) == length for v in values)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            MessageIds("sequence")
+
+    def test_config(self):
+        device = ConfigParser.parse_device({"type": "ensto", "spec_identifier": "E1", "message_ids": "uuid4"})
+
+        assert device.message_ids.kind == "uuid4"
+
+
+class TestDeviceMessageIds:
+    @pytest.mark.asyncio
+    async def test_requests_and_transaction_id_share_the_source(self):
+        device = DeviceOcppJ201("dev-201")
+        device.message_ids = MessageIds(prefix="dev-")
+        sent = []
+
+        async def send_raw(raw, action, req_id=None):
+            sent.append((req_id, device.codec.loads(raw)))
+            return [3, req_id, {"idTokenInfo": {"status": "Accepted"}}]
+        device.by_device_req_send_raw = send_raw
+
+        assert await device.action_charge_start({"idTag": "TAG"})
+
+        req_id, frame = sent[0]
+        assert req_id == frame[1] == "dev-2"
+        assert frame[3]["transactionInfo"]["transactionId"] == "dev-1"
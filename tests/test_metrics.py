@@ -0,0 +1,202 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.metrics import DeviceMetrics, Histogram
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.runtime.metrics_server import MetricsServer
+
+
+class TestHistogram:
+    def test_percentiles_are_within_bucket_precision(self):
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.min == 0.001
+        assert histogram.max == 1
+        assert 0.5 <= histogram.percentile(50) <= 0.5 * 1.13
+        assert 0.99 <= histogram.percentile(99) <= 1
+        assert histogram.percentile(100) == 1
+        assert histogram.mean == pytest.approx(0.5005)
+
+    def test_merge_equals_recording_into_one(self):
+        values_a = [0.002, 0.010, 0.3]
+        values_b = [0.0001, 5, 500]
+        a, b, both = Histogram(), Histogram(), Histogram()
+        for value in values_a:
+            a.record(value)
+            both.record(value)
+        for value in values_b:
+            b.record(value)
+            both.record(value)
+
+        merged = Histogram().merge(a).merge(b)
+
+        assert merged.counts == both.counts
+        assert (merged.count, merged.min, merged.max) == (6, 0.0001, 500)
+        assert merged.total == pytest.approx(both.total)
+
+    def test_dict_round_trip(self):
+        histogram = Histogram()
+        for value in (0.01, 0.02, 200):
+            histogram.record(value)
+
+        result = Histogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+
+        assert result.counts == histogram.counts
+        assert result.percentile(99) == histogram.percentile(99)
+
+    def test_empty(self):
+        assert Histogram().percentile(99) == 0
+
+
+class TestDeviceMetrics:
+    def test_counters_are_recorded_per_action_and_in_parent(self):
+        parent = DeviceMetrics()
+        metrics = DeviceMetrics(parent=parent)
+
+        metrics.request_responded("Authorize", metrics.request_sent("Authorize"), rejected=True)
+        metrics.request_sent("Heartbeat")
+        metrics.request_timed_out("Heartbeat")
+
+        for e in (metrics, parent):
+            assert e.actions["Authorize"].sent == 1
+            assert e.actions["Authorize"].responded == 1
+            assert e.actions["Authorize"].rejected == 1
+            assert e.actions["Authorize"].latency.count == 1
+            assert e.actions["Heartbeat"].timed_out == 1
+        assert metrics.totals().sent == 2
+
+    def test_merged_round_trip(self):
+        a, b = DeviceMetrics(), DeviceMetrics()
+        a.request_responded("Heartbeat", a.request_sent("Heartbeat"))
+        b.request_responded("Heartbeat", b.request_sent("Heartbeat"))
+        b.request_sent("register")
+        a.connect_retried()
+        b.connect_retried()
+        b.recovered(time.perf_counter() - 2)
+
+        result = DeviceMetrics.from_dict(DeviceMetrics.merged([a, b]).to_dict())
+
+        assert result.actions["Heartbeat"].responded == 2
+        assert result.actions["register"].sent == 1
+        assert result.connect_retries == 2
+        assert result.recover.count == 1 and result.recover.min >= 2
+
+    @pytest.mark.parametrize("payload, expected", [
+        ({"status": "Accepted"}, False),
+        ({"status": "Rejected"}, True),
+        ({"idTagInfo": {"status": "Blocked"}}, True),
+        ({"idTokenInfo": {"status": "Accepted"}}, False),
+        ({"currentTime": "2024-01-01T00:00:00Z"}, False),
+        (None, False),
+        ("timeout", False),
+    ])
+    def test_is_rejected(self, payload, expected):
+        assert DeviceMetrics.is_rejected(payload) is expected
+
+
+class TestDeviceRequestMetrics:
+    @pytest.mark.asyncio
+    async def test_ocpp_j_response_is_recorded(self):
+        device = DeviceOcppJ16("metrics-device")
+        inbound = asyncio.Queue()
+        device._ws = MagicMock()
+        device._ws.recv = inbound.get
+
+        async def respond(raw, text=None):
+            req = json.loads(raw)
+            await inbound.put(json.dumps([3, req[1], {"idTagInfo": {"status": "Invalid"}}]))
+        device._ws.send = AsyncMock(side_effect=respond)
+        loop_task = asyncio.create_task(device._AbstractDeviceOcppJ__loop_internal())
+        try:
+            await device.by_device_req_send("Authorize", {"idTag": "X"})
+        finally:
+            loop_task.cancel()
+
+        e = device.metrics.actions["Authorize"]
+        assert (e.sent, e.responded, e.rejected, e.timed_out) == (1, 1, 1, 0)
+        assert e.latency.count == 1
+
+    @pytest.mark.asyncio
+    async def test_ocpp_j_timeout_is_recorded(self):
+        device = DeviceOcppJ16("metrics-device")
+        device._ws = MagicMock()
+        device._ws.send = AsyncMock()
+        device.response_timeout_seconds = 0.01
+
+        await device.by_device_req_send("Heartbeat", {})
+
+        e = device.metrics.actions["Heartbeat"]
+        assert (e.sent, e.responded, e.timed_out) == (1, 0, 1)
+        assert DeviceMetrics.process.actions["Heartbeat"].timed_out >= 1
+
+
+class TestMetricsServer:
+    @staticmethod
+    async def _get(port, path):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        return response
+
+    @pytest.mark.asyncio
+    async def test_serves_counters_gauges_and_histograms(self):
+        metrics = DeviceMetrics()
+        metrics.request_responded("Heartbeat", metrics.request_sent("Heartbeat"))
+        metrics.request_sent("Authorize")
+        metrics.reconnected()
+        metrics.connect_retried()
+        metrics.recovered(time.perf_counter())
+        connected = MagicMock(is_connected=True, charge_in_progress=True, requests_pending=2)
+        charging = MagicMock(is_connected=False, charge_in_progress=False, requests_pending=0)
+        server = MetricsServer(lambda: [connected, charging], 0, metrics=metrics)
+        await server.start()
+        try:
+            response = await self._get(server.port, "/metrics")
+        finally:
+            await server.end()
+
+        assert response.startswith("HTTP/1.1 200 OK")
+        body = response.split("\r\n\r\n", 1)[1]
+        assert "charge_simulator_devices 2" in body
+        assert "charge_simulator_devices_connected 1" in body
+        assert "charge_simulator_charge_sessions_in_progress 1" in body
+        assert "charge_simulator_reconnects_total 1" in body
+        assert "charge_simulator_connect_retries_total 1" in body
+        assert "charge_simulator_recoveries_total 1" in body
+        assert 'charge_simulator_time_to_recover_quantile_seconds{quantile="0.99"}' in body
+        assert 'charge_simulator_requests_in_flight{action="Authorize"} 1' in body
+        assert "charge_simulator_requests_pending 2" in body
+        assert 'charge_simulator_requests_sent_total{action="Heartbeat"} 1' in body
+        assert 'charge_simulator_request_latency_seconds_bucket{action="Heartbeat",le="+Inf"} 1' in body
+        assert 'charge_simulator_request_latency_quantile_seconds{action="Heartbeat",quantile="0.99"}' in body
+
+    @pytest.mark.asyncio
+    async def test_unknown_path_is_not_found(self):
+        server = MetricsServer(lambda: [], 0, metrics=DeviceMetrics())
+        await server.start()
+        try:
+            response = await self._get(server.port, "/")
+        finally:
+            await server.end()
+
+        assert response.startswith("HTTP/1.1 404")
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = DeviceMetrics()
+        for value in (0.001, 0.01, 0.1, 1):
+            metrics.action("Heartbeat").latency.record(value)
+
+        body = MetricsServer(lambda: [], 0, metrics=metrics).render()
+
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in body.splitlines() if "_bucket{" in line]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == 4
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.device.middleware_handlers import MiddlewareResp, middleware_handler
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.runtime.config_parser import ConfigParser
+
+
+def _device_ocpp_j(cls=DeviceOcppJ16):
+    device = cls("handlers")
+    device._ws = MagicMock()
+    device._ws.send = AsyncMock()
+    return device
+
+
+def _sent(device):
+    return json.loads(device._ws.send.await_args.args[0])
+
+
+class TestRegistry:
+    def test_built_per_class(self):
+        assert DeviceOcppJ16.middleware_handlers["clearcache"] is DeviceOcppJ16.by_middleware_req_accept
+        assert "triggermessage" in DeviceOcppJ201.middleware_handlers
+        assert "triggermessage" not in DeviceOcppS.middleware_handlers
+        assert set(DeviceEnsto.middleware_handlers) == {"20", "17", "11", "14", "15", "42"}
+
+    @pytest.mark.asyncio
+    async def test_subclass_extends_and_overrides(self):
+        class Device(DeviceOcppJ16):
+            @middleware_handler("CertificateSigned")
+            async def by_middleware_req_certificate_signed(self, req_payload):
+                return MiddlewareResp({"status": "Rejected"})
+
+            async def by_middleware_req_get_diagnostics(self, req_payload):
+                return MiddlewareResp({"fileName": "custom.log"})
+
+        device = _device_ocpp_j(Device)
+
+        await device.by_middleware_req("1", "certificatesigned", {})
+        assert _sent(device) == [3, "1", {"status": "Rejected"}]
+        await device.by_middleware_req("2", "getdiagnostics", {})
+        assert _sent(device) == [3, "2", {"fileName": "custom.log"}]
+        assert "certificatesigned" not in DeviceOcppJ16.middleware_handlers
+
+    @pytest.mark.asyncio
+    async def test_custom_handler_of_one_device(self):
+        device, other = _device_ocpp_j(), _device_ocpp_j()
+
+        async def data_transfer(d, req_payload):
+            return {"status": "Accepted", "data": d.deviceId + req_payload["data"]}
+        device.middleware_handler_set("DataTransfer", data_transfer)
+        device.middleware_handler_set("ClearCache", None)
+
+        await device.by_middleware_req("1", "datatransfer", {"data": "-x"})
+        assert _sent(device) == [3, "1", {"status": "Accepted", "data": "handlers-x"}]
+        device._ws.send.reset_mock()
+        await device.by_middleware_req("2", "clearcache", {})
+        device._ws.send.assert_not_awaited()
+        await other.by_middleware_req("3", "datatransfer", {})
+        assert _sent(other) == [3, "3", {"status": "Accepted"}]
+
+    @pytest.mark.asyncio
+    async def test_unknown_action_not_responded(self):
+        device = _device_ocpp_j()
+
+        await device.by_middleware_req("1", "unknownaction", {})
+
+        device._ws.send.assert_not_awaited()
+
+
+class TestTriggerMessage:
+    @pytest.mark.asyncio
+    async def test_requested_message_sent_after_response(self):
+        device = _device_ocpp_j()
+        order = []
+        device._ws.send = AsyncMock(side_effect=lambda raw, text=None: order.append("response"))
+
+        async def heart_beat():
+            order.append("heartbeat")
+        device.action_heart_beat = heart_beat
+
+        await device.by_middleware_req("1", "triggermessage", {"requestedMessage": "Heartbeat"})
+        await asyncio.sleep(0)
+
+        assert order == ["response", "heartbeat"]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_requested_message(self):
+        device = _device_ocpp_j()
+
+        await device.by_middleware_req("1", "triggermessage", {"requestedMessage": "FirmwareStatusNotification"})
+
+        device._ws.send.assert_not_awaited()
+
+
+class TestConfig:
+    @pytest.mark.asyncio
+    async def test_middleware_responses(self):
+        device = ConfigParser.parse_device({
+            "type": "ocpp-s",
+            "spec_identifier": "S1",
+            "middleware_responses": {"DataTransfer": {"status": "Rejected"}},
+        })
+
+        assert await device.by_middleware_req("1", "datatransfer", {}) == {"status": "Rejected"}
+        assert await device.by_middleware_req("2", "clearcache", {}) == {"status": "Accepted"}
+
+    @pytest.mark.asyncio
+    async def test_ensto_middleware_responses(self):
+        device = ConfigParser.parse_device({
+            "type": "ensto",
+            "spec_identifier": "E1",
+            "middleware_responses": {20: {"nack": "1"}},
+        })
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        device._DeviceEnsto__socketWriter = writer
+
+        assert await device.by_middleware_req("20", {"id": "20"})
+        assert await device.by_middleware_req("20", {"id": "20"})
+
+        assert writer.write.call_args.args[0] == b"imei=E1&nack=1&id=20"
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.backoff import Backoff
+from charge_device_simulator.device.ocpp_j.device_ocpp_j201 import DeviceOcppJ201
+from charge_device_simulator.device.simulator import Simulator
+from charge_device_simulator.mock import MockCsmsOcppJ, MockOptions
+from charge_device_simulator.mock.__main__ import parse_args, server_create
+
+
+@pytest.fixture
+async def csms():
+    server = MockCsmsOcppJ(port=0)
+    await server.start()
+    yield server
+    await server.end()
+
+
+async def _device(device_class, server, name):
+    device = device_class(name)
+    device.server_address = f"ws://127.0.0.1:{server.port}"
+    device.error_exit = False
+    device.response_timeout_seconds = 2
+    assert await device.initialize()
+    return device
+
+
+class TestMockCsmsOcppJ:
+    @pytest.mark.asyncio
+    async def test_ocpp16_charge_session(self, csms):
+        device = await _device(DeviceOcppJ16, csms, "mock-16")
+        try:
+            assert device.is_connected
+            options = {"idTag": "TAG", "connectorId": 1}
+            assert await device.action_authorize(options)
+            assert await device.action_charge_start(options)
+            assert await device.action_meter_value(options)
+            assert await device.action_charge_stop(options)
+        finally:
+            await device.end()
+
+        assert csms.received["BootNotification"] == 1
+        assert csms.received["StartTransaction"] == 1
+        assert device.metrics.actions["MeterValues"].responded == 1
+
+    @pytest.mark.asyncio
+    async def test_ocpp201_transaction_events(self, csms):
+        device = await _device(DeviceOcppJ201, csms, "mock-201")
+        try:
+            options = {"idTag": "TAG", "connectorId": 1}
+            assert await device.action_authorize(options)
+            assert await device.action_charge_start(options)
+            assert await device.action_charge_stop(options)
+        finally:
+            await device.end()
+
+        assert csms.received["TransactionEvent"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_rejections_and_latency(self):
+        server = MockCsmsOcppJ(port=0, options=MockOptions(latency_seconds=0.05, reject_ratios={"Authorize": 1}))
+        await server.start()
+        try:
+            device = await _device(DeviceOcppJ16, server, "mock-reject")
+            try:
+                assert not await device.action_authorize({"idTag": "TAG"})
+            finally:
+                await device.end()
+        finally:
+            await server.end()
+
+        assert server.rejected["Authorize"] == 1
+        e = device.metrics.actions["Authorize"]
+        assert e.rejected == 1
+        assert e.latency.min >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_unknown_action_gets_call_error(self, csms):
+        async with websockets.connect(f"ws://127.0.0.1:{csms.port}/raw", subprotocols=["ocpp1.6"]) as ws:
+            await ws.send(json.dumps([2, "1", "Unheard", {}]))
+            reply = json.loads(await ws.recv())
+
+        assert reply[:3] == [4, "1", "NotImplemented"]
+
+    @pytest.mark.asyncio
+    async def test_server_initiated_requests(self):
+        server = MockCsmsOcppJ(port=0, trigger_message_seconds=0.05, trigger_message="BootNotification")
+        await server.start()
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{server.port}/cp-1", subprotocols=["ocpp1.6"]) as ws:
+                request = json.loads(await ws.recv())
+                await ws.send(json.dumps([3, request[1], {"status": "Accepted"}]))
+                await asyncio.sleep(0)
+        finally:
+            await server.end()
+
+        assert request[2] == "TriggerMessage"
+        assert request[3] == {"requestedMessage": "BootNotification"}
+        assert server.sent["TriggerMessage"] >= 1
+
+
+class TestMockCli:
+    def test_parse_creates_ocpp_j_server(self):
+        server = server_create(parse_args([
+            "--port", "9100", "--latency", "0.2", "--reject", "Authorize=0.5", "ocpp-j", "--reset", "60"]))
+
+        assert isinstance(server, MockCsmsOcppJ)
+        assert server.port == 9100
+        assert server.reset_seconds == 60
+        assert server.options.latency_seconds == 0.2
+        assert server.options.reject_ratios == {"Authorize": 0.5}
+
+
+class TestReconnect:
+    @pytest.mark.asyncio
+    async def test_closed_connection_recovered(self, csms):
+        device = DeviceOcppJ16("mock-reconnect")
+        device.server_address = f"ws://127.0.0.1:{csms.port}"
+        device.error_exit = False
+        device.register_on_initialize = False
+        simulator = Simulator(device)
+        simulator.reconnect_backoff = Backoff(0.01, 0.05)
+        try:
+            assert await simulator.initialize()
+            await csms.connections["mock-reconnect"].close()
+            for _ in range(500):
+                if device.metrics.recover.count > 0:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await simulator.end()
+
+        assert device.metrics.recover.count == 1
+        assert device.metrics.reconnects == 1
+        assert csms.received["HeartBeat"] == 2
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.mock import MockCsmsOcppS, MockEnstoServer, MockOptions
+from charge_device_simulator.mock.__main__ import parse_args, server_create
+
+
+async def _initialized(device):
+    device.error_exit = False
+    device.response_timeout_seconds = 2
+    assert await device.initialize()
+    return device
+
+
+class TestMockEnstoServer:
+    def test_split_concatenated_messages(self):
+        result = MockEnstoServer.split("imei=A&id=24&time=1imei=A&id=2&ping&status=1")
+
+        assert result == [
+            {"imei": "A", "id": "24", "time": "1"},
+            {"imei": "A", "id": "2", "ping": None, "status": "1"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ensto_device_session(self):
+        server = MockEnstoServer(port=0)
+        await server.start()
+        device = DeviceEnsto("ensto-1")
+        device.server_host, device.server_port = "127.0.0.1", server.port
+        try:
+            await _initialized(device)
+            options = {"idTag": "TAG", "connectorId": 1}
+            assert await device.action_authorize(options)
+            assert await device.action_charge_start(options)
+            assert await device.action_meter_value(options)
+            assert await device.action_charge_stop(options)
+        finally:
+            await device.end()
+            await server.end()
+
+        assert server.received["register"] == 1
+        assert server.received["heart_beat"] == 1
+        assert server.devices == {"ensto-1"}
+        assert device.metrics.actions["charge_stop"].responded == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_authorize_and_latency(self):
+        server = MockEnstoServer(port=0, options=MockOptions(latency_seconds=0.05, reject_ratios={"authorize": 1}))
+        await server.start()
+        device = DeviceEnsto("ensto-2")
+        device.server_host, device.server_port = "127.0.0.1", server.port
+        try:
+            await _initialized(device)
+            assert await device.action_authorize({"idTag": "TAG"})
+        finally:
+            await device.end()
+            await server.end()
+
+        assert server.rejected == {"authorize": 1}
+        assert device.metrics.actions["authorize"].rejected == 1
+        assert device.metrics.actions["authorize"].latency.min >= 0.05
+
+
+def _device_ocpp_s(device_id, server):
+    device = DeviceOcppS(device_id)
+    device.server_address = f"http://127.0.0.1:{server.port}/"
+    device.spec_chargePointVendor, device.spec_chargePointModel = "Vendor", "Model"
+    return device
+
+
+class TestMockCsmsOcppS:
+    @pytest.mark.asyncio
+    async def test_ocpp_s_device_session(self):
+        # On the same loop as the device, which must not block it while waiting for a response
+        server = MockCsmsOcppS(port=0)
+        await server.start()
+        device = _device_ocpp_s("soap-1", server)
+        try:
+            await _initialized(device)
+            options = {"idTag": "TAG", "connectorId": 1}
+            assert await device.action_authorize(options)
+            assert await device.action_charge_start(options)
+            assert await device.action_charge_stop(options)
+        finally:
+            await device.end()
+            await server.end()
+
+        assert server.received["BootNotification"] == 1
+        assert server.received["StopTransaction"] == 1
+        assert server.charge_boxes == {"soap-1"}
+
+    @pytest.mark.asyncio
+    async def test_ocpp_s_devices_wait_concurrently_and_time_out(self):
+        server = MockCsmsOcppS(port=0, options=MockOptions(latency_seconds=0.3))
+        await server.start()
+        devices = [_device_ocpp_s(f"soap-{i}", server) for i in range(5)]
+        try:
+            for device in devices:
+                device.register_on_initialize = False
+            await asyncio.gather(*(_initialized(device) for device in devices))
+            time_start = time.perf_counter()
+            assert all(await asyncio.gather(*(device.action_heart_beat() for device in devices)))
+            # Sequential (blocking) calls would take 5 x 0.3s
+            assert time.perf_counter() - time_start < 1
+
+            devices[0].response_timeout_seconds = 0.05
+            await devices[0].action_heart_beat()
+            # Lets the server answer the timed out request before it ends
+            await asyncio.sleep(0.3)
+        finally:
+            await server.end()
+
+        assert devices[0].metrics.actions["Heartbeat"].timed_out == 1
+
+    @pytest.mark.asyncio
+    async def test_unanswered_operation_is_a_fault(self):
+        server = MockCsmsOcppS(port=0, options=MockOptions(reject_ratios={"Heartbeat": 1}))
+
+        assert await server._MockCsmsOcppS__handle("Heartbeat", {}, {}) is None
+
+
+class TestMockCliServers:
+    def test_parse_creates_ensto_and_ocpp_s_servers(self):
+        assert isinstance(server_create(parse_args(["ensto"])), MockEnstoServer)
+        server = server_create(parse_args(["--port", "0", "ocpp-s"]))
+        assert isinstance(server, MockCsmsOcppS)
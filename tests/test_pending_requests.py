@@ -0,0 +1,163 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.ensto.device_ensto import DeviceEnsto
+from charge_device_simulator.device.ensto.pending_req import PendingReq
+from charge_device_simulator.device.ensto.pending_table import PendingTable
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ocpp_j.pending_requests import PendingRequests
+
+
+class TestPendingRequests:
+    @pytest.mark.asyncio
+    async def test_resolve_once(self):
+        pending = PendingRequests()
+        future = pending.add("1")
+
+        assert pending.resolve("1", [3, "1", {}])
+        assert not pending.resolve("1", [3, "1", {}])
+        assert future.result() == [3, "1", {}]
+        assert len(pending) == 0
+
+    @pytest.mark.asyncio
+    async def test_discard(self):
+        pending = PendingRequests()
+        pending.add("1")
+
+        pending.discard("1")
+        pending.discard("1")
+
+        assert "1" not in pending
+
+
+def _device_ocpp_j(name):
+    device = DeviceOcppJ16(name)
+    device._ws = MagicMock()
+    device._ws.send = AsyncMock()
+    device.response_timeout_seconds = 0.01
+    return device
+
+
+class TestOcppJPending:
+    def test_tables_are_per_device(self):
+        a, b = DeviceOcppJ16("a"), DeviceOcppJ16("b")
+
+        assert a._AbstractDeviceOcppJ__pending_by_device_reqs is not b._AbstractDeviceOcppJ__pending_by_device_reqs
+
+    @pytest.mark.asyncio
+    async def test_timed_out_and_cancelled_requests_are_evicted(self):
+        device = _device_ocpp_j("evict")
+
+        await device.by_device_req_send("Heartbeat", {})
+        device.response_timeout_seconds = 10
+        task = asyncio.create_task(device.by_device_req_send("Heartbeat", {}))
+        await asyncio.sleep(0.01)
+        assert device.requests_pending == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert device.requests_pending == 0
+        assert device.metrics.actions["Heartbeat"].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_call_error_resolves_the_request(self):
+        device = _device_ocpp_j("call-error")
+        device.response_timeout_seconds = 5
+        inbound = asyncio.Queue()
+        device._ws.recv = inbound.get
+
+        async def respond(raw, text=None):
+            await inbound.put(json.dumps([4, json.loads(raw)[1], "NotImplemented", "Unknown action", {}]))
+        device._ws.send = AsyncMock(side_effect=respond)
+        loop_task = asyncio.create_task(device._AbstractDeviceOcppJ__loop_internal())
+        try:
+            result = await asyncio.wait_for(device.by_device_req_send("Heartbeat", {}), 1)
+        finally:
+            loop_task.cancel()
+
+        assert result is None
+        e = device.metrics.actions["Heartbeat"]
+        assert (e.responded, e.rejected, e.timed_out) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_raw_request_is_matched_by_its_own_id(self):
+        device = _device_ocpp_j("raw")
+        device.response_timeout_seconds = 10
+        task = asyncio.create_task(device.by_device_req_send_raw('[2,"custom-1","Heartbeat",{}]', "Custom"))
+        await asyncio.sleep(0.01)
+
+        assert device._AbstractDeviceOcppJ__pending_by_device_reqs.resolve("custom-1", [3, "custom-1", {}])
+        assert await task == [3, "custom-1", {}]
+
+    @pytest.mark.asyncio
+    async def test_max_in_flight_holds_requests_back(self):
+        device = _device_ocpp_j("limited")
+        device.response_timeout_seconds = 10
+        device.max_in_flight = 2
+
+        tasks = [asyncio.create_task(device.by_device_req_send("Heartbeat", {})) for _ in range(5)]
+        await asyncio.sleep(0.01)
+
+        assert device.requests_pending == 2
+        assert device._ws.send.await_count == 2
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert device.requests_pending == 0
+
+    def test_invalid_max_in_flight(self):
+        with pytest.raises(ValueError):
+            DeviceOcppJ16("x").max_in_flight = 0
+
+
+class TestEnstoPending:
+    @pytest.mark.asyncio
+    async def test_timed_out_request_is_evicted(self):
+        device = DeviceEnsto("ensto-evict")
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        device._DeviceEnsto__socketWriter = writer
+        device.response_timeout_seconds = 0.01
+
+        await device.by_device_req_send("heart_beat", {"id": 24})
+
+        assert device.requests_pending == 0
+        assert DeviceEnsto("other")._DeviceEnsto__pending_by_device_reqs is not device._DeviceEnsto__pending_by_device_reqs
+
+
+class TestPendingTable:
+    def test_oldest_first_by_id_then_valid_ids(self):
+        table = PendingTable()
+        first, second = PendingReq(None, print), PendingReq(["7"], print)
+        table.add("43", first)
+        table.add("43", second)
+
+        assert table.pop("43") is first
+        assert table.pop("7") is second
+        assert table.pop("43") is None
+        assert len(table) == 0
+
+    def test_valid_id_match_leaves_no_trace(self):
+        table = PendingTable()
+        pending_req = PendingReq([11, 12, 11], print)
+        table.add("5", pending_req)
+
+        assert table.pop("12") is pending_req
+        assert table.pop("5") is None
+        assert table.pop("11") is None
+
+    def test_discard(self):
+        table = PendingTable()
+        key = table.add("5", PendingReq(["6"], print))
+        other = PendingReq(["6"], print)
+        table.add("8", other)
+
+        table.discard(key)
+        table.discard(key)
+
+        assert len(table) == 1
+        assert table.pop("6") is other
@@ -0,0 +1,100 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+from charge_device_simulator.device.rate_limiter import TokenBucket
+from charge_device_simulator.runtime.config_parser import ConfigParser
+from charge_device_simulator.runtime.fleet import Fleet
+from charge_device_simulator.runtime.ramp import RampProfile
+
+
+class TestRampProfile:
+    def test_linear_spreads_by_rate(self):
+        ramp = RampProfile('linear', rate=4)
+
+        assert [ramp.offset(i) for i in range(5)] == [0, 0.25, 0.5, 0.75, 1]
+
+    def test_step_starts_groups_together(self):
+        ramp = RampProfile('step', step_size=2, step_seconds=5)
+
+        assert [ramp.offset(i) for i in range(5)] == [0, 0, 5, 5, 10]
+
+    def test_exponential_rate_grows_by_factor_per_step(self):
+        ramp = RampProfile('exponential', rate=10, step_seconds=1, factor=2)
+
+        # Rate is 10 * 2^t, so 10 / ln(2) * (2^t - 1) are started after t seconds
+        def started(t):
+            return 10 / math.log(2) * (2 ** t - 1)
+
+        assert ramp.offset(0) == 0
+        assert ramp.offset(started(1)) == pytest.approx(1)
+        assert ramp.offset(started(3)) == pytest.approx(3)
+
+    def test_unknown_profile_is_rejected(self):
+        with pytest.raises(ValueError):
+            RampProfile('sine')
+
+    def test_parse_scales_to_share(self):
+        ramp = RampProfile.parse({'profile': 'linear', 'rate': 100}, share=0.25)
+
+        assert ramp.rate == 25
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_burst_passes_then_rate_limits(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        time_start = time.monotonic()
+
+        for _ in range(4):
+            await bucket.acquire()
+
+        # 2 from the burst, 2 more at 50/s
+        assert time.monotonic() - time_start >= 0.035
+
+    @pytest.mark.asyncio
+    async def test_concurrent_waiters_are_spread(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        done = []
+
+        async def take(i):
+            await bucket.acquire()
+            done.append((i, time.monotonic()))
+
+        await asyncio.gather(*(take(i) for i in range(5)))
+
+        assert [i for i, _ in done] == [0, 1, 2, 3, 4]
+        assert done[-1][1] - done[0][1] >= 0.035
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_its_token_back(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        await bucket.acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        assert bucket.delay_next() > 0.15
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # Only the token taken by the first caller is still owed
+        assert 0 < bucket.delay_next() <= 0.1
+
+
+class TestConfigParserFleet:
+    def test_fleet_section_builds_ramp_and_limiters(self):
+        fleet = ConfigParser.parse_fleet(Fleet([]), {
+            'ramp': {'profile': 'step', 'step_size': 10, 'step_seconds': 2},
+            'initialize_rate': 100,
+            'initialize_burst': 10,
+            'boot_notification_rate': 40,
+        }, share=0.5)
+
+        assert fleet.ramp.profile == 'step'
+        assert fleet.ramp.step_size == 5
+        assert fleet.initialize_rate_limiter.rate == 50
+        assert fleet.initialize_rate_limiter.burst == 5
+        assert fleet.register_rate_limiter.rate == 20
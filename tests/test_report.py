@@ -0,0 +1,87 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from charge_device_simulator.device.metrics import DeviceMetrics
+from charge_device_simulator.device.simulator import Simulator
+from charge_device_simulator.runtime.executor_cli import ExecutorCli
+from charge_device_simulator.runtime.fleet import Fleet
+from charge_device_simulator.runtime.report import Report
+
+
+def _metrics():
+    metrics = DeviceMetrics(window_seconds=10)
+    for _ in range(3):
+        metrics.request_responded("Heartbeat", metrics.request_sent("Heartbeat"))
+    metrics.request_responded("Authorize", metrics.request_sent("Authorize"), rejected=True)
+    metrics.request_sent("Authorize")
+    metrics.request_timed_out("Authorize")
+    metrics.connect.record(0.05)
+    metrics.session_ended(120)
+    return metrics
+
+
+class TestReport:
+    def test_per_action_rates_and_percentiles(self):
+        result = Report(_metrics(), {"simulations": 1, "succeeded": 1, "duration_seconds": 2}).to_dict()
+
+        authorize = result["actions"]["Authorize"]
+        assert (authorize["sent"], authorize["responded"]) == (2, 1)
+        assert authorize["error_rate"] == 0.5
+        assert authorize["timeout_rate"] == 0.5
+        assert result["actions"]["Heartbeat"]["latency_seconds"]["count"] == 3
+        assert result["totals"]["responded"] == 4
+        assert result["totals"]["throughput"] == 2
+        assert result["connect_seconds"]["count"] == 1
+        assert result["session_seconds"]["max"] == 120
+        json.dumps(result)
+
+    def test_throughput_windows_include_empty_ones(self):
+        metrics = DeviceMetrics(window_seconds=10)
+        metrics.windows = {100.0: 20, 130.0: 10}
+
+        throughput = Report(metrics).throughput()
+
+        assert [w["start"] for w in throughput] == [100, 110, 120, 130]
+        assert [w["rate"] for w in throughput] == [2, 0, 0, 1]
+
+    def test_from_summary_round_trip(self):
+        summary = {"simulations": 2, "succeeded": 2, "duration_seconds": 1, "metrics": _metrics().to_dict()}
+
+        report = Report.from_summary(json.loads(json.dumps(summary)))
+
+        assert report.to_dict()["actions"]["Heartbeat"]["responded"] == 3
+
+    def test_table_lists_actions_and_durations(self):
+        table = Report(_metrics(), {"simulations": 1, "succeeded": 1, "duration_seconds": 2}).table()
+
+        assert "Heartbeat" in table
+        assert "Authorize" in table
+        assert "Connect" in table
+        assert "Session" in table
+        assert "Recover" in table
+        assert "Connect retries: 0" in table
+        assert "Throughput per 10s window" in table
+
+
+class TestExecutorCliReport:
+    @pytest.mark.asyncio
+    async def test_fleet_run_writes_json_report(self, tmp_path, capsys):
+        device = MagicMock()
+        device.on_error = []
+        device.initialize = AsyncMock(return_value=True)
+        device.end = AsyncMock()
+        device.metrics = DeviceMetrics()
+        sim = Simulator(device)
+        sim.name = "sim1"
+        sim.frequent_flow_enabled = False
+        cli = ExecutorCli()
+        cli.fleet = Fleet([sim])
+        cli.report_json = str(tmp_path / "report.json")
+
+        assert await cli.execute() == 0
+
+        result = json.loads((tmp_path / "report.json").read_text())
+        assert result["run"]["simulations"] == 1
+        assert "Run Report" in capsys.readouterr().out
@@ -1,7 +1,9 @@
+import asyncio
 from unittest.mock import MagicMock, AsyncMock, patch
 
 import pytest
 
+from charge_device_simulator.device.backoff import Backoff
 from charge_device_simulator.device.error_reasons import ErrorReasons
 from charge_device_simulator.device.flows import Flows
 from charge_device_simulator.device.frequent_flow_options import FrequentFlowOptions
@@ -232,3 +234,106 @@ class TestSimulatorErrorHandling:
         await simulator.device_on_error("test error", ErrorReasons.InvalidResponse)
 
         mock_device.re_initialize.assert_not_called()
+
+
+class TestSimulatorReconnectBackoff:
+    """(Re-)initialize attempts are retried after `reconnect_backoff` delays, a
+    lost connection gets re-initialized from a task of the simulator."""
+
+    @pytest.mark.asyncio
+    async def test_initialize_retried_with_backoff_delays(self, simulator, mock_device):
+        mock_device.initialize = AsyncMock(side_effect=[False, False, True])
+        simulator.reconnect_backoff = Backoff(1, 3, 'none')
+
+        with patch("charge_device_simulator.device.simulator.asyncio.sleep", AsyncMock()) as sleep:
+            assert await simulator.initialize()
+
+        assert [c.args[0] for c in sleep.await_args_list] == [1, 2]
+        assert mock_device.metrics.connect_retried.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, simulator, mock_device):
+        mock_device.re_initialize = AsyncMock(return_value=False)
+        simulator.reconnect_backoff = Backoff(0.001, max_attempts=2)
+
+        assert not await simulator.re_initialize()
+
+        assert mock_device.re_initialize.await_count == 3
+        mock_device.metrics.recovered.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_connection_error_reconnects_in_own_task(self, simulator, mock_device):
+        await simulator.device_on_error("closed", ErrorReasons.ConnectionError)
+        await simulator.device_on_error("closed", ErrorReasons.ConnectionError)
+        mock_device.re_initialize.assert_not_called()
+        await asyncio.sleep(0)
+
+        mock_device.re_initialize.assert_awaited_once()
+        mock_device.metrics.recovered.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_gave_up_reconnect_ends_simulation(self, simulator, mock_device):
+        mock_device.re_initialize = AsyncMock(return_value=False)
+        mock_device.end = AsyncMock()
+        simulator.reconnect_backoff = Backoff(max_attempts=0)
+
+        await simulator.device_on_error("error", ErrorReasons.UnknownException)
+
+        assert simulator.is_ended
+        mock_device.end.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_reconnect_once_ended(self, simulator, mock_device):
+        mock_device.end = AsyncMock()
+        await simulator.end()
+
+        await simulator.device_on_error("closed", ErrorReasons.ConnectionError)
+        await asyncio.sleep(0)
+
+        mock_device.re_initialize.assert_not_called()
+
+
+class TestSimulatorFrequentFlowScheduling:
+    """Frequent flows are driven by the shared FlowScheduler instead of a
+    1-second polling loop, so sub-second delays are honored."""
+
+    @pytest.mark.asyncio
+    async def test_sub_second_delay_runs_count_times(self, simulator, mock_device):
+        simulator.frequent_flows = {
+            Flows.Heartbeat: FrequentFlowOptions(delay_seconds=0.01, count=3)
+        }
+
+        await asyncio.wait_for(simulator.loop_flow_frequent(), timeout=1)
+
+        assert mock_device.flow_heartbeat.await_count == 3
+        assert simulator.frequent_flows[Flows.Heartbeat].run_counter == 3
+
+    @pytest.mark.asyncio
+    async def test_busy_flow_runs_again_once_previous_run_is_done(self, simulator, mock_device):
+        async def slow_heartbeat():
+            await asyncio.sleep(0.05)
+            return True
+        mock_device.flow_heartbeat = AsyncMock(side_effect=slow_heartbeat)
+        simulator.frequent_flows = {
+            Flows.Heartbeat: FrequentFlowOptions(delay_seconds=0.01, count=2)
+        }
+
+        await asyncio.wait_for(simulator.loop_flow_frequent(), timeout=1)
+
+        assert mock_device.flow_heartbeat.await_count == 2
+        # Second run was held back until the first one finished
+        assert simulator.frequent_flows[Flows.Heartbeat].run_last_time >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_end_stops_endless_flows(self, simulator, mock_device):
+        mock_device.end = AsyncMock()
+        simulator.frequent_flows = {
+            Flows.Heartbeat: FrequentFlowOptions(delay_seconds=0.01, count=-1)
+        }
+
+        loop_task = asyncio.create_task(simulator.loop_flow_frequent())
+        await asyncio.sleep(0.05)
+        await simulator.end()
+        await asyncio.wait_for(loop_task, timeout=1)
+
+        assert mock_device.flow_heartbeat.await_count >= 2
@@ -0,0 +1,110 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from lxml import etree
+from zeep.exceptions import Fault
+
+from charge_device_simulator.device.ocpp_s.device_ocpp_s import DeviceOcppS
+from charge_device_simulator.device.ocpp_s.soap_templates import SoapTemplates
+from charge_device_simulator.mock import MockCsmsOcppS, MockOptions
+from charge_device_simulator.runtime.config_parser import ConfigParser
+
+
+async def _initialized(server: MockCsmsOcppS) -> DeviceOcppS:
+    device = DeviceOcppS("soap-t")
+    device.server_address = f"http://127.0.0.1:{server.port}/"
+    device.register_on_initialize = False
+    device.error_exit = False
+    device.response_timeout_seconds = 2
+    device.action_heart_beat = AsyncMock(return_value=True)
+    assert await device.initialize()
+    del device.action_heart_beat
+    return device
+
+
+class TestSoapTemplates:
+    @pytest.mark.asyncio
+    async def test_render_matches_zeep(self):
+        server = MockCsmsOcppS(port=0)
+        device = await _initialized(server)
+        templates = device._DeviceOcppS__templates
+        payload = {"connectorId": 2, "transactionId": 5, "values": [{
+            "timestamp": "2026-02-03T04:05:06Z",
+            "value": [{"_value_1": 99, "context": "Sample.Periodic", "location": "Outlet", "unit": "kWh"}],
+        }]}
+        address = device.server_address
+
+        assert templates.operations == {"Heartbeat", "StatusNotification", "MeterValues"}
+        expected = device._client.create_message(device._client_service, "MeterValues", **payload, _soapheaders={'ChargeBoxIdentity': "soap-t"})
+        for e in expected.iter('{http://www.w3.org/2005/08/addressing}MessageID'):
+            e.text = "urn:uuid:1"
+        for e in expected.iter('{http://www.w3.org/2005/08/addressing}To'):
+            e.text = address
+        actual = etree.fromstring(templates.render("MeterValues", payload, "soap-t", address, device.from_address, "urn:uuid:1"))
+        assert etree.tostring(actual, method='c14n') == etree.tostring(expected, method='c14n')
+
+    def test_not_covered_payloads_left_to_zeep(self):
+        templates = SoapTemplates(SoapTemplates.samples)
+
+        assert templates.render("Heartbeat", {}, "cp", "http://cs/", "http://cp/", "urn:1") is not None
+        assert templates.render("Authorize", {"idTag": "T"}, "cp", "http://cs/", "http://cp/", "urn:1") is None
+        assert templates.render("StatusNotification", {"connectorId": 1, "timestamp": datetime.datetime.now()}, "cp", "", "", "urn:1") is None
+        assert templates.render("StatusNotification", {"connectorId": 1, "extra": "x"}, "cp", "", "", "urn:1") is None
+        assert SoapTemplates([]).render("Heartbeat", {}, "cp", "", "", "urn:1") is None
+
+    def test_body_of_responses_not_faults(self):
+        templates = SoapTemplates(SoapTemplates.samples)
+        envelope = '<s:Envelope xmlns:s="{}"><s:Body>{}</s:Body></s:Envelope>'
+
+        # Text mentioning a fault is not one
+        body = templates.body(envelope.format(
+            "http://www.w3.org/2003/05/soap-envelope",
+            '<statusNotificationResponse xmlns="urn://Ocpp/Cs/2012/06/"><info>GroundFault</info></statusNotificationResponse>').encode())
+        assert body is not None and len(body) == 1
+        for namespace in ("http://www.w3.org/2003/05/soap-envelope", "http://schemas.xmlsoap.org/soap/envelope/"):
+            assert templates.body(envelope.format(namespace, '<s:Fault><s:Reason>x</s:Reason></s:Fault>').encode()) is None
+        assert templates.body(b"Internal Server Error") is None
+
+    @pytest.mark.asyncio
+    async def test_device_session_with_templates(self):
+        server = MockCsmsOcppS(port=0)
+        await server.start()
+        device = await _initialized(server)
+        try:
+            templates = device._DeviceOcppS__templates
+            with patch.object(SoapTemplates, "result", wraps=templates.result) as result, \
+                    patch.object(SoapTemplates, "render", wraps=templates.render) as render:
+                assert await device.action_heart_beat()
+                assert await device.action_status_update("Charging", {"connectorId": 1})
+                assert await device.action_meter_value({"transactionId": 3, "meterStart": 10, "chargeStartTime": DeviceOcppS.utcnow().isoformat()})
+            assert result.call_count == 3
+            assert isinstance(result.call_args_list[0].args[0], str)
+            # Message ids from the ids of the device, not a uuid each
+            assert render.call_args_list[0].args[5] == f"urn:ocpp-message:{device.message_ids.prefix}1"
+        finally:
+            await device.end()
+            await server.end()
+
+        assert server.received == {"Heartbeat": 1, "StatusNotification": 1, "MeterValues": 1}
+        assert server.charge_boxes == {"soap-t"}
+        assert device.metrics.actions["Heartbeat"].rejected == 0
+
+    @pytest.mark.asyncio
+    async def test_fault_raised_as_by_zeep(self):
+        server = MockCsmsOcppS(port=0, options=MockOptions(reject_ratios={"Heartbeat": 1}))
+        await server.start()
+        device = await _initialized(server)
+        try:
+            with pytest.raises(Fault):
+                await device.by_device_req_send("Heartbeat", {})
+        finally:
+            await device.end()
+            await server.end()
+
+        assert device.metrics.actions["Heartbeat"].failed == 1
+
+    def test_config(self):
+        device = ConfigParser.parse_device({"type": "ocpp-s", "spec_identifier": "S1", "soap_templates": False})
+
+        assert device.soap_templates is False
@@ -0,0 +1,95 @@
+import os
+import ssl
+from unittest.mock import AsyncMock, patch
+
+import certifi
+import pytest
+
+from charge_device_simulator.device.ocpp_j.device_ocpp_j16 import DeviceOcppJ16
+from charge_device_simulator.device.ocpp_j.tls_contexts import TlsContexts
+from charge_device_simulator.mock import MockCsmsOcppJ
+from charge_device_simulator.mock.__main__ import parse_args, ssl_context_create
+from charge_device_simulator.runtime.config_parser import ConfigParser
+
+# Test CA, server certificate (localhost, 127.0.0.1) and client certificate, valid until 2125
+tls_directory = f"{os.path.dirname(os.path.realpath(__file__))}/tls"
+ca_file, server_file, client_file = (f"{tls_directory}/{name}.pem" for name in ("ca", "server", "client"))
+
+
+@pytest.fixture
+async def csms_mutual_tls():
+    server = MockCsmsOcppJ(port=0, ssl_context=ssl_context_create(parse_args([
+        "ocpp-j", "--tls-cert", server_file, "--tls-client-ca", ca_file,
+    ])))
+    await server.start()
+    yield server
+    await server.end()
+
+
+def _device(server, name, **tls):
+    device = DeviceOcppJ16(name)
+    device.server_address = f"wss://localhost:{server.port}"
+    device.error_exit = False
+    device.response_timeout_seconds = 2
+    device.register_on_initialize = False
+    for key, value in tls.items():
+        setattr(device, key, value)
+    return device
+
+
+async def _initialize(device) -> bool:
+    with patch("charge_device_simulator.device.ocpp_j.abstract_device_ocpp_j.asyncio.sleep", AsyncMock()):
+        return await device.initialize()
+
+
+class TestTlsContexts:
+    def test_built_once_per_files(self):
+        TlsContexts.clear()
+        with patch("charge_device_simulator.device.ocpp_j.tls_contexts.certifi.where", wraps=certifi.where) as where:
+            context = TlsContexts.get()
+            assert TlsContexts.get() is context
+        assert where.call_count == 1
+        assert context.verify_mode == ssl.CERT_REQUIRED and context.check_hostname
+        assert TlsContexts.get(ca_file) is not context
+        assert TlsContexts.get(ca_file, client_file) is not TlsContexts.get(ca_file)
+
+    @pytest.mark.asyncio
+    async def test_mutual_tls_sessions_resumed(self, csms_mutual_tls):
+        TlsContexts.clear()
+        devices = [_device(csms_mutual_tls, f"tls-{i}", tls_ca_file=ca_file, tls_cert_file=client_file) for i in range(2)]
+        resumed = []
+        try:
+            for device in devices + devices:
+                assert await _initialize(device)
+                resumed.append(device._ws.transport.get_extra_info('ssl_object').session_reused)
+                await device.end()
+        finally:
+            for device in devices:
+                await device.end()
+
+        # Only the first connection to the server has a full handshake
+        assert resumed == [False, True, True, True]
+        assert csms_mutual_tls.received["HeartBeat"] == 4
+
+    @pytest.mark.asyncio
+    async def test_client_certificate_required(self, csms_mutual_tls):
+        device = _device(csms_mutual_tls, "tls-anonymous", tls_ca_file=ca_file)
+
+        assert not await _initialize(device)
+        await device.end()
+
+    @pytest.mark.asyncio
+    async def test_server_not_trusted(self, csms_mutual_tls):
+        device = _device(csms_mutual_tls, "tls-untrusted", tls_cert_file=client_file)
+
+        assert not await _initialize(device)
+        await device.end()
+
+    def test_config(self):
+        device = ConfigParser.parse_device({
+            "type": "ocpp-j", "spec_identifier": "J1", "tls_ca_file": ca_file, "tls_cert_file": client_file,
+        })
+
+        assert device.tls_ca_file == ca_file
+        assert device.tls_cert_file == client_file
+        assert device.tls_key_file is None